@@ -1,4 +1,5 @@
 import os
+import re
 from logging.config import fileConfig
 
 from dotenv import load_dotenv
@@ -24,6 +25,17 @@ if config.config_file_name is not None:
 from dabia.models import Base
 target_metadata = Base.metadata
 
+# Tables that exist in the database but not in the models: the hash partitions
+# of user_card_associations, and its shadow and old copies around the swap
+# done by scripts/partition_associations.py.
+UNMANAGED_TABLES = re.compile(r"user_card_associations_(p\d+|partitioned|old)$")
+
+
+def include_object(object, name, type_, reflected, compare_to):
+    if type_ == "table" and reflected and UNMANAGED_TABLES.match(name):
+        return False
+    return True
+
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
 # my_important_option = config.get_main_option("my_important_option")
@@ -46,6 +58,7 @@ def run_migrations_offline() -> None:
     context.configure(
         url=url,
         target_metadata=target_metadata,
+        include_object=include_object,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
     )
@@ -72,7 +85,7 @@ def run_migrations_online() -> None:
 
     with connectable.connect() as connection:
         context.configure(
-            connection=connection, target_metadata=target_metadata
+            connection=connection, target_metadata=target_metadata, include_object=include_object
         )
 
         with context.begin_transaction():
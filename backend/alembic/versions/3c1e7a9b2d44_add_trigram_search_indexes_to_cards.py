@@ -0,0 +1,62 @@
+"""Add trigram search indexes to cards
+
+Revision ID: 3c1e7a9b2d44
+Revises: a495263f4bf5
+Create Date: 2026-10-19 09:12:40.118532
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c1e7a9b2d44'
+down_revision: Union[str, Sequence[str], None] = 'a495263f4bf5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+SEARCH_COLUMNS = ("target_word", "reading", "hint", "sentence", "sentence_translation")
+
+
+def upgrade() -> None:
+    """Enable pg_trgm and index the searchable card columns."""
+    # pg_trgm ships with the standard Postgres contrib package, so this works on
+    # both the local docker image and managed instances.
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    for column in SEARCH_COLUMNS:
+        op.create_index(
+            f"ix_cards_{column}_trgm",
+            "cards",
+            [column],
+            unique=False,
+            postgresql_using="gin",
+            postgresql_ops={column: "gin_trgm_ops"},
+        )
+
+    op.create_index(
+        "ix_cards_target_word_prefix",
+        "cards",
+        ["target_word"],
+        unique=False,
+        postgresql_ops={"target_word": "varchar_pattern_ops"},
+    )
+    op.create_index(
+        "ix_cards_reading_prefix",
+        "cards",
+        ["reading"],
+        unique=False,
+        postgresql_ops={"reading": "varchar_pattern_ops"},
+    )
+
+
+def downgrade() -> None:
+    """Drop the search indexes."""
+    op.drop_index("ix_cards_reading_prefix", table_name="cards")
+    op.drop_index("ix_cards_target_word_prefix", table_name="cards")
+    for column in reversed(SEARCH_COLUMNS):
+        op.drop_index(f"ix_cards_{column}_trgm", table_name="cards")
+    # The extension is left installed; other objects may depend on it.
@@ -0,0 +1,28 @@
+"""Add BRIN index on review_logs.reviewed_at
+
+Revision ID: 5f8c2d71a9e6
+Revises: e41a6c93b7d5
+Create Date: 2026-10-19 15:20:33.604871
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5f8c2d71a9e6'
+down_revision: Union[str, Sequence[str], None] = 'e41a6c93b7d5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_review_logs_reviewed_at_brin', 'review_logs', ['reviewed_at'], unique=False, postgresql_using='brin')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_review_logs_reviewed_at_brin', table_name='review_logs')
@@ -0,0 +1,37 @@
+"""Add keyset indexes for delta sync
+
+Revision ID: 7b5d0e2c8f13
+Revises: 3c1e7a9b2d44
+Create Date: 2026-10-19 11:02:17.530214
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7b5d0e2c8f13'
+down_revision: Union[str, Sequence[str], None] = '3c1e7a9b2d44'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_cards_updated_at_id', 'cards', ['updated_at', 'id'], unique=False)
+    op.create_index('ix_decks_updated_at_id', 'decks', ['updated_at', 'id'], unique=False)
+    op.create_index(
+        'ix_user_card_associations_user_id_updated_at',
+        'user_card_associations',
+        ['user_id', 'updated_at', 'card_id'],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_user_card_associations_user_id_updated_at', table_name='user_card_associations')
+    op.drop_index('ix_decks_updated_at_id', table_name='decks')
+    op.drop_index('ix_cards_updated_at_id', table_name='cards')
@@ -0,0 +1,69 @@
+"""Add parsed furigana segments to cards
+
+Revision ID: a7e3b9d40c52
+Revises: f2a8c5d31e67
+Create Date: 2026-10-19 20:03:51.276194
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from dabia.core.furigana import parse_furigana
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7e3b9d40c52'
+down_revision: Union[str, Sequence[str], None] = 'f2a8c5d31e67'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 1000
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('cards', sa.Column('sentence_segments', postgresql.JSONB(astext_type=sa.Text()), nullable=True))
+
+    cards_table = sa.table(
+        "cards",
+        sa.column("id", postgresql.UUID(as_uuid=True)),
+        sa.column("sentence_furigana", sa.String),
+        sa.column("sentence_segments", postgresql.JSONB),
+        sa.column("updated_at", sa.DateTime),
+    )
+    pending = (
+        sa.select(cards_table.c.id, cards_table.c.sentence_furigana)
+        .where(cards_table.c.sentence_furigana.is_not(None), cards_table.c.sentence_segments.is_(None))
+        .order_by(cards_table.c.id)
+        .limit(BATCH_SIZE)
+    )
+    # Bumping updated_at makes delta sync send the segments to offline clients.
+    backfill = (
+        sa.update(cards_table)
+        .where(cards_table.c.id == sa.bindparam("card_id"))
+        .values(sentence_segments=sa.bindparam("segments"), updated_at=sa.func.now())
+    )
+
+    # Backfill in keyset batches, each committed on its own, so a large table
+    # isn't locked in one transaction and an interrupted run can resume.
+    with op.get_context().autocommit_block():
+        connection = op.get_bind()
+        last_id = None
+        while True:
+            stmt = pending if last_id is None else pending.where(cards_table.c.id > last_id)
+            rows = connection.execute(stmt).all()
+            if not rows:
+                break
+            connection.execute(backfill, [
+                {"card_id": card_id, "segments": parse_furigana(furigana)}
+                for card_id, furigana in rows
+            ])
+            last_id = rows[-1][0]
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('cards', 'sentence_segments')
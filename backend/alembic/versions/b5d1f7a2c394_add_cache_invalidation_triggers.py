@@ -0,0 +1,65 @@
+"""Add cache invalidation triggers
+
+Revision ID: b5d1f7a2c394
+Revises: a7e3b9d40c52
+Create Date: 2026-10-19 21:26:37.540812
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b5d1f7a2c394'
+down_revision: Union[str, Sequence[str], None] = 'a7e3b9d40c52'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (table, key column, cache key kind, events). New cards and decks can't be
+# cached yet, but a new distractor row changes its card's content.
+TRIGGERS = (
+    ('cards', 'id', 'card', ('UPDATE', 'DELETE')),
+    ('decks', 'id', 'deck', ('UPDATE', 'DELETE')),
+    ('card_distractors', 'card_id', 'card', ('INSERT', 'UPDATE', 'DELETE')),
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Statement-level, so a bulk import sends one notification per 200 ids
+    # instead of one per row; 200 UUIDs stay under the 8000 byte payload limit.
+    op.execute("""
+        CREATE FUNCTION notify_cache_invalidation() RETURNS trigger AS $$
+        DECLARE
+            payload text;
+        BEGIN
+            FOR payload IN EXECUTE format(
+                'SELECT %L || '':'' || string_agg(key::text, '','') '
+                'FROM (SELECT %I AS key, (row_number() OVER () - 1) / 200 AS chunk FROM changed_rows) AS changed '
+                'GROUP BY chunk',
+                TG_ARGV[0], TG_ARGV[1]
+            ) LOOP
+                PERFORM pg_notify('dabia_cache_invalidation', payload);
+            END LOOP;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    for table, column, kind, events in TRIGGERS:
+        for event in events:
+            # Transition tables allow a single event per trigger.
+            rows = 'NEW' if event == 'INSERT' else 'OLD'
+            op.execute(
+                f"CREATE TRIGGER {table}_{event.lower()}_invalidate_cache "
+                f"AFTER {event} ON {table} REFERENCING {rows} TABLE AS changed_rows "
+                f"FOR EACH STATEMENT EXECUTE FUNCTION notify_cache_invalidation('{kind}', '{column}')"
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table, _, _, events in TRIGGERS:
+        for event in events:
+            op.execute(f"DROP TRIGGER {table}_{event.lower()}_invalidate_cache ON {table}")
+    op.execute("DROP FUNCTION notify_cache_invalidation()")
@@ -0,0 +1,52 @@
+"""Add card order key and per-user new card cursors
+
+Revision ID: b82e4f19c6d3
+Revises: 5f8c2d71a9e6
+Create Date: 2026-10-19 16:41:08.217539
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b82e4f19c6d3'
+down_revision: Union[str, Sequence[str], None] = '5f8c2d71a9e6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Postgres fills the identity for existing rows in table order, which for
+    # imported decks is the order they were imported in. Re-running the
+    # importer with a frequency list replaces these keys.
+    op.add_column('cards', sa.Column('order_key', sa.BigInteger(), sa.Identity(always=False), nullable=False))
+    op.create_index('ix_cards_deck_id_order_key', 'cards', ['deck_id', 'order_key', 'id'], unique=False)
+    op.create_index(
+        'ix_user_card_associations_user_id_next_review_at',
+        'user_card_associations',
+        ['user_id', 'next_review_at'],
+        unique=False,
+    )
+    op.create_table('user_decks',
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('deck_id', sa.UUID(), nullable=False),
+    sa.Column('new_cursor_order_key', sa.BigInteger(), nullable=True),
+    sa.Column('new_cursor_card_id', sa.UUID(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), server_default=sa.text('now()'), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['deck_id'], ['decks.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('user_id', 'deck_id')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('user_decks')
+    op.drop_index('ix_user_card_associations_user_id_next_review_at', table_name='user_card_associations')
+    op.drop_index('ix_cards_deck_id_order_key', table_name='cards')
+    op.drop_column('cards', 'order_key')
@@ -0,0 +1,57 @@
+"""Add per-deck study quotas and deck_id on user card associations
+
+Revision ID: c4a7d2e80b15
+Revises: b82e4f19c6d3
+Create Date: 2026-10-19 17:28:52.091346
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4a7d2e80b15'
+down_revision: Union[str, Sequence[str], None] = 'b82e4f19c6d3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('user_decks', sa.Column('is_active', sa.Boolean(), server_default=sa.true(), nullable=False))
+    op.add_column('user_decks', sa.Column('new_cards_per_day', sa.Integer(), server_default='20', nullable=False))
+    op.add_column('user_decks', sa.Column('reviews_per_day', sa.Integer(), server_default='200', nullable=False))
+    op.add_column('user_decks', sa.Column('new_today', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('user_decks', sa.Column('reviews_today', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('user_decks', sa.Column('counted_on', sa.Date(), nullable=True))
+
+    op.add_column('user_card_associations', sa.Column('deck_id', sa.UUID(), nullable=True))
+    op.execute(
+        "UPDATE user_card_associations AS a SET deck_id = c.deck_id "
+        "FROM cards AS c WHERE c.id = a.card_id"
+    )
+    op.alter_column('user_card_associations', 'deck_id', nullable=False)
+    op.create_foreign_key(
+        'user_card_associations_deck_id_fkey', 'user_card_associations', 'decks', ['deck_id'], ['id']
+    )
+    op.create_index(
+        'ix_user_card_associations_user_id_deck_id_next_review_at',
+        'user_card_associations',
+        ['user_id', 'deck_id', 'next_review_at'],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_user_card_associations_user_id_deck_id_next_review_at', table_name='user_card_associations')
+    op.drop_constraint('user_card_associations_deck_id_fkey', 'user_card_associations', type_='foreignkey')
+    op.drop_column('user_card_associations', 'deck_id')
+    op.drop_column('user_decks', 'counted_on')
+    op.drop_column('user_decks', 'reviews_today')
+    op.drop_column('user_decks', 'new_today')
+    op.drop_column('user_decks', 'reviews_per_day')
+    op.drop_column('user_decks', 'new_cards_per_day')
+    op.drop_column('user_decks', 'is_active')
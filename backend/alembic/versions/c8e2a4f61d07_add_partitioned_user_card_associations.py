@@ -0,0 +1,92 @@
+"""Add hash-partitioned shadow of user_card_associations
+
+Revision ID: c8e2a4f61d07
+Revises: b5d1f7a2c394
+Create Date: 2026-10-19 22:41:12.318406
+
+Creates user_card_associations_partitioned, hash-partitioned by user_id, and
+a trigger that mirrors every write on user_card_associations into it. Rows
+that already exist are copied, and the tables swapped, by
+scripts/partition_associations.py while the API keeps serving. Downgrading
+is only possible before the swap.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c8e2a4f61d07'
+down_revision: Union[str, Sequence[str], None] = 'b5d1f7a2c394'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+PARTITIONS = 16
+SHADOW = 'user_card_associations_partitioned'
+
+# Same as the live table's indexes, suffixed until the swap renames them.
+INDEXES = (
+    ('ix_user_card_associations_user_id_updated_at', '(user_id, updated_at, card_id)', ''),
+    ('ix_user_card_associations_user_id_next_review_at', '(user_id, next_review_at)', ''),
+    ('ix_user_card_associations_user_id_deck_id_next_review_at', '(user_id, deck_id, next_review_at)', 'WHERE NOT is_suspended'),
+    ('ix_user_card_associations_user_id_suspended_at', '(user_id, suspended_at)', 'WHERE is_suspended'),
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # LIKE keeps the live table's column order, so rows can be copied with *.
+    op.execute(f"""
+        CREATE TABLE {SHADOW} (
+            LIKE user_card_associations INCLUDING DEFAULTS,
+            CONSTRAINT {SHADOW}_pkey PRIMARY KEY (user_id, card_id),
+            FOREIGN KEY (user_id) REFERENCES users (id),
+            FOREIGN KEY (card_id) REFERENCES cards (id),
+            FOREIGN KEY (deck_id) REFERENCES decks (id)
+        ) PARTITION BY HASH (user_id)
+    """)
+    for remainder in range(PARTITIONS):
+        op.execute(
+            f"CREATE TABLE user_card_associations_p{remainder} PARTITION OF {SHADOW} "
+            f"FOR VALUES WITH (MODULUS {PARTITIONS}, REMAINDER {remainder})"
+        )
+    for name, columns, where in INDEXES:
+        op.execute(f"CREATE INDEX {name}_new ON {SHADOW} {columns} {where}")
+
+    # An upsert rather than a plain insert: a row the backfill copied in a
+    # concurrent transaction must be overwritten, not fail the app's write.
+    op.execute(f"""
+        CREATE FUNCTION mirror_user_card_associations() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP = 'DELETE' OR (TG_OP = 'UPDATE' AND (OLD.user_id, OLD.card_id) IS DISTINCT FROM (NEW.user_id, NEW.card_id)) THEN
+                DELETE FROM {SHADOW} WHERE user_id = OLD.user_id AND card_id = OLD.card_id;
+            END IF;
+            IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                INSERT INTO {SHADOW} SELECT (NEW).*
+                ON CONFLICT (user_id, card_id) DO UPDATE SET
+                    deck_id = EXCLUDED.deck_id,
+                    proficiency_level = EXCLUDED.proficiency_level,
+                    next_review_at = EXCLUDED.next_review_at,
+                    created_at = EXCLUDED.created_at,
+                    updated_at = EXCLUDED.updated_at,
+                    consecutive_lapses = EXCLUDED.consecutive_lapses,
+                    total_lapses = EXCLUDED.total_lapses,
+                    is_suspended = EXCLUDED.is_suspended,
+                    suspended_at = EXCLUDED.suspended_at;
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute(
+        "CREATE TRIGGER user_card_associations_mirror "
+        "AFTER INSERT OR UPDATE OR DELETE ON user_card_associations "
+        "FOR EACH ROW EXECUTE FUNCTION mirror_user_card_associations()"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER IF EXISTS user_card_associations_mirror ON user_card_associations")
+    op.execute("DROP FUNCTION IF EXISTS mirror_user_card_associations()")
+    op.execute(f"DROP TABLE IF EXISTS {SHADOW}")
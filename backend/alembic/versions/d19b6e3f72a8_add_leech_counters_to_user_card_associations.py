@@ -0,0 +1,59 @@
+"""Add leech counters and suspension to user card associations
+
+Revision ID: d19b6e3f72a8
+Revises: c4a7d2e80b15
+Create Date: 2026-10-19 18:05:44.730912
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd19b6e3f72a8'
+down_revision: Union[str, Sequence[str], None] = 'c4a7d2e80b15'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('user_card_associations', sa.Column('consecutive_lapses', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('user_card_associations', sa.Column('total_lapses', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('user_card_associations', sa.Column('is_suspended', sa.Boolean(), server_default=sa.false(), nullable=False))
+    op.add_column('user_card_associations', sa.Column('suspended_at', sa.DateTime(), nullable=True))
+
+    # Rebuild the due-window index as a partial index without suspended cards.
+    op.drop_index('ix_user_card_associations_user_id_deck_id_next_review_at', table_name='user_card_associations')
+    op.create_index(
+        'ix_user_card_associations_user_id_deck_id_next_review_at',
+        'user_card_associations',
+        ['user_id', 'deck_id', 'next_review_at'],
+        unique=False,
+        postgresql_where=sa.text('NOT is_suspended'),
+    )
+    op.create_index(
+        'ix_user_card_associations_user_id_suspended_at',
+        'user_card_associations',
+        ['user_id', 'suspended_at'],
+        unique=False,
+        postgresql_where=sa.text('is_suspended'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_user_card_associations_user_id_suspended_at', table_name='user_card_associations')
+    op.drop_index('ix_user_card_associations_user_id_deck_id_next_review_at', table_name='user_card_associations')
+    op.create_index(
+        'ix_user_card_associations_user_id_deck_id_next_review_at',
+        'user_card_associations',
+        ['user_id', 'deck_id', 'next_review_at'],
+        unique=False,
+    )
+    op.drop_column('user_card_associations', 'suspended_at')
+    op.drop_column('user_card_associations', 'is_suspended')
+    op.drop_column('user_card_associations', 'total_lapses')
+    op.drop_column('user_card_associations', 'consecutive_lapses')
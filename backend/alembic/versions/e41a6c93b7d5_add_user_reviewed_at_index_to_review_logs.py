@@ -0,0 +1,28 @@
+"""Add (user_id, reviewed_at) index to review_logs
+
+Revision ID: e41a6c93b7d5
+Revises: 7b5d0e2c8f13
+Create Date: 2026-10-19 13:45:09.842117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e41a6c93b7d5'
+down_revision: Union[str, Sequence[str], None] = '7b5d0e2c8f13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_review_logs_user_id_reviewed_at', 'review_logs', ['user_id', 'reviewed_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_review_logs_user_id_reviewed_at', table_name='review_logs')
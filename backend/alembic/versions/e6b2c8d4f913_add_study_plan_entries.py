@@ -0,0 +1,40 @@
+"""Add study plan entries
+
+Revision ID: e6b2c8d4f913
+Revises: d3f9a1c7b482
+Create Date: 2026-10-20 00:12:36.574209
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e6b2c8d4f913'
+down_revision: Union[str, Sequence[str], None] = 'd3f9a1c7b482'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('study_plan_entries',
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('plan_date', sa.Date(), nullable=False),
+    sa.Column('card_id', sa.UUID(), nullable=False),
+    sa.Column('deck_id', sa.UUID(), nullable=False),
+    sa.Column('is_new', sa.Boolean(), nullable=False),
+    sa.Column('due_at', sa.DateTime(), nullable=False),
+    sa.Column('position', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['card_id'], ['cards.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['deck_id'], ['decks.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id', 'plan_date', 'card_id')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('study_plan_entries')
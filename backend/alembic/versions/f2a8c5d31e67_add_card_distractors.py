@@ -0,0 +1,35 @@
+"""Add card distractors
+
+Revision ID: f2a8c5d31e67
+Revises: d19b6e3f72a8
+Create Date: 2026-10-19 19:12:08.415263
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2a8c5d31e67'
+down_revision: Union[str, Sequence[str], None] = 'd19b6e3f72a8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('card_distractors',
+    sa.Column('card_id', sa.UUID(), nullable=False),
+    sa.Column('words', postgresql.ARRAY(sa.String()), nullable=False),
+    sa.Column('computed_at', sa.DateTime(), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['card_id'], ['cards.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('card_id')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('card_distractors')
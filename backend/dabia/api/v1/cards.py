@@ -0,0 +1,156 @@
+from fastapi import APIRouter, Depends, Query
+from pydantic import StringConstraints
+from sqlalchemy.orm import Session
+from sqlalchemy import func, or_, case, literal
+import uuid
+from typing import Annotated, Optional
+
+from dabia import models, schemas
+from dabia.core.security import get_current_user_id
+from dabia.database import get_read_db
+
+router = APIRouter()
+
+# pg_trgm can only extract trigrams from queries of at least this many
+# characters; anything shorter is matched by prefix instead.
+TRIGRAM_MIN_LENGTH = 3
+
+# Relative weight of a match in each searchable column when ranking results.
+SEARCH_WEIGHTS = {
+    "target_word": 1.0,
+    "reading": 0.9,
+    "hint": 0.6,
+    "sentence": 0.4,
+    "sentence_translation": 0.4,
+}
+
+def _escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+def _search_filters(q: str):
+    """
+    Builds the WHERE clause and rank expression for a search query.
+    Long queries use the trigram GIN indexes on every searchable column,
+    short ones use the prefix indexes on target_word and reading.
+    """
+    Card = models.Card
+    escaped = _escape_like(q)
+    exact = case(
+        (Card.target_word == q, 1.0),
+        (Card.reading == q, 0.8),
+        else_=0.0,
+    )
+
+    if len(q) < TRIGRAM_MIN_LENGTH:
+        pattern = f"{escaped}%"
+        match = or_(
+            Card.target_word.like(pattern, escape="\\"),
+            Card.reading.like(pattern, escape="\\"),
+        )
+        # Prefer exact hits, then the shortest completion of the prefix.
+        rank = exact + literal(1.0) / (func.length(Card.target_word) + 1)
+        return match, rank
+
+    pattern = f"%{escaped}%"
+    columns = [getattr(Card, name) for name in SEARCH_WEIGHTS]
+    match = or_(*(column.ilike(pattern, escape="\\") for column in columns))
+    rank = exact + func.greatest(*(
+        func.coalesce(func.word_similarity(q, column), 0.0) * weight
+        for column, weight in zip(columns, SEARCH_WEIGHTS.values())
+    ))
+    return match, rank
+
+@router.get("/search", response_model=schemas.CardSearchResponse)
+def search_cards(
+    q: Annotated[str, StringConstraints(strip_whitespace=True, min_length=1, max_length=100), Query()],
+    deck_id: Optional[uuid.UUID] = None,
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_read_db),
+):
+    """
+    Searches cards by kanji, kana reading, hint or sentence fragment.
+    Results are ranked by how closely the best-matching column fits the query.
+    """
+    q = q.strip()
+    match, rank = _search_filters(q)
+    filters = [match]
+    if deck_id:
+        filters.append(models.Card.deck_id == deck_id)
+
+    rows = (
+        db.query(
+            models.Card.id,
+            models.Card.deck_id,
+            models.Deck.name.label("deck_name"),
+            models.Card.target_word,
+            models.Card.hint,
+            models.Card.reading,
+            models.Card.sentence,
+            models.Card.sentence_translation,
+            rank.label("score"),
+        )
+        .join(models.Deck, models.Card.deck_id == models.Deck.id)
+        .filter(*filters)
+        .order_by(rank.desc(), models.Card.id)
+        .limit(limit)
+        .all()
+    )
+
+    results = [
+        schemas.CardSearchResult(
+            card_id=row.id,
+            deck=schemas.DeckInfo(id=row.deck_id, name=row.deck_name),
+            target=schemas.CardTarget(word=row.target_word, hint=row.hint),
+            reading=row.reading,
+            sentence=row.sentence,
+            sentence_translation=row.sentence_translation,
+            score=float(row.score),
+        )
+        for row in rows
+    ]
+    return schemas.CardSearchResponse(query=q, results=results)
+
+@router.get("/leeches", response_model=schemas.LeechListResponse)
+def list_leeches(
+    limit: int = Query(100, ge=1, le=500),
+    db: Session = Depends(get_read_db),
+    current_user_id: uuid.UUID = Depends(get_current_user_id),
+):
+    """
+    Lists the cards suspended as leeches for the current user, most recently
+    suspended first. Reads only the partial index of suspended cards.
+    """
+    Assoc = models.UserCardAssociation
+    rows = (
+        db.query(
+            Assoc.card_id,
+            Assoc.consecutive_lapses,
+            Assoc.total_lapses,
+            Assoc.suspended_at,
+            models.Card.deck_id,
+            models.Deck.name.label("deck_name"),
+            models.Card.target_word,
+            models.Card.hint,
+            models.Card.reading,
+        )
+        .join(models.Card, models.Card.id == Assoc.card_id)
+        .join(models.Deck, models.Deck.id == models.Card.deck_id)
+        .filter(Assoc.user_id == current_user_id, Assoc.is_suspended)
+        .order_by(Assoc.suspended_at.desc())
+        .limit(limit)
+        .all()
+    )
+
+    leeches = [
+        schemas.Leech(
+            card_id=row.card_id,
+            deck=schemas.DeckInfo(id=row.deck_id, name=row.deck_name),
+            target=schemas.CardTarget(word=row.target_word, hint=row.hint),
+            reading=row.reading,
+            consecutive_lapses=row.consecutive_lapses,
+            total_lapses=row.total_lapses,
+            suspended_at=row.suspended_at,
+        )
+        for row in rows
+    ]
+    return schemas.LeechListResponse(leeches=leeches)
@@ -0,0 +1,43 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.orm import Session
+import uuid
+from typing import Optional
+
+from dabia import models, schemas
+from dabia.core.security import get_current_user_id
+from dabia.database import get_db
+from dabia.services.enrollment import enroll_deck
+
+router = APIRouter()
+
+@router.post("/{deck_id}/enroll", response_model=schemas.DeckEnrollmentResponse)
+def enroll_in_deck(
+    deck_id: uuid.UUID,
+    request: Optional[schemas.DeckEnrollmentRequest] = None,
+    db: Session = Depends(get_db),
+    current_user_id: uuid.UUID = Depends(get_current_user_id),
+):
+    """
+    Subscribes the user to a deck and sets its daily quotas. Calling it again
+    updates the quotas; cards already studied keep their progress.
+    """
+    request = request or schemas.DeckEnrollmentRequest()
+    if db.get(models.Deck, deck_id) is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Deck not found")
+
+    user_deck, enrolled = enroll_deck(
+        db,
+        current_user_id,
+        deck_id,
+        mode=request.mode,
+        new_cards_per_day=request.new_cards_per_day,
+        reviews_per_day=request.reviews_per_day,
+    )
+    return schemas.DeckEnrollmentResponse(
+        deck_id=deck_id,
+        mode=request.mode,
+        is_active=user_deck.is_active,
+        new_cards_per_day=user_deck.new_cards_per_day,
+        reviews_per_day=user_deck.reviews_per_day,
+        enrolled_cards=enrolled,
+    )
@@ -0,0 +1,41 @@
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+import uuid
+from typing import Literal, Optional
+from datetime import datetime
+
+from dabia.core.security import get_current_user_id
+from dabia.database import get_read_db
+from dabia.services.export import export_reviews, FORMATS
+
+router = APIRouter()
+
+@router.get("/reviews")
+def export_review_history(
+    format: Literal["csv", "ndjson"] = Query("csv"),
+    deck_id: Optional[uuid.UUID] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    db: Session = Depends(get_read_db),
+    current_user_id: uuid.UUID = Depends(get_current_user_id)
+):
+    """
+    Streams the current user's review history as CSV or NDJSON.
+    Rows are read through a server-side cursor, so the export never holds
+    more than one batch in memory.
+    """
+    body = export_reviews(
+        db,
+        format,
+        user_id=current_user_id,
+        deck_id=deck_id,
+        since=since,
+        until=until,
+    )
+    filename = f"reviews.{format}"
+    return StreamingResponse(
+        body,
+        media_type=FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
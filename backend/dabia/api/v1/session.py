@@ -1,23 +1,38 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import func
+from fastapi import APIRouter, Depends, HTTPException, WebSocket, WebSocketDisconnect
+from fastapi.concurrency import run_in_threadpool
+from pydantic import ValidationError
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
 import uuid
 from typing import Optional
-from datetime import datetime, UTC
 
-from dabia import models, schemas
-from dabia.core.storage import storage_provider
-from dabia.database import get_db
+from dabia import schemas
+from dabia.core.config import settings
+from dabia.core.negotiation import NegotiatedRoute
+from dabia.core.replicas import recent_writes
+from dabia.core.security import get_current_user_id
+from dabia.database import get_db, get_read_db
+from dabia.services.study import (
+    StudySession,
+    build_card_response,
+    build_upcoming_audio,
+    fetch_next_cards,
+    get_session_progress,
+    record_answer,
+)
 
-router = APIRouter()
+router = APIRouter(route_class=NegotiatedRoute)
 
-# This is a temporary dependency to simulate getting a user ID from an auth token.
-# In a real app, this would be a sophisticated function that decodes a JWT.
-# Adding a comment to force a rebuild.
-async def get_current_user_id() -> uuid.UUID:
-    # For now, we return a hardcoded UUID.
-    # This allows us to easily override it in tests.
-    return uuid.UUID("00000000-0000-0000-0000-000000000000")
+@router.get("/progress", response_model=schemas.SessionProgress)
+def read_session_progress(
+    db: Session = Depends(get_read_db),
+    current_user_id: uuid.UUID = Depends(get_current_user_id)
+):
+    """
+    Returns the user's progress for today. Served from a read replica, except
+    right after the user answered a card, when the primary is used instead.
+    """
+    return get_session_progress(db, current_user_id)
 
 @router.post("/next-card", response_model=schemas.NextCardResponse)
 def get_next_card(
@@ -31,42 +46,15 @@ def get_next_card(
     """
     if answer:
         # 1. Save the previous answer to the review log
-        review_log_entry = models.ReviewLog(
-            user_id=current_user_id,
-            card_id=answer.card_id,
-            is_correct=answer.is_correct,
-            response_time_ms=answer.response_time_ms,
-        )
-        db.add(review_log_entry)
-        db.commit()
+        record_answer(db, current_user_id, answer)
 
     # 2. Calculate today's progress
-    today_start = datetime.now(UTC).date()
-    completed_today_count = (
-        db.query(models.ReviewLog)
-        .filter(
-            models.ReviewLog.user_id == current_user_id,
-            models.ReviewLog.reviewed_at >= today_start
-        )
-        .count()
-    )
-    progress = schemas.SessionProgress(completed_today=completed_today_count, goal_today=50)
-
-    # 3. Fetch the next card
-    # MVP Logic: Just grab a random card from the DB.
-    # A real implementation would have sophisticated logic to pick the next card.
-    next_card_db = (
-        db.query(models.Card)
-        .options(
-            joinedload(models.Card.deck),
-            joinedload(models.Card.users).subqueryload(models.UserCardAssociation.user)
-        )
-        .order_by(func.random())
-        .first()
-    )
+    progress = get_session_progress(db, current_user_id)
 
+    # 3. Fetch the next card, and the ones after it for audio prefetching
+    next_cards = fetch_next_cards(db, current_user_id, limit=1 + settings.AUDIO_PREFETCH_COUNT)
 
-    if not next_card_db:
+    if not next_cards:
         # No cards in the database yet
         return schemas.NextCardResponse(
             card=None,
@@ -74,22 +62,48 @@ def get_next_card(
         )
 
     # 4. Format the response
-    # Find the user-specific card association to get the proficiency level
-    user_assoc = next((assoc for assoc in next_card_db.users if assoc.user_id == current_user_id), None)
-    proficiency_level = user_assoc.proficiency_level if user_assoc else 0
+    card_response = build_card_response(next_cards[0])
+    upcoming_audio = build_upcoming_audio(db, next_cards[1:])
+
+    return schemas.NextCardResponse(card=card_response, session_progress=progress, upcoming_audio=upcoming_audio)
+
+@router.websocket("/ws")
+async def study_session_channel(
+    websocket: WebSocket,
+    db: Session = Depends(get_db),
+    current_user_id: uuid.UUID = Depends(get_current_user_id)
+):
+    """
+    Persistent study session. The server pushes a card as soon as the socket
+    opens; the client answers with a `PreviousAnswer` message and immediately
+    gets the next card, in the same shape as a `/next-card` response.
+    Clients that can't hold a socket open use `POST /next-card` instead.
+    """
+    await websocket.accept()
+    session = StudySession(db, current_user_id)
 
-    card_response = schemas.Card(
-        card_id=next_card_db.id,
-        deck=schemas.DeckInfo.model_validate(next_card_db.deck),
-        sentence_template=next_card_db.sentence_template,
-        target=schemas.CardTarget(word=next_card_db.target_word, hint=next_card_db.hint),
-        reading=next_card_db.reading,
-        audio_url=storage_provider.get_url(next_card_db.audio_url),
-        sentence=next_card_db.sentence,
-        sentence_furigana=next_card_db.sentence_furigana,
-        sentence_translation=next_card_db.sentence_translation,
-        sentence_audio_url=storage_provider.get_url(next_card_db.sentence_audio_url),
-        proficiency_level=proficiency_level
-    )
+    async def push_next_card():
+        response = await run_in_threadpool(session.next)
+        await websocket.send_json({"type": "card", **response.model_dump(mode="json")})
 
-    return schemas.NextCardResponse(card=card_response, session_progress=progress)
+    try:
+        await push_next_card()
+        while True:
+            message = await websocket.receive_text()
+            try:
+                answer = schemas.PreviousAnswer.model_validate_json(message)
+            except ValidationError as e:
+                await websocket.send_json({"type": "error", "detail": e.errors(include_url=False, include_context=False)})
+                continue
+            try:
+                await run_in_threadpool(session.answer, answer)
+            except SQLAlchemyError:
+                # E.g. an unknown card id. The session stays usable.
+                await run_in_threadpool(db.rollback)
+                await websocket.send_json({"type": "error", "detail": "The answer could not be recorded."})
+                continue
+            # Not an HTTP write, so ReadYourWritesMiddleware doesn't see it.
+            await run_in_threadpool(recent_writes.mark, current_user_id)
+            await push_next_card()
+    except WebSocketDisconnect:
+        pass
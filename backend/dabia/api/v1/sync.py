@@ -0,0 +1,225 @@
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+from sqlalchemy import select, func, tuple_, true
+from sqlalchemy.dialects.postgresql import insert
+import base64
+import binascii
+import json
+import uuid
+from typing import Callable, Optional, Dict, List, Iterator
+from datetime import datetime, timedelta, UTC
+
+from dabia import models, schemas
+from dabia.core.storage import storage_provider
+from dabia.core.negotiation import NegotiatedRoute, wants_msgpack, pack, MSGPACK_MEDIA_TYPE
+from dabia.core.security import get_current_user_id
+from dabia.database import get_db
+from dabia.services.study import apply_answer
+
+router = APIRouter(route_class=NegotiatedRoute)
+
+# Maximum number of rows streamed per entity type in one pull.
+PAGE_SIZE = 5000
+
+# Rows updated within this window are held back until the next pull, so a
+# transaction that started before ours but commits after it isn't skipped.
+SETTLE_INTERVAL = timedelta(seconds=5)
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+ENTITIES = ("decks", "cards", "associations")
+
+def encode_cursor(positions: Dict[str, Optional[List[str]]]) -> str:
+    raw = json.dumps(positions, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: Optional[str]) -> Dict[str, Optional[tuple]]:
+    """
+    Decodes an opaque sync cursor into per-entity (updated_at, id) positions.
+    A missing cursor means a full sync from the beginning.
+    """
+    positions = {entity: None for entity in ENTITIES}
+    if not cursor:
+        return positions
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        for entity, value in json.loads(raw).items():
+            if entity in positions and value is not None:
+                positions[entity] = (datetime.fromisoformat(value[0]), uuid.UUID(value[1]))
+    except (binascii.Error, ValueError, TypeError, IndexError, AttributeError):
+        raise HTTPException(status_code=400, detail="Invalid sync cursor")
+    return positions
+
+def _after(updated_col, id_col, position: Optional[tuple]):
+    if position is None:
+        return true()
+    return tuple_(updated_col, id_col) > tuple_(*position)
+
+def _change_queries(user_id: uuid.UUID, positions: Dict[str, Optional[tuple]]):
+    """Yields (entity, key column name, statement) for each entity type."""
+    Deck, Card, Assoc = models.Deck, models.Card, models.UserCardAssociation
+    settled = func.localtimestamp() - SETTLE_INTERVAL
+
+    yield "decks", "id", (
+        select(Deck.id, Deck.name, Deck.description, Deck.updated_at)
+        .where(_after(Deck.updated_at, Deck.id, positions["decks"]), Deck.updated_at <= settled)
+        .order_by(Deck.updated_at, Deck.id)
+        .limit(PAGE_SIZE + 1)
+    )
+    yield "cards", "id", (
+        select(
+            Card.id, Card.deck_id, Card.sentence_template, Card.target_word, Card.reading,
+            Card.hint, Card.audio_url, Card.sentence, Card.sentence_furigana,
+            Card.sentence_segments, Card.sentence_translation, Card.sentence_audio_url, Card.updated_at,
+        )
+        .where(_after(Card.updated_at, Card.id, positions["cards"]), Card.updated_at <= settled)
+        .order_by(Card.updated_at, Card.id)
+        .limit(PAGE_SIZE + 1)
+    )
+    yield "associations", "card_id", (
+        select(Assoc.card_id, Assoc.proficiency_level, Assoc.next_review_at, Assoc.is_suspended, Assoc.updated_at)
+        .where(
+            Assoc.user_id == user_id,
+            _after(Assoc.updated_at, Assoc.card_id, positions["associations"]),
+            Assoc.updated_at <= settled,
+        )
+        .order_by(Assoc.updated_at, Assoc.card_id)
+        .limit(PAGE_SIZE + 1)
+    )
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+def encode_ndjson(record: dict) -> bytes:
+    return json.dumps(record, ensure_ascii=False, separators=(",", ":"), default=_json_default).encode() + b"\n"
+
+def encode_msgpack(record: dict) -> bytes:
+    # Same value formats as the JSON representation, so clients share parsing.
+    return pack(record, default=_json_default)
+
+def iter_changes(
+    db: Session,
+    user_id: uuid.UUID,
+    positions: Dict[str, Optional[tuple]],
+    encode: Callable[[dict], bytes] = encode_ndjson,
+) -> Iterator[bytes]:
+    """
+    Streams every deck, card and association changed after the cursor as
+    encoded records, finishing with one that carries the next cursor.
+    """
+    has_more = False
+    next_positions: Dict[str, Optional[List[str]]] = {
+        entity: [position[0].isoformat(), str(position[1])] if position else None
+        for entity, position in positions.items()
+    }
+
+    for entity, key, stmt in _change_queries(user_id, positions):
+        result = db.execute(stmt.execution_options(yield_per=500))
+        try:
+            for count, row in enumerate(result.mappings()):
+                if count == PAGE_SIZE:
+                    has_more = True
+                    break
+                data = dict(row)
+                if entity == "cards":
+                    data["audio_url"] = storage_provider.get_url(data["audio_url"])
+                    data["sentence_audio_url"] = storage_provider.get_url(data["sentence_audio_url"])
+                next_positions[entity] = [row["updated_at"].isoformat(), str(row[key])]
+                yield encode({"type": entity[:-1], "data": data})
+        finally:
+            result.close()
+
+    yield encode({"type": "cursor", "data": {"cursor": encode_cursor(next_positions), "has_more": has_more}})
+
+@router.get("/changes")
+def pull_changes(
+    request: Request,
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_db),
+    current_user_id: uuid.UUID = Depends(get_current_user_id)
+):
+    """
+    Returns decks, cards and the user's card associations changed since the
+    client's cursor as a streamed bundle: NDJSON by default, or a sequence of
+    MessagePack maps when requested. Clients keep calling with the returned
+    cursor until `has_more` is false. Read from the primary: SETTLE_INTERVAL
+    is measured on the server's clock, which says nothing about how far a
+    replica has replayed, so a lagging replica could let rows slip behind
+    the cursor.
+    """
+    positions = decode_cursor(cursor)
+    if wants_msgpack(request):
+        body = iter_changes(db, current_user_id, positions, encode=encode_msgpack)
+        return StreamingResponse(body, media_type=MSGPACK_MEDIA_TYPE)
+    body = iter_changes(db, current_user_id, positions)
+    return StreamingResponse(body, media_type=NDJSON_MEDIA_TYPE)
+
+def _to_utc_naive(value: datetime) -> datetime:
+    # review_logs.reviewed_at is stored as naive UTC, like the server default.
+    if value.tzinfo is not None:
+        value = value.astimezone(UTC).replace(tzinfo=None)
+    return value
+
+@router.post("/reviews", response_model=schemas.ReviewUploadResponse)
+def upload_reviews(
+    payload: schemas.ReviewUploadRequest,
+    db: Session = Depends(get_db),
+    current_user_id: uuid.UUID = Depends(get_current_user_id)
+):
+    """
+    Records answers made while the client was offline, keeping the client's
+    timestamps. Review ids are client-generated, so retries are idempotent.
+    Each newly recorded answer is then applied like an online one, oldest
+    first, in the same transaction: the card is rescheduled from the time it
+    was answered, and deck cursors, quotas and today's plan move on.
+    """
+    if not payload.reviews:
+        return schemas.ReviewUploadResponse(accepted=0, duplicates=0, rejected=0)
+
+    card_ids = {review.card_id for review in payload.reviews}
+    known_ids = set(db.scalars(select(models.Card.id).where(models.Card.id.in_(card_ids))))
+
+    now = datetime.now(UTC).replace(tzinfo=None)
+    rows = [
+        {
+            "id": review.id,
+            "user_id": current_user_id,
+            "card_id": review.card_id,
+            "is_correct": review.is_correct,
+            "response_time_ms": review.response_time_ms,
+            # Don't trust a client clock that runs ahead of ours.
+            "reviewed_at": min(_to_utc_naive(review.reviewed_at), now),
+        }
+        for review in payload.reviews
+        if review.card_id in known_ids
+    ]
+    rejected = len(payload.reviews) - len(rows)
+
+    accepted = 0
+    if rows:
+        stmt = (
+            insert(models.ReviewLog)
+            .values(rows)
+            .on_conflict_do_nothing(index_elements=["id"])
+            .returning(models.ReviewLog.id)
+        )
+        accepted_ids = {row[0] for row in db.execute(stmt).all()}
+        accepted = len(accepted_ids)
+        # Duplicates were already applied when they were first uploaded.
+        for row in sorted((row for row in rows if row["id"] in accepted_ids), key=lambda row: row["reviewed_at"]):
+            answer = schemas.PreviousAnswer(
+                card_id=row["card_id"], is_correct=row["is_correct"], response_time_ms=row["response_time_ms"],
+            )
+            apply_answer(db, current_user_id, answer, answered_at=row["reviewed_at"])
+        db.commit()
+
+    return schemas.ReviewUploadResponse(
+        accepted=accepted,
+        duplicates=len(rows) - accepted,
+        rejected=rejected,
+    )
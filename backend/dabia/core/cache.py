@@ -0,0 +1,293 @@
+import fnmatch
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from typing import Dict, Iterable, Iterator, List, Mapping, Optional, Tuple
+
+from .config import settings
+
+try:
+    import redis
+except ImportError:  # redis is optional; without it only the local backend is available
+    redis = None
+
+# Failures of a networked backend that are served as misses instead of errors.
+# ConnectionError and TimeoutError are OSErrors, which is what the fake raises.
+BACKEND_ERRORS: Tuple[type, ...] = (OSError,) + ((redis.RedisError,) if redis is not None else ())
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    sets: int = 0
+    evictions: int = 0
+    errors: int = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def as_dict(self) -> dict:
+        return {**asdict(self), "hit_ratio": round(self.hit_ratio, 4)}
+
+class CacheBackend(ABC):
+    """
+    Byte-valued cache with per-entry TTLs. Lookups and writes are batched so
+    a networked backend costs one round trip per call, however many keys.
+    Backends implement the underscored methods; the public ones keep stats.
+    """
+
+    def __init__(self, default_ttl: Optional[float] = None):
+        self.default_ttl = default_ttl
+        self.stats = CacheStats()
+        self._stats_lock = threading.Lock()
+
+    @abstractmethod
+    def _get_many(self, keys: List[str]) -> Dict[str, bytes]:
+        pass
+
+    @abstractmethod
+    def _set_many(self, items: Mapping[str, bytes], ttl: Optional[float]) -> None:
+        pass
+
+    @abstractmethod
+    def _delete_many(self, keys: List[str]) -> None:
+        pass
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Drops every entry, e.g. after invalidations may have been missed."""
+
+    def _count(self, **deltas: int) -> None:
+        with self._stats_lock:
+            for name, delta in deltas.items():
+                setattr(self.stats, name, getattr(self.stats, name) + delta)
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, bytes]:
+        """Returns the cached values of `keys`; missing keys are left out."""
+        keys = list(dict.fromkeys(keys))
+        if not keys:
+            return {}
+        found = self._get_many(keys)
+        self._count(hits=len(found), misses=len(keys) - len(found))
+        return found
+
+    def set_many(self, items: Mapping[str, bytes], ttl: Optional[float] = None) -> None:
+        """Stores `items`, expiring after `ttl` seconds (the backend default if None)."""
+        if not items:
+            return
+        self._set_many(items, ttl if ttl is not None else self.default_ttl)
+        self._count(sets=len(items))
+
+    def delete_many(self, keys: Iterable[str]) -> None:
+        keys = list(keys)
+        if keys:
+            self._delete_many(keys)
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self.get_many([key]).get(key)
+
+    def set(self, key: str, value: bytes, ttl: Optional[float] = None) -> None:
+        self.set_many({key: value}, ttl)
+
+    def delete(self, key: str) -> None:
+        self.delete_many([key])
+
+class LocalCache(CacheBackend):
+    """
+    In-process LRU bounded by entry count. Each worker process has its own,
+    so it suits a single instance, or data that is fine to duplicate.
+    """
+
+    def __init__(self, max_entries: int = 10000, default_ttl: Optional[float] = None):
+        super().__init__(default_ttl)
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[bytes, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _get_many(self, keys: List[str]) -> Dict[str, bytes]:
+        now = time.monotonic()
+        found = {}
+        with self._lock:
+            for key in keys:
+                entry = self._entries.get(key)
+                if entry is None:
+                    continue
+                value, expires_at = entry
+                if expires_at <= now:
+                    del self._entries[key]
+                    continue
+                self._entries.move_to_end(key)
+                found[key] = value
+        return found
+
+    def _set_many(self, items: Mapping[str, bytes], ttl: Optional[float]) -> None:
+        expires_at = time.monotonic() + ttl if ttl is not None else float("inf")
+        evicted = 0
+        with self._lock:
+            for key, value in items.items():
+                self._entries[key] = (value, expires_at)
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                evicted += 1
+        if evicted:
+            self._count(evictions=evicted)
+
+    def _delete_many(self, keys: List[str]) -> None:
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+class RedisCache(CacheBackend):
+    """
+    Shared cache on a Redis-compatible server, so every worker on every node
+    sees the same entries. Keys are namespaced with `prefix`. If the server
+    can't be reached, reads are misses and writes are dropped, so callers
+    fall back to the database instead of failing.
+    """
+
+    def __init__(self, client, prefix: str = "dabia:", default_ttl: Optional[float] = None):
+        super().__init__(default_ttl)
+        self.client = client
+        self.prefix = prefix
+
+    def _get_many(self, keys: List[str]) -> Dict[str, bytes]:
+        try:
+            values = self.client.mget([self.prefix + key for key in keys])
+        except BACKEND_ERRORS:
+            self._count(errors=1)
+            return {}
+        return {key: value for key, value in zip(keys, values) if value is not None}
+
+    def _set_many(self, items: Mapping[str, bytes], ttl: Optional[float]) -> None:
+        px = max(int(ttl * 1000), 1) if ttl is not None else None
+        try:
+            pipe = self.client.pipeline(transaction=False)
+            for key, value in items.items():
+                pipe.set(self.prefix + key, value, px=px)
+            pipe.execute()
+        except BACKEND_ERRORS:
+            self._count(errors=1)
+
+    def _delete_many(self, keys: List[str]) -> None:
+        try:
+            self.client.delete(*(self.prefix + key for key in keys))
+        except BACKEND_ERRORS:
+            self._count(errors=1)
+
+    def clear(self) -> None:
+        # SCAN rather than FLUSHDB, so other data on the server is kept.
+        try:
+            batch = []
+            for key in self.client.scan_iter(match=self.prefix + "*", count=1000):
+                batch.append(key)
+                if len(batch) == 1000:
+                    self.client.delete(*batch)
+                    batch = []
+            if batch:
+                self.client.delete(*batch)
+        except BACKEND_ERRORS:
+            self._count(errors=1)
+
+class FakeRedis:
+    """
+    Local stand-in for a Redis client, implementing the commands RedisCache
+    uses. Entries live in a dict shared by every RedisCache built on the same
+    instance, like several workers sharing a server. Set `fail` to simulate
+    an unreachable server.
+    """
+
+    def __init__(self):
+        self.data: Dict[str, Tuple[bytes, float]] = {}
+        self.fail = False
+        self.commands = 0
+        self._lock = threading.Lock()
+
+    def _check(self) -> None:
+        self.commands += 1
+        if self.fail:
+            raise ConnectionError("Cache server unavailable")
+
+    def _live(self, key: str) -> Optional[bytes]:
+        entry = self.data.get(key)
+        if entry is None or entry[1] <= time.monotonic():
+            self.data.pop(key, None)
+            return None
+        return entry[0]
+
+    def mget(self, keys: List[str]) -> List[Optional[bytes]]:
+        with self._lock:
+            self._check()
+            return [self._live(key) for key in keys]
+
+    def set(self, key: str, value: bytes, px: Optional[int] = None) -> None:
+        with self._lock:
+            self._check()
+            self.data[key] = (value, time.monotonic() + px / 1000 if px is not None else float("inf"))
+
+    def delete(self, *keys: str) -> int:
+        with self._lock:
+            self._check()
+            return sum(self.data.pop(key, None) is not None for key in keys)
+
+    def scan_iter(self, match: str = "*", count: int = 10) -> Iterator[str]:
+        with self._lock:
+            self._check()
+            keys = [key for key in self.data if fnmatch.fnmatchcase(key, match)]
+        return iter(keys)
+
+    def pipeline(self, transaction: bool = True) -> "_FakePipeline":
+        return _FakePipeline(self)
+
+class _FakePipeline:
+    def __init__(self, client: FakeRedis):
+        self.client = client
+        self._queued: List[tuple] = []
+
+    def set(self, key: str, value: bytes, px: Optional[int] = None) -> "_FakePipeline":
+        self._queued.append((key, value, px))
+        return self
+
+    def execute(self) -> list:
+        # One round trip for the whole batch, as with a real pipeline.
+        with self.client._lock:
+            self.client._check()
+            for key, value, px in self._queued:
+                self.client.data[key] = (value, time.monotonic() + px / 1000 if px is not None else float("inf"))
+        queued, self._queued = self._queued, []
+        return [True] * len(queued)
+
+def create_cache(
+    url: str = "",
+    max_entries: int = 10000,
+    default_ttl: Optional[float] = None,
+    prefix: str = "dabia:",
+) -> CacheBackend:
+    """
+    Builds the backend for a CACHE_URL: empty for the in-process LRU,
+    `redis://` or `rediss://` for a shared server, `fake://` for FakeRedis.
+    Redis keys are namespaced with `prefix`, so `clear` only drops this cache's.
+    """
+    if not url:
+        return LocalCache(max_entries, default_ttl)
+    if url.startswith("fake://"):
+        return RedisCache(FakeRedis(), prefix=prefix, default_ttl=default_ttl)
+    if url.startswith(("redis://", "rediss://")):
+        if redis is None:
+            raise RuntimeError("CACHE_URL points to Redis, but the redis package is not installed")
+        client = redis.Redis.from_url(url, socket_timeout=0.25, socket_connect_timeout=0.25)
+        return RedisCache(client, prefix=prefix, default_ttl=default_ttl)
+    raise ValueError(f"Unsupported CACHE_URL scheme: {url.split(':', 1)[0]}")
+
+cache = create_cache(settings.CACHE_URL, settings.CACHE_MAX_ENTRIES, settings.CACHE_DEFAULT_TTL_SECONDS)
+
+def get_cache() -> CacheBackend:
+    return cache
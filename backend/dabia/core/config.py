@@ -3,11 +3,64 @@ from pydantic_settings import BaseSettings, SettingsConfigDict
 class Settings(BaseSettings):
     DATABASE_URL: str
 
+    # Optional comma-separated read replica URLs for read-only endpoints
+    DATABASE_REPLICA_URLS: str = ""
+    # How long a replica that failed a connection is kept out of rotation
+    REPLICA_EJECT_SECONDS: int = 30
+    # How long a user's reads are pinned to the primary after a successful
+    # write. Shared across workers only when CACHE_URL points to Redis
+    READ_YOUR_WRITES_SECONDS: int = 10
+
+    # JWT authentication. With neither secret keys nor a JWKS file set, every
+    # request is rejected, unless AUTH_ALLOW_DEFAULT_USER is set, in which case
+    # it is treated as the seeded default user. Local development only
+    AUTH_ALLOW_DEFAULT_USER: bool = False
+    JWT_SECRET_KEYS: str = ""  # comma-separated "kid:secret" pairs for HS256
+    JWT_JWKS_FILE: str = ""  # path to a JWKS file with public keys, re-read on change
+    JWT_ALGORITHMS: str = "RS256,ES256,HS256"
+    JWT_AUDIENCE: str = ""
+    JWT_ISSUER: str = ""
+    JWT_CACHE_SIZE: int = 10000
+
     # Cloud Storage settings
     GCP_BUCKET_NAME: str = "dabia-assets"
     GCP_MEDIA_PATH: str = "medias"
 
+    # Number of upcoming cards whose audio is listed for prefetching with each card
+    AUDIO_PREFETCH_COUNT: int = 5
+
+    # A card is suspended as a leech after this many wrong answers in a row,
+    # or this many in total
+    LEECH_CONSECUTIVE_LAPSES: int = 4
+    LEECH_TOTAL_LAPSES: int = 8
+
+    # Shared cache. Empty for an in-process LRU per worker, or a redis:// URL
+    # so all workers and nodes share one cache
+    CACHE_URL: str = ""
+    CACHE_MAX_ENTRIES: int = 10000
+    CACHE_DEFAULT_TTL_SECONDS: float = 3600
+    # Evict cached cards and decks when they change, via Postgres LISTEN/NOTIFY
+    CACHE_INVALIDATION_ENABLED: bool = True
+
+    # Responses smaller than this many bytes are sent uncompressed
+    COMPRESSION_MINIMUM_SIZE: int = 500
+
+    # On-demand request profiling. Requests with an X-Dabia-Profile header
+    # signed with this secret are profiled, and so is this fraction of all
+    # requests. With neither set the profiler isn't installed at all
+    PROFILING_SECRET: str = ""
+    PROFILING_SAMPLE_RATE: float = 0.0
+    PROFILING_INTERVAL_MS: float = 5
+    PROFILING_DIR: str = "profiles"
+
+    # Local directory for columnar review log archives
+    ARCHIVE_DIR: str = "archive"
+
     model_config = SettingsConfigDict(env_file=".env", extra="ignore")
 
+    @property
+    def replica_urls(self) -> list[str]:
+        return [url.strip() for url in self.DATABASE_REPLICA_URLS.split(",") if url.strip()]
+
 
 settings = Settings()
\ No newline at end of file
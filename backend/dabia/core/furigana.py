@@ -0,0 +1,48 @@
+import html
+import re
+from typing import List, Optional
+
+# Anki furigana markup: `base[ruby]`, where the base runs back to the previous
+# space, tag or ruby. A space only separates bases and is not part of the text.
+FURIGANA_RE = re.compile(r" ?([^ >\[\]]+?)\[([^\[\]]*)\]")
+TAG_RE = re.compile(r"<[^>]*>")
+
+# A sentence as ruby segments: [text] for plain text, [base, ruby] for text
+# with a reading. Kept as lists so it is stored and sent as compact JSON.
+Segments = List[List[str]]
+
+def _clean(text: str) -> str:
+    return html.unescape(TAG_RE.sub("", text))
+
+def parse_furigana(markup: Optional[str]) -> Optional[Segments]:
+    """
+    Parses Anki bracket markup into ruby segments. Readings that repeat their
+    base (`です[です]`) are dropped, and adjacent plain text is merged, so
+    `答[こた]えに<b> 丸[まる]</b>をつける` becomes
+    `[["答", "こた"], ["えに"], ["丸", "まる"], ["をつける"]]`.
+    """
+    if not markup:
+        return None
+
+    segments: Segments = []
+
+    def add_plain(text: str) -> None:
+        text = _clean(text)
+        if not text:
+            return
+        if segments and len(segments[-1]) == 1:
+            segments[-1][0] += text
+        else:
+            segments.append([text])
+
+    position = 0
+    for match in FURIGANA_RE.finditer(markup):
+        add_plain(markup[position:match.start()])
+        base, ruby = _clean(match.group(1)), _clean(match.group(2)).strip()
+        if ruby and ruby != base:
+            segments.append([base, ruby])
+        else:
+            add_plain(base)
+        position = match.end()
+    add_plain(markup[position:])
+    return segments or None
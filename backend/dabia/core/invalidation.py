@@ -0,0 +1,157 @@
+import logging
+import select
+import threading
+from contextlib import contextmanager
+from typing import Iterable, Iterator, List, Optional, Set
+
+import psycopg2
+from sqlalchemy.engine import make_url
+
+from .cache import CacheBackend
+
+logger = logging.getLogger(__name__)
+
+# Postgres channel the cache invalidation triggers notify on. Each payload is
+# "<kind>:<id>,<id>,...", and "<kind>:<id>" is the cache key to evict.
+INVALIDATION_CHANNEL = "dabia_cache_invalidation"
+
+def invalidated_keys(payload: str) -> List[str]:
+    kind, _, ids = payload.partition(":")
+    return [f"{kind}:{id_}" for id_ in ids.split(",") if id_]
+
+class Evictions:
+    """Keys evicted while a load was in flight, or everything after a clear."""
+
+    def __init__(self):
+        self.keys: Set[str] = set()
+        self.everything = False
+
+    def __contains__(self, key: str) -> bool:
+        return self.everything or key in self.keys
+
+class EvictionWatch:
+    """
+    Lets a cache load find out which of its keys were evicted while it was
+    reading the database. Without it, a load that read a row just before a
+    change committed would cache the old value after the change's eviction
+    already ran, and it would be served until the entry expires.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._watching: List[Evictions] = []
+
+    @contextmanager
+    def watch(self) -> Iterator[Evictions]:
+        """Collects evictions from entering the block, so enter it before querying."""
+        evictions = Evictions()
+        with self._lock:
+            self._watching.append(evictions)
+        try:
+            yield evictions
+        finally:
+            with self._lock:
+                self._watching.remove(evictions)
+
+    def evicted(self, keys: Iterable[str]) -> None:
+        keys = list(keys)
+        with self._lock:
+            for evictions in self._watching:
+                evictions.keys.update(keys)
+
+    def cleared(self) -> None:
+        with self._lock:
+            for evictions in self._watching:
+                evictions.everything = True
+
+# Shared by the listener and the card cache's loaders in this process.
+evictions = EvictionWatch()
+
+class InvalidationListener:
+    """
+    Background thread that LISTENs on the invalidation channel and evicts the
+    cache entries of cards and decks changed by any connection, whether the
+    importer, an admin edit or another instance. Notifications sent while the
+    connection is down are lost, so the cache is cleared once listening again
+    after a lost connection or a failed attempt to connect.
+    """
+
+    def __init__(
+        self,
+        database_url: str,
+        cache: CacheBackend,
+        channel: str = INVALIDATION_CHANNEL,
+        poll_interval: float = 5.0,
+        max_backoff: float = 30.0,
+        watch: EvictionWatch = evictions,
+    ):
+        # psycopg2 wants a plain libpq URL, without a SQLAlchemy driver name.
+        self.dsn = make_url(database_url).set(drivername="postgresql").render_as_string(hide_password=False)
+        self.cache = cache
+        self.watch = watch
+        self.channel = channel
+        self.poll_interval = poll_interval
+        self.max_backoff = max_backoff
+        self.evicted = 0
+        self.reconnects = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, name="cache-invalidation", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def handle(self, payload: str) -> None:
+        keys = invalidated_keys(payload)
+        # Loads in flight are told before the delete: one that checks after
+        # this skips or undoes its set, and one that checked before has set
+        # already, so the delete removes its entry.
+        self.watch.evicted(keys)
+        self.cache.delete_many(keys)
+        self.evicted += len(keys)
+
+    def _listen(self, conn, reconnected: bool) -> None:
+        conn.set_session(autocommit=True)
+        with conn.cursor() as cursor:
+            cursor.execute(f'LISTEN "{self.channel}"')
+        if reconnected:
+            # Only once listening, so no change can slip in between.
+            self.reconnects += 1
+            self.watch.cleared()
+            self.cache.clear()
+        while not self._stop.is_set():
+            # Wakes up at least every poll_interval to check for stop().
+            if select.select([conn], [], [], self.poll_interval) == ([], [], []):
+                continue
+            conn.poll()
+            while conn.notifies:
+                self.handle(conn.notifies.pop(0).payload)
+
+    def _run(self) -> None:
+        backoff = 1.0
+        # Whether notifications may have been missed: after a failed connection
+        # attempt, including at startup, or a lost connection.
+        missed = False
+        while not self._stop.is_set():
+            try:
+                conn = psycopg2.connect(self.dsn)
+            except psycopg2.Error as e:
+                logger.warning("Cache invalidation listener can't connect: %s", e)
+                missed = True
+                self._stop.wait(backoff)
+                backoff = min(backoff * 2, self.max_backoff)
+                continue
+            try:
+                self._listen(conn, reconnected=missed)
+            except (psycopg2.Error, OSError) as e:
+                logger.warning("Cache invalidation listener lost its connection: %s", e)
+                self._stop.wait(1.0)
+            finally:
+                conn.close()
+                missed = True
+                backoff = 1.0
@@ -0,0 +1,66 @@
+from contextvars import ContextVar
+from typing import Callable
+
+import msgpack
+from fastapi import Request, Response
+from fastapi.datastructures import DefaultPlaceholder
+from fastapi.responses import JSONResponse
+from fastapi.routing import APIRoute
+
+MSGPACK_MEDIA_TYPES = ("application/msgpack", "application/x-msgpack", "application/vnd.msgpack")
+MSGPACK_MEDIA_TYPE = MSGPACK_MEDIA_TYPES[0]
+
+# Set by NegotiatedRoute while its endpoint runs and its response is built.
+_msgpack_requested: ContextVar[bool] = ContextVar("msgpack_requested", default=False)
+
+def wants_msgpack(request: Request) -> bool:
+    """MessagePack is opt-in: only clients that ask for it by media type get it."""
+    accept = request.headers.get("accept", "").lower()
+    return any(media_type in accept for media_type in MSGPACK_MEDIA_TYPES)
+
+def pack(content, default: Callable = None) -> bytes:
+    return msgpack.packb(content, use_bin_type=True, default=default)
+
+class NegotiatedResponse(JSONResponse):
+    """
+    JSON response that is rendered as MessagePack instead when the request
+    asked for it. Either way it is encoded once, from the endpoint's
+    serialized return value.
+    """
+
+    def __init__(self, content, *args, **kwargs):
+        if _msgpack_requested.get():
+            self.media_type = MSGPACK_MEDIA_TYPE
+        super().__init__(content, *args, **kwargs)
+
+    def render(self, content) -> bytes:
+        if self.media_type == MSGPACK_MEDIA_TYPE:
+            return pack(content)
+        return super().render(content)
+
+class NegotiatedRoute(APIRoute):
+    """
+    Route class that encodes responses as MessagePack when the client sends
+    `Accept: application/msgpack`. Field names and value formats are the
+    same as in the JSON representation. Endpoints that return a Response of
+    their own, such as streaming ones, negotiate on their own.
+    """
+
+    def __init__(self, path: str, endpoint: Callable, **kwargs):
+        if isinstance(kwargs.get("response_class"), (DefaultPlaceholder, type(None))):
+            kwargs["response_class"] = NegotiatedResponse
+        super().__init__(path, endpoint, **kwargs)
+
+    def get_route_handler(self) -> Callable:
+        original_handler = super().get_route_handler()
+
+        async def negotiated_handler(request: Request) -> Response:
+            token = _msgpack_requested.set(wants_msgpack(request))
+            try:
+                response = await original_handler(request)
+            finally:
+                _msgpack_requested.reset(token)
+            response.headers.append("Vary", "Accept")
+            return response
+
+        return negotiated_handler
@@ -0,0 +1,179 @@
+import hashlib
+import hmac
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from functools import lru_cache
+from typing import Optional
+
+import anyio.to_thread
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# A request is profiled if it carries this header with a valid signature, see
+# sign_profile_request. The response then names the profile in the same header.
+PROFILE_HEADER = "X-Dabia-Profile"
+
+# Threads that run request code: the event loop, which the middleware runs
+# on, and the pool that runs sync endpoints and dependencies.
+WORKER_THREAD_NAME = "AnyIO worker thread"
+
+def sign_profile_request(secret: str, path: str, expires: int) -> str:
+    """The header value that asks for a profile of requests to `path` until `expires` (unix time)."""
+    signature = hmac.new(secret.encode(), f"{expires}:{path}".encode(), hashlib.sha256).hexdigest()
+    return f"{expires}.{signature}"
+
+def verify_profile_request(secret: str, path: str, value: str, now: Optional[float] = None) -> bool:
+    expires, _, signature = value.partition(".")
+    if not expires.isdigit() or int(expires) < (time.time() if now is None else now):
+        return False
+    return hmac.compare_digest(sign_profile_request(secret, path, int(expires)), value)
+
+@lru_cache(maxsize=16384)
+def _label(code) -> str:
+    # Collapsed stacks use ";" between frames and the last space before the count.
+    path = "/".join(code.co_filename.split(os.sep)[-2:])
+    return f"{code.co_qualname} ({path}:{code.co_firstlineno})".replace(";", ":")
+
+def _is_idle(frame) -> bool:
+    # An event loop waiting for I/O, or a pool thread waiting for work. Only
+    # the innermost frames are checked: a request waiting for a database
+    # connection also blocks in a queue, but that time belongs in the profile.
+    for _ in range(3):
+        if frame is None:
+            return False
+        name = os.path.basename(frame.f_code.co_filename)
+        if (name, frame.f_code.co_name) == ("selectors.py", "select"):
+            return True
+        if (name, frame.f_code.co_name) == ("queue.py", "get") and frame.f_back is not None:
+            return frame.f_back.f_code.co_name == "run"
+        frame = frame.f_back
+    return False
+
+class StackSampler:
+    """
+    Samples the stacks of the event loop thread and the worker threads every
+    `interval` seconds on a background thread, until stopped. Idle threads are
+    skipped. Threads are shared, so requests served concurrently by the same
+    process show up in the samples too.
+    """
+
+    def __init__(self, loop_thread_id: int, interval: float = 0.005):
+        self.loop_thread_id = loop_thread_id
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="dabia-profiler", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.sample()
+
+    def sample(self) -> None:
+        threads = {self.loop_thread_id: "event loop"}
+        threads.update((t.ident, "worker") for t in threading.enumerate() if t.name == WORKER_THREAD_NAME)
+        frames = sys._current_frames()
+        self.samples += 1
+        for thread_id, root in threads.items():
+            frame = frames.get(thread_id)
+            if frame is None or _is_idle(frame):
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(_label(frame.f_code))
+                frame = frame.f_back
+            stack.append(root)
+            self.stacks[";".join(reversed(stack))] += 1
+
+    def collapsed(self) -> str:
+        """The samples in the collapsed stack format of flamegraph.pl, speedscope and inferno."""
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+class ProfilingMiddleware:
+    """
+    Profiles a request with a StackSampler when it carries a signed
+    X-Dabia-Profile header, or at random for `sample_rate` of requests, and
+    writes the collapsed stacks to `directory`. One request per process is
+    profiled at a time; others pass through untouched. Only add it when
+    profiling is configured, so that it costs nothing otherwise.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        directory: str,
+        secret: str = "",
+        sample_rate: float = 0.0,
+        interval: float = 0.005,
+        max_files: int = 1000,
+    ) -> None:
+        self.app = app
+        self.directory = directory
+        self.secret = secret
+        self.sample_rate = sample_rate
+        self.interval = interval
+        self.max_files = max_files
+        self._busy = threading.Lock()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self.should_profile(scope) or not self._busy.acquire(blocking=False):
+            await self.app(scope, receive, send)
+            return
+
+        name = f"{time.strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:8]}"
+        requested = PROFILE_HEADER in Headers(scope=scope)
+
+        async def send_with_name(message: Message) -> None:
+            if requested and message["type"] == "http.response.start":
+                MutableHeaders(scope=message)[PROFILE_HEADER] = name
+            await send(message)
+
+        sampler = StackSampler(threading.get_ident(), self.interval)
+        started = time.perf_counter()
+        sampler.start()
+        try:
+            await self.app(scope, receive, send_with_name)
+        finally:
+            sampler.stop()
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            try:
+                await anyio.to_thread.run_sync(self.write, scope, name, elapsed_ms, sampler)
+            finally:
+                self._busy.release()
+
+    def should_profile(self, scope: Scope) -> bool:
+        if self.secret:
+            value = Headers(scope=scope).get(PROFILE_HEADER)
+            if value is not None:
+                return verify_profile_request(self.secret, scope["path"], value)
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    def write(self, scope: Scope, name: str, elapsed_ms: float, sampler: StackSampler) -> str:
+        os.makedirs(self.directory, exist_ok=True)
+        slug = scope["path"].strip("/").replace("/", "_") or "root"
+        path = os.path.join(self.directory, f"{name}-{scope['method']}-{slug}-{elapsed_ms:.0f}ms.collapsed")
+        with open(path, "w") as f:
+            f.write(sampler.collapsed())
+        self._prune()
+        return path
+
+    def _prune(self) -> None:
+        profiles = sorted(
+            (entry.stat().st_mtime, entry.path)
+            for entry in os.scandir(self.directory)
+            if entry.name.endswith(".collapsed")
+        )
+        for _, path in profiles[:max(0, len(profiles) - self.max_files)]:
+            os.remove(path)
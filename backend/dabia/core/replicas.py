@@ -0,0 +1,134 @@
+import itertools
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from typing import List, Optional
+
+from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import sessionmaker, Session
+from starlette.concurrency import run_in_threadpool
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from dabia.core.cache import CacheBackend, create_cache
+from dabia.core.config import settings
+
+UNSAFE_METHODS = ("POST", "PUT", "PATCH", "DELETE")
+
+@dataclass
+class Replica:
+    url: str
+    engine: Engine
+    SessionLocal: sessionmaker
+    ejected_until: float = 0.0
+    failures: int = 0
+
+    def is_healthy(self, now: float) -> bool:
+        return self.ejected_until <= now
+
+class ReplicaPool:
+    """
+    Round-robin over read replicas. A replica that fails to hand out a
+    connection is ejected for `eject_seconds` and then tried again.
+    """
+
+    def __init__(self, urls: List[str], eject_seconds: float = 30.0):
+        self.eject_seconds = eject_seconds
+        self.replicas = []
+        for url in urls:
+            engine = create_engine(url, pool_pre_ping=True)
+            SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+            self.replicas.append(Replica(url=url, engine=engine, SessionLocal=SessionLocal))
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+
+    def candidates(self) -> List[Replica]:
+        """Healthy replicas, starting from the next one in round-robin order."""
+        if not self.replicas:
+            return []
+        now = time.monotonic()
+        with self._lock:
+            start = next(self._counter) % len(self.replicas)
+        ordered = self.replicas[start:] + self.replicas[:start]
+        return [replica for replica in ordered if replica.is_healthy(now)]
+
+    def eject(self, replica: Replica) -> None:
+        with self._lock:
+            replica.failures += 1
+            replica.ejected_until = time.monotonic() + self.eject_seconds
+
+    def open_session(self) -> Optional[Session]:
+        """
+        Returns a session on the first healthy replica that accepts a
+        connection, or None when every replica is down or ejected.
+        """
+        for replica in self.candidates():
+            db = replica.SessionLocal()
+            try:
+                # Check out the connection now so a dead replica is detected
+                # here rather than halfway through the endpoint.
+                db.connection()
+            except Exception:
+                db.close()
+                self.eject(replica)
+                continue
+            replica.failures = 0
+            return db
+        return None
+
+class RecentWrites:
+    """
+    Users who made a successful write in the last `window_seconds`. Their
+    reads go to the primary, so they see their own writes despite replication
+    lag. Kept in a cache backend: with a Redis CACHE_URL every worker and node
+    sees the same marks; with the in-process LRU, only the worker that served
+    the write does.
+    """
+
+    def __init__(self, store: CacheBackend, window_seconds: float = 10):
+        self.store = store
+        self.window_seconds = window_seconds
+
+    @staticmethod
+    def _key(user_id: uuid.UUID) -> str:
+        return f"rw:{user_id}"
+
+    def mark(self, user_id: uuid.UUID) -> None:
+        self.store.set(self._key(user_id), b"1", self.window_seconds)
+
+    def recently_wrote(self, user_id: uuid.UUID) -> bool:
+        return self.store.get(self._key(user_id)) is not None
+
+# A separate cache from the card cache, so its stats and clear() don't mix.
+recent_writes = RecentWrites(
+    create_cache(settings.CACHE_URL, settings.CACHE_MAX_ENTRIES, prefix="dabia-rw:"),
+    settings.READ_YOUR_WRITES_SECONDS,
+)
+
+class ReadYourWritesMiddleware:
+    """
+    Marks the authenticated user of each successful write in `recent_writes`,
+    so `get_read_db` keeps routing their reads to the primary until replicas
+    catch up. The user is the one `get_current_user_id` resolved for the
+    request; unauthenticated requests aren't marked.
+    """
+
+    def __init__(self, app: ASGIApp, writes: Optional[RecentWrites] = None):
+        self.app = app
+        self.writes = writes or recent_writes
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] not in UNSAFE_METHODS:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_marker(message: Message) -> None:
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                user_id = scope.get("state", {}).get("user_id")
+                if user_id is not None:
+                    # Off the event loop, as a Redis round trip may block.
+                    await run_in_threadpool(self.writes.mark, user_id)
+            await send(message)
+
+        await self.app(scope, receive, send_with_marker)
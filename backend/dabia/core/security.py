@@ -0,0 +1,215 @@
+import base64
+import hashlib
+import json
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+import jwt
+from fastapi import Depends, HTTPException, status
+from starlette.requests import HTTPConnection
+
+from .config import settings
+
+# The user seeded by the `seed_default_user` migration. Used in local
+# development, when AUTH_ALLOW_DEFAULT_USER is set and no keys are configured.
+DEFAULT_USER_ID = uuid.UUID("00000000-0000-0000-0000-000000000000")
+
+class KeyRing:
+    """
+    Verification keys by `kid`: shared HMAC secrets from settings plus public
+    keys from a local JWKS file. The file is re-read when it changes, so keys
+    can be rotated without a restart. Each key is a PyJWK bound to a single
+    algorithm: HS256 for secrets, the JWK's `alg` (or the default for its key
+    type) for file keys.
+    """
+
+    def __init__(self, secret_keys: str = "", jwks_file: str = "", reload_interval: float = 30.0):
+        self.jwks_file = jwks_file
+        self.reload_interval = reload_interval
+        self._static: Dict[str, jwt.PyJWK] = {}
+        for entry in filter(None, (part.strip() for part in secret_keys.split(","))):
+            kid, _, secret = entry.partition(":")
+            encoded = base64.urlsafe_b64encode(secret.encode()).rstrip(b"=").decode()
+            self._static[kid] = jwt.PyJWK({"kty": "oct", "k": encoded, "kid": kid}, algorithm="HS256")
+        self._jwks: Dict[str, jwt.PyJWK] = {}
+        self._jwks_mtime: Optional[float] = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self._static or self.jwks_file)
+
+    def _maybe_reload(self) -> None:
+        now = time.monotonic()
+        if not self.jwks_file or now - self._checked_at < self.reload_interval:
+            return
+        with self._lock:
+            self._checked_at = now
+            try:
+                mtime = os.stat(self.jwks_file).st_mtime
+            except OSError:
+                return
+            if mtime == self._jwks_mtime:
+                return
+            with open(self.jwks_file) as f:
+                jwk_set = jwt.PyJWKSet.from_dict(json.load(f))
+            self._jwks = {key.key_id: key for key in jwk_set.keys}
+            self._jwks_mtime = mtime
+
+    def get(self, kid: Optional[str]) -> Optional[jwt.PyJWK]:
+        self._maybe_reload()
+        key = self._static.get(kid, self._jwks.get(kid))
+        if key is None and kid is None and len(self._static) + len(self._jwks) == 1:
+            # Tokens without a kid are accepted only when there is a single key.
+            key = next(iter({**self._static, **self._jwks}.values()))
+        return key
+
+class VerifiedTokenCache:
+    """
+    Bounded LRU of already-verified tokens, keyed by a hash of the token so
+    raw credentials are never held in memory. Entries expire with the token.
+    """
+
+    def __init__(self, max_size: int = 10000):
+        self.max_size = max_size
+        self._entries: "OrderedDict[bytes, Tuple[uuid.UUID, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+
+    def get(self, key: bytes) -> Optional[uuid.UUID]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            user_id, expires_at = entry
+            if expires_at <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return user_id
+
+    def put(self, key: bytes, user_id: uuid.UUID, expires_at: float) -> None:
+        with self._lock:
+            self._entries[key] = (user_id, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+class TokenVerifier:
+    def __init__(
+        self,
+        keys: KeyRing,
+        cache: VerifiedTokenCache,
+        algorithms,
+        audience: str = "",
+        issuer: str = "",
+        allow_default_user: bool = False,
+    ):
+        self.keys = keys
+        self.cache = cache
+        self.algorithms = list(algorithms)
+        self.audience = audience or None
+        self.issuer = issuer or None
+        self.allow_default_user = allow_default_user
+
+    def verify(self, token: str) -> uuid.UUID:
+        """
+        Returns the user id (`sub` claim) of a valid token. Signatures are only
+        checked the first time a token is seen; after that the cached result
+        is used until the token expires. A token is only checked with the
+        algorithm of the key its `kid` names, and that algorithm must also be
+        in JWT_ALGORITHMS.
+        """
+        cache_key = self.cache.key(token)
+        user_id = self.cache.get(cache_key)
+        if user_id is not None:
+            return user_id
+
+        try:
+            header = jwt.get_unverified_header(token)
+            key = self.keys.get(header.get("kid"))
+            if key is None:
+                raise jwt.InvalidKeyError("Unknown signing key")
+            if header.get("alg") != key.algorithm_name or key.algorithm_name not in self.algorithms:
+                raise jwt.InvalidAlgorithmError("Algorithm not allowed for this key")
+            claims = jwt.decode(
+                token,
+                key,
+                algorithms=[key.algorithm_name],
+                audience=self.audience,
+                issuer=self.issuer,
+                options={"require": ["exp", "sub"]},
+            )
+            user_id = uuid.UUID(claims["sub"])
+        except (jwt.PyJWTError, ValueError, TypeError, KeyError):
+            # Malformed keys or claims must not turn into a 500, and the
+            # reason is not disclosed to the client.
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Invalid token",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+
+        self.cache.put(cache_key, user_id, float(claims["exp"]))
+        return user_id
+
+token_verifier = TokenVerifier(
+    keys=KeyRing(settings.JWT_SECRET_KEYS, settings.JWT_JWKS_FILE),
+    cache=VerifiedTokenCache(settings.JWT_CACHE_SIZE),
+    algorithms=[alg.strip() for alg in settings.JWT_ALGORITHMS.split(",")],
+    audience=settings.JWT_AUDIENCE,
+    issuer=settings.JWT_ISSUER,
+    allow_default_user=settings.AUTH_ALLOW_DEFAULT_USER,
+)
+
+def get_token_verifier() -> TokenVerifier:
+    return token_verifier
+
+def _extract_token(connection: HTTPConnection) -> Optional[str]:
+    scheme, _, credentials = connection.headers.get("authorization", "").partition(" ")
+    if scheme.lower() == "bearer" and credentials:
+        return credentials
+    # Browsers can't set headers on WebSocket handshakes.
+    if connection.scope["type"] == "websocket":
+        return connection.query_params.get("access_token")
+    return None
+
+async def get_current_user_id(
+    connection: HTTPConnection,
+    verifier: TokenVerifier = Depends(get_token_verifier),
+) -> uuid.UUID:
+    """
+    Resolves the user from a Bearer JWT, verified locally against the
+    configured keys. The users table is never queried on this path. Without
+    keys every request is rejected, unless the default development user is
+    explicitly allowed. The user is also recorded in the request state, for
+    middlewares such as `ReadYourWritesMiddleware`.
+    """
+    if not verifier.keys.enabled:
+        if verifier.allow_default_user:
+            connection.state.user_id = DEFAULT_USER_ID
+            return DEFAULT_USER_ID
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+    token = _extract_token(connection)
+    if not token:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    user_id = verifier.verify(token)
+    connection.state.user_id = user_id
+    return user_id
@@ -0,0 +1,74 @@
+import threading
+from concurrent.futures import Future
+from dataclasses import asdict, dataclass
+from typing import Callable, Dict, Hashable, Iterable, List, Mapping, Optional, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+@dataclass
+class FlightStats:
+    # Keys loaded by a caller, and keys that waited for another caller's load.
+    loads: int = 0
+    coalesced: int = 0
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+class SingleFlight:
+    """
+    Coalesces concurrent loads of the same keys across threads: while a key
+    is being loaded, other callers wait for that load instead of starting
+    their own. Meant for cold cache misses, where many requests for the same
+    hot cards arrive at once. Keys the loader doesn't return resolve to None.
+    """
+
+    def __init__(self):
+        self.stats = FlightStats()
+        self._lock = threading.Lock()
+        self._in_flight: Dict[Hashable, Future] = {}
+
+    def do_many(self, keys: Iterable[K], load: Callable[[List[K]], Mapping[K, V]]) -> Dict[K, V]:
+        """Loads `keys` with `load(missing_keys)`, sharing in-flight loads."""
+        claimed: Dict[K, Future] = {}
+        waiting: Dict[K, Future] = {}
+        with self._lock:
+            for key in dict.fromkeys(keys):
+                future = self._in_flight.get(key)
+                if future is None:
+                    claimed[key] = self._in_flight[key] = Future()
+                else:
+                    waiting[key] = future
+            self.stats.loads += len(claimed)
+            self.stats.coalesced += len(waiting)
+
+        results: Dict[K, V] = {}
+        # Our own load finishes before we wait on anyone else's, so two
+        # callers waiting on each other's keys can't deadlock.
+        if claimed:
+            try:
+                loaded = load(list(claimed))
+            except BaseException as e:
+                self._settle(claimed, error=e)
+                raise
+            self._settle(claimed, loaded=loaded)
+            results.update((key, loaded[key]) for key in claimed if key in loaded)
+
+        for key, future in waiting.items():
+            value = future.result()
+            if value is not None:
+                results[key] = value
+        return results
+
+    def _settle(self, claimed: Dict[K, Future], loaded: Optional[Mapping] = None, error: Optional[BaseException] = None) -> None:
+        with self._lock:
+            for key in claimed:
+                del self._in_flight[key]
+        for key, future in claimed.items():
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(loaded.get(key))
+
+    def do(self, key: K, load: Callable[[], V]) -> V:
+        return self.do_many([key], lambda keys: {key: load()}).get(key)
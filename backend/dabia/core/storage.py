@@ -1,4 +1,6 @@
 from abc import ABC, abstractmethod
+from typing import Dict, Iterable
+
 from .config import settings
 
 class StorageProvider(ABC):
@@ -9,6 +11,13 @@ class StorageProvider(ABC):
         """
         pass
 
+    def get_urls(self, filenames: Iterable[str]) -> Dict[str, str]:
+        """
+        Generates the URLs of many files at once. Providers that sign URLs or
+        look files up remotely should override this with a single batch call.
+        """
+        return {filename: self.get_url(filename) for filename in filenames}
+
 class GCPStorageProvider(StorageProvider):
     def __init__(self, bucket_name: str, media_path: str = "medias"):
         self.bucket_name = bucket_name
@@ -20,6 +29,10 @@ class GCPStorageProvider(StorageProvider):
             return ""
         return f"{self.base_url}/{self.media_path}/{filename}"
 
+    def get_urls(self, filenames: Iterable[str]) -> Dict[str, str]:
+        prefix = f"{self.base_url}/{self.media_path}/"
+        return {filename: prefix + filename if filename else "" for filename in filenames}
+
 def get_storage_provider() -> StorageProvider:
     # For now, we are hardcoding GCP, but this can be extended
     # to read from settings.STORAGE_PROVIDER and return different providers.
@@ -1,22 +1,50 @@
+import uuid
+
+from fastapi import Depends
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, Session
 
 from dabia.core.config import settings
+from dabia.core.replicas import ReplicaPool, recent_writes
+from dabia.core.security import get_current_user_id
 
 # Initialize engine as None. It will be created on the first request.
 engine = None
 SessionLocal: sessionmaker[Session] | None = None
+replica_pool: ReplicaPool | None = None
 
-def get_db():
-    global engine, SessionLocal
-    
-    # Create engine and session factory only on the first call
+def _init_engines():
+    global engine, SessionLocal, replica_pool
+
+    # Create engines and session factories only on the first call
     if engine is None or SessionLocal is None:
         engine = create_engine(settings.DATABASE_URL, pool_pre_ping=True)
         SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+        replica_pool = ReplicaPool(settings.replica_urls, eject_seconds=settings.REPLICA_EJECT_SECONDS)
+
+def get_db():
+    _init_engines()
 
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+def get_read_db(user_id: uuid.UUID = Depends(get_current_user_id)):
+    """
+    Session for read-only endpoints. Reads go to a healthy replica when any are
+    configured, and to the primary when none are, when all are down, or when
+    this user wrote something in the last few seconds (read-your-writes).
+    """
+    _init_engines()
+
+    db = None
+    if not recent_writes.recently_wrote(user_id):
+        db = replica_pool.open_session()
+    if db is None:
+        db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
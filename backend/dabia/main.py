@@ -1,3 +1,5 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI, Depends
 from fastapi.middleware.cors import CORSMiddleware
 from sqlalchemy.orm import Session
@@ -6,8 +8,19 @@ from alembic.config import Config
 from alembic import command
 import os
 
+from dabia.core.cache import cache
+from dabia.core.compression import CompressionMiddleware
+from dabia.core.invalidation import InvalidationListener
+from dabia.core.profiling import ProfilingMiddleware
+from dabia.core.config import settings
+from dabia.core.replicas import ReadYourWritesMiddleware
 from dabia.database import get_db
 from dabia.api.v1 import session as session_router
+from dabia.api.v1 import cards as cards_router
+from dabia.api.v1 import decks as decks_router
+from dabia.api.v1 import sync as sync_router
+from dabia.api.v1 import export as export_router
+from dabia.services.card_cache import card_loads, deck_loads
 
 def run_migrations():
     print("Running migrations...")
@@ -29,7 +42,19 @@ def run_migrations():
 # Run migrations on startup
 run_migrations()
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Evict cached cards and decks as soon as they change in the database.
+    listener = None
+    if settings.CACHE_INVALIDATION_ENABLED:
+        listener = InvalidationListener(settings.DATABASE_URL, cache)
+        listener.start()
+    yield
+    if listener is not None:
+        listener.stop()
+
 app = FastAPI(
+    lifespan=lifespan,
     title="Dabia API",
     description="API for the Dabia language learning platform.",
     version="0.1.0",
@@ -50,9 +75,29 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Pin clients to the primary database for a few seconds after they write.
+app.add_middleware(ReadYourWritesMiddleware)
+
+# Compress responses (brotli or gzip) above a small size threshold.
+app.add_middleware(CompressionMiddleware, minimum_size=settings.COMPRESSION_MINIMUM_SIZE)
+
+# Sample the stacks of signed or randomly chosen requests, only if configured.
+if settings.PROFILING_SECRET or settings.PROFILING_SAMPLE_RATE > 0:
+    app.add_middleware(
+        ProfilingMiddleware,
+        directory=settings.PROFILING_DIR,
+        secret=settings.PROFILING_SECRET,
+        sample_rate=settings.PROFILING_SAMPLE_RATE,
+        interval=settings.PROFILING_INTERVAL_MS / 1000,
+    )
+
 
 # Include routers
 app.include_router(session_router.router, prefix="/api/v1/session", tags=["Session"])
+app.include_router(cards_router.router, prefix="/api/v1/cards", tags=["Cards"])
+app.include_router(decks_router.router, prefix="/api/v1/decks", tags=["Decks"])
+app.include_router(sync_router.router, prefix="/api/v1/sync", tags=["Sync"])
+app.include_router(export_router.router, prefix="/api/v1/export", tags=["Export"])
 
 
 @app.get("/")
@@ -65,4 +110,8 @@ def health_check(db: Session = Depends(get_db)):
     # This endpoint will try to connect to the database and execute a simple query.
     # If it returns successfully, it means the database connection is working.
     db.execute(text("SELECT 1"))
-    return {"status": "ok"}
+    return {
+        "status": "ok",
+        "cache": cache.stats.as_dict(),
+        "loads": {"cards": card_loads.stats.as_dict(), "decks": deck_loads.stats.as_dict()},
+    }
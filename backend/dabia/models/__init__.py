@@ -2,7 +2,11 @@ from .base import Base
 from .deck import Deck
 from .user import User
 from .card import Card
+from .card_distractor import CardDistractor
+from .media_asset import MediaAsset
 from .review_log import ReviewLog
+from .study_plan_entry import StudyPlanEntry
 from .user_card_association import UserCardAssociation
+from .user_deck import UserDeck
 
-__all__ = ["Base", "Deck", "User", "Card", "ReviewLog", "UserCardAssociation"]
+__all__ = ["Base", "Deck", "User", "Card", "CardDistractor", "MediaAsset", "ReviewLog", "StudyPlanEntry", "UserCardAssociation", "UserDeck"]
@@ -1,16 +1,44 @@
 import uuid
-from sqlalchemy import Column, String, DateTime, func, ForeignKey
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import Column, String, DateTime, BigInteger, Identity, func, ForeignKey, Index
+from sqlalchemy.dialects.postgresql import JSONB, UUID
 from sqlalchemy.orm import relationship
 
 from dabia.models.base import Base
 
+# Columns covered by the card search endpoint. Each one gets a pg_trgm GIN
+# index so substring matches on Japanese text don't need a sequential scan.
+SEARCH_COLUMNS = ("target_word", "reading", "hint", "sentence", "sentence_translation")
+
 class Card(Base):
     __tablename__ = "cards"
+    __table_args__ = tuple(
+        Index(
+            f"ix_cards_{column}_trgm",
+            column,
+            postgresql_using="gin",
+            postgresql_ops={column: "gin_trgm_ops"},
+        )
+        for column in SEARCH_COLUMNS
+    ) + (
+        # Queries shorter than a trigram (a single kanji, two kana) can't use
+        # the GIN indexes, so they fall back to prefix matches on these.
+        Index("ix_cards_target_word_prefix", "target_word", postgresql_ops={"target_word": "varchar_pattern_ops"}),
+        Index("ix_cards_reading_prefix", "reading", postgresql_ops={"reading": "varchar_pattern_ops"}),
+        # Keyset index for delta sync: (updated_at, id) > client cursor.
+        Index("ix_cards_updated_at_id", "updated_at", "id"),
+        # Keyset index for introducing new cards: (order_key, id) > user's cursor.
+        Index("ix_cards_deck_id_order_key", "deck_id", "order_key", "id"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     deck_id = Column(UUID(as_uuid=True), ForeignKey("decks.id"), nullable=False, index=True)
     guid = Column(String, unique=True, index=True, nullable=True)
+    # Position within the deck in which new cards are introduced, e.g. the
+    # word's frequency rank. Cards created without one get the next value of
+    # a table-wide identity, unrelated to the deck's other keys, so importers
+    # should set it: scripts/import_data.py keys new cards after the deck's
+    # current max(order_key).
+    order_key = Column(BigInteger, Identity(always=False), nullable=False)
 
     sentence_template = Column(String, nullable=False)
     target_word = Column(String, nullable=False)
@@ -20,6 +48,9 @@ class Card(Base):
 
     sentence = Column(String)
     sentence_furigana = Column(String)
+    # sentence_furigana parsed into ruby segments by dabia.core.furigana at
+    # import time, so neither the server nor clients parse it per render.
+    sentence_segments = Column(JSONB)
     sentence_translation = Column(String)
     sentence_audio_url = Column(String)
 
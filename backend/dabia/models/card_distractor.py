@@ -0,0 +1,20 @@
+from sqlalchemy import Column, String, DateTime, func, ForeignKey
+from sqlalchemy.dialects.postgresql import UUID, ARRAY
+from sqlalchemy.orm import relationship
+
+from dabia.models.base import Base
+
+class CardDistractor(Base):
+    """
+    Precomputed wrong answers for multiple-choice mode, best first. One row
+    per card, so serving them is a primary-key join. Rebuilt offline by
+    `scripts/build_distractors.py` and after each import.
+    """
+    __tablename__ = "card_distractors"
+
+    card_id = Column(UUID(as_uuid=True), ForeignKey("cards.id", ondelete="CASCADE"), primary_key=True)
+    words = Column(ARRAY(String), nullable=False)
+
+    computed_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
+
+    card = relationship("Card")
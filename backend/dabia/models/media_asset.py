@@ -0,0 +1,19 @@
+from sqlalchemy import Column, String, DateTime, BigInteger, func
+
+from dabia.models.base import Base
+
+class MediaAsset(Base):
+    """
+    A media file referenced by cards, keyed by the filename stored in
+    `cards.audio_url` and `cards.sentence_audio_url`. The content hash and
+    size are recorded by the importer, so clients can prefetch audio and
+    keep it cached across sessions.
+    """
+    __tablename__ = "media_assets"
+
+    filename = Column(String, primary_key=True)
+    content_hash = Column(String, nullable=False)  # sha256, hex
+    size_bytes = Column(BigInteger, nullable=False)
+    content_type = Column(String)
+
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
@@ -1,5 +1,5 @@
 import uuid
-from sqlalchemy import Column, Boolean, Integer, DateTime, func, ForeignKey
+from sqlalchemy import Column, Boolean, Integer, DateTime, func, ForeignKey, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 
@@ -7,6 +7,13 @@ from dabia.models.base import Base
 
 class ReviewLog(Base):
     __tablename__ = "review_logs"
+    __table_args__ = (
+        # Serves per-user date-range scans: daily progress counts and exports.
+        Index("ix_review_logs_user_id_reviewed_at", "user_id", "reviewed_at"),
+        # Tiny and cheap to maintain on an append-mostly table; lets the
+        # archiver find old months without a sequential scan.
+        Index("ix_review_logs_reviewed_at_brin", "reviewed_at", postgresql_using="brin"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False, index=True)
@@ -0,0 +1,25 @@
+from sqlalchemy import Column, Boolean, Date, DateTime, Integer, ForeignKey
+from sqlalchemy.dialects.postgresql import UUID
+
+from dabia.models.base import Base
+
+class StudyPlanEntry(Base):
+    """
+    A card in a user's study plan for a day. Plans are built off-peak by
+    `scripts/build_study_plans.py`, so `/next-card` only reads the first due
+    entry of the user's plan. Answering a card removes its entry, or moves it
+    back as a review if it is due again the same day.
+    """
+    __tablename__ = "study_plan_entries"
+
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    plan_date = Column(Date, primary_key=True)
+    card_id = Column(UUID(as_uuid=True), ForeignKey("cards.id", ondelete="CASCADE"), primary_key=True)
+    deck_id = Column(UUID(as_uuid=True), ForeignKey("decks.id", ondelete="CASCADE"), nullable=False)
+
+    # Served in (is_new, due_at, position) order, once due_at has passed:
+    # reviews first, most overdue first, then new cards taking turns between
+    # decks, as the interleaving scheduler would pick them.
+    is_new = Column(Boolean, nullable=False)
+    due_at = Column(DateTime, nullable=False)
+    position = Column(Integer, nullable=False)
@@ -17,3 +17,4 @@ class User(Base):
 
     review_logs = relationship("ReviewLog", back_populates="user")
     cards = relationship("UserCardAssociation", back_populates="user")
+    decks = relationship("UserDeck", back_populates="user")
@@ -1,18 +1,50 @@
-from sqlalchemy import Column, Integer, DateTime, func, ForeignKey, UniqueConstraint
+from sqlalchemy import Column, Integer, Boolean, DateTime, func, ForeignKey, Index, false, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 
 from dabia.models.base import Base
 
 class UserCardAssociation(Base):
+    # Hash-partitioned by user_id once scripts/partition_associations.py has
+    # swapped it in. Every query must filter on user_id, so that it is pruned
+    # to a single partition.
     __tablename__ = "user_card_associations"
+    __table_args__ = (
+        Index("ix_user_card_associations_user_id_updated_at", "user_id", "updated_at", "card_id"),
+        Index("ix_user_card_associations_user_id_next_review_at", "user_id", "next_review_at"),
+        # Per-deck due windows for the interleaving scheduler. Suspended cards
+        # are left out, so they never cost anything in due-card selection.
+        Index(
+            "ix_user_card_associations_user_id_deck_id_next_review_at",
+            "user_id",
+            "deck_id",
+            "next_review_at",
+            postgresql_where=text("NOT is_suspended"),
+        ),
+        # The user's leeches, most recently suspended first.
+        Index(
+            "ix_user_card_associations_user_id_suspended_at",
+            "user_id",
+            "suspended_at",
+            postgresql_where=text("is_suspended"),
+        ),
+    )
 
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), primary_key=True)
     card_id = Column(UUID(as_uuid=True), ForeignKey("cards.id"), primary_key=True)
+    # Copied from the card so due reviews can be looked up per deck.
+    deck_id = Column(UUID(as_uuid=True), ForeignKey("decks.id"), nullable=False)
 
     proficiency_level = Column(Integer, default=0, nullable=False)
     next_review_at = Column(DateTime, default=func.now(), nullable=False)
 
+    # Wrong answers after the first one. The consecutive count resets on a
+    # correct answer; crossing either leech threshold suspends the card.
+    consecutive_lapses = Column(Integer, default=0, server_default="0", nullable=False)
+    total_lapses = Column(Integer, default=0, server_default="0", nullable=False)
+    is_suspended = Column(Boolean, default=False, server_default=false(), nullable=False)
+    suspended_at = Column(DateTime)
+
     created_at = Column(DateTime, server_default=func.now())
     updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
 
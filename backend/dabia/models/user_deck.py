@@ -0,0 +1,36 @@
+from sqlalchemy import Column, BigInteger, Boolean, Date, DateTime, Integer, func, ForeignKey, true
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import relationship
+
+from dabia.models.base import Base
+
+DEFAULT_NEW_CARDS_PER_DAY = 20
+DEFAULT_REVIEWS_PER_DAY = 200
+
+class UserDeck(Base):
+    """
+    A user's enrollment, settings and progress for a deck. Only decks with an
+    active row are studied.
+    """
+    __tablename__ = "user_decks"
+
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), primary_key=True)
+    deck_id = Column(UUID(as_uuid=True), ForeignKey("decks.id"), primary_key=True)
+
+    # (order_key, id) of the last new card introduced. Cards after it are unseen.
+    new_cursor_order_key = Column(BigInteger)
+    new_cursor_card_id = Column(UUID(as_uuid=True))
+
+    is_active = Column(Boolean, nullable=False, default=True, server_default=true())
+    new_cards_per_day = Column(Integer, nullable=False, default=DEFAULT_NEW_CARDS_PER_DAY, server_default=str(DEFAULT_NEW_CARDS_PER_DAY))
+    reviews_per_day = Column(Integer, nullable=False, default=DEFAULT_REVIEWS_PER_DAY, server_default=str(DEFAULT_REVIEWS_PER_DAY))
+    # Answers counted against today's quotas; reset when counted_on is not today.
+    new_today = Column(Integer, nullable=False, default=0, server_default="0")
+    reviews_today = Column(Integer, nullable=False, default=0, server_default="0")
+    counted_on = Column(Date)
+
+    created_at = Column(DateTime, server_default=func.now())
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
+
+    user = relationship("User", back_populates="decks")
+    deck = relationship("Deck")
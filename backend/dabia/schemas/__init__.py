@@ -3,15 +3,43 @@ from .session import (
     CardTarget,
     DeckInfo,
     Card,
+    AudioAsset,
     SessionProgress,
     NextCardResponse,
 )
+from .search import (
+    CardSearchResult,
+    CardSearchResponse,
+)
+from .decks import (
+    DeckEnrollmentRequest,
+    DeckEnrollmentResponse,
+)
+from .leeches import (
+    Leech,
+    LeechListResponse,
+)
+from .sync import (
+    OfflineReview,
+    ReviewUploadRequest,
+    ReviewUploadResponse,
+)
 
 __all__ = [
     "PreviousAnswer",
     "CardTarget",
     "DeckInfo",
     "Card",
+    "AudioAsset",
     "SessionProgress",
     "NextCardResponse",
+    "CardSearchResult",
+    "CardSearchResponse",
+    "DeckEnrollmentRequest",
+    "DeckEnrollmentResponse",
+    "Leech",
+    "LeechListResponse",
+    "OfflineReview",
+    "ReviewUploadRequest",
+    "ReviewUploadResponse",
 ]
@@ -0,0 +1,16 @@
+from pydantic import BaseModel, Field
+from typing import Literal, Optional
+import uuid
+
+class DeckEnrollmentRequest(BaseModel):
+    mode: Literal["lazy", "eager"] = "lazy"
+    new_cards_per_day: Optional[int] = Field(None, ge=0, le=1000)
+    reviews_per_day: Optional[int] = Field(None, ge=0, le=10000)
+
+class DeckEnrollmentResponse(BaseModel):
+    deck_id: uuid.UUID
+    mode: Literal["lazy", "eager"]
+    is_active: bool
+    new_cards_per_day: int
+    reviews_per_day: int
+    enrolled_cards: int
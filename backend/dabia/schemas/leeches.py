@@ -0,0 +1,18 @@
+from pydantic import BaseModel
+from datetime import datetime
+from typing import List, Optional
+import uuid
+
+from .session import DeckInfo, CardTarget
+
+class Leech(BaseModel):
+    card_id: uuid.UUID
+    deck: DeckInfo
+    target: CardTarget
+    reading: Optional[str] = None
+    consecutive_lapses: int
+    total_lapses: int
+    suspended_at: Optional[datetime] = None
+
+class LeechListResponse(BaseModel):
+    leeches: List[Leech]
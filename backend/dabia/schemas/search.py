@@ -0,0 +1,18 @@
+from pydantic import BaseModel
+from typing import List, Optional
+import uuid
+
+from .session import DeckInfo, CardTarget
+
+class CardSearchResult(BaseModel):
+    card_id: uuid.UUID
+    deck: DeckInfo
+    target: CardTarget
+    reading: Optional[str] = None
+    sentence: Optional[str] = None
+    sentence_translation: Optional[str] = None
+    score: float
+
+class CardSearchResponse(BaseModel):
+    query: str
+    results: List[CardSearchResult]
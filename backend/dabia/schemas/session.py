@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field, ConfigDict
-from typing import Optional
+from typing import List, Optional
 import uuid
 
 class PreviousAnswer(BaseModel):
@@ -29,10 +29,21 @@ class Card(BaseModel):
     audio_url: Optional[str] = None
     sentence: Optional[str] = None
     sentence_furigana: Optional[str] = None
+    # sentence_furigana as [text] and [base, ruby] segments, parsed at import.
+    sentence_segments: Optional[List[List[str]]] = None
     sentence_translation: Optional[str] = None
     sentence_audio_url: Optional[str] = None
+    # Wrong answers for multiple-choice mode; shuffle them with target.word.
+    distractors: Optional[List[str]] = None
     proficiency_level: int
 
+class AudioAsset(BaseModel):
+    url: str
+    # sha256 and size of the file, recorded at import. Unknown for files the
+    # importer couldn't read.
+    content_hash: Optional[str] = None
+    size_bytes: Optional[int] = None
+
 class SessionProgress(BaseModel):
     completed_today: int
     goal_today: int
@@ -40,3 +51,5 @@ class SessionProgress(BaseModel):
 class NextCardResponse(BaseModel):
     card: Optional[Card]
     session_progress: SessionProgress
+    # Audio of the cards likely to come next, in order, for the client to prefetch.
+    upcoming_audio: List[AudioAsset] = []
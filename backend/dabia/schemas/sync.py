@@ -0,0 +1,21 @@
+from pydantic import BaseModel, Field
+from typing import List
+from datetime import datetime
+import uuid
+
+class OfflineReview(BaseModel):
+    # Generated by the client so that re-uploading the same batch is a no-op.
+    id: uuid.UUID
+    card_id: uuid.UUID
+    is_correct: bool
+    response_time_ms: int = Field(..., gt=0)
+    reviewed_at: datetime
+
+class ReviewUploadRequest(BaseModel):
+    reviews: List[OfflineReview] = Field(..., max_length=1000)
+
+class ReviewUploadResponse(BaseModel):
+    accepted: int
+    duplicates: int
+    # Reviews for cards that no longer exist on the server.
+    rejected: int
@@ -0,0 +1,282 @@
+import itertools
+import os
+import uuid
+from array import array
+from dataclasses import dataclass
+from datetime import date, datetime, time
+from pathlib import Path
+from typing import Container, Iterable, Iterator, List, Optional, Sequence
+
+import pyarrow as pa
+import pyarrow.compute as pc
+from sqlalchemy import select, delete, func
+from sqlalchemy.orm import Session
+
+from dabia import models
+from dabia.services.export import iter_row_batches
+
+# Rows per record batch in the archive files; readers get batches of this size.
+RECORD_BATCH_SIZE = 65536
+
+# Review logs are deleted from Postgres in chunks of this many ids.
+DELETE_CHUNK_SIZE = 10000
+
+UUID_TYPE = pa.binary(16)
+
+SCHEMA = pa.schema([
+    ("id", UUID_TYPE),
+    ("user_id", pa.dictionary(pa.int32(), UUID_TYPE)),
+    ("card_id", pa.dictionary(pa.int32(), UUID_TYPE)),
+    ("is_correct", pa.bool_()),
+    ("response_time_ms", pa.int32()),
+    ("reviewed_at", pa.timestamp("us")),
+])
+
+@dataclass
+class ArchivedMonth:
+    month: date
+    path: Path
+    rows: int
+
+def month_start(value: datetime) -> date:
+    return date(value.year, value.month, 1)
+
+def next_month(value: date) -> date:
+    return date(value.year + value.month // 12, value.month % 12 + 1, 1)
+
+def month_path(archive_dir: Path, month: date) -> Path:
+    # Hive-style partition directories, so pyarrow.dataset or DuckDB can
+    # discover the archive without going through this module.
+    return Path(archive_dir) / "review_logs" / f"month={month:%Y-%m}" / "data.arrow"
+
+class _DictionaryEncoder:
+    """
+    Assigns dense int32 codes to UUIDs in the order they are first seen. The
+    dictionary only grows, so each batch's dictionary extends the previous
+    one and the IPC writer only emits the new values, as a delta.
+    """
+
+    def __init__(self, dictionary: Optional[pa.Array] = None):
+        self.codes = array("i")
+        self._values: List[bytes] = [] if dictionary is None else dictionary.to_pylist()
+        self._index = {value: code for code, value in enumerate(self._values)}
+
+    def append(self, value: uuid.UUID):
+        key = value.bytes
+        code = self._index.get(key)
+        if code is None:
+            code = self._index[key] = len(self._values)
+            self._values.append(key)
+        self.codes.append(code)
+
+    def flush(self) -> pa.DictionaryArray:
+        """The codes appended since the last flush, against the whole dictionary."""
+        codes, self.codes = self.codes, array("i")
+        return pa.DictionaryArray.from_arrays(
+            pa.array(codes, type=pa.int32()),
+            pa.array(self._values, type=UUID_TYPE),
+        )
+
+class _RecordBatchBuilder:
+    """Collects rows column by column until they are flushed as a record batch."""
+
+    def __init__(self, users: _DictionaryEncoder, cards: _DictionaryEncoder):
+        self.users, self.cards = users, cards
+        self._reset()
+
+    def _reset(self):
+        self.ids: List[bytes] = []
+        self.is_correct: List[bool] = []
+        self.response_times = array("i")
+        self.reviewed_at: List[datetime] = []
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def append(self, row: Sequence):
+        self.ids.append(row[0].bytes)
+        self.users.append(row[1])
+        self.cards.append(row[2])
+        self.is_correct.append(row[3])
+        self.response_times.append(row[4])
+        self.reviewed_at.append(row[5])
+
+    def flush(self) -> pa.RecordBatch:
+        batch = pa.RecordBatch.from_arrays(
+            [
+                pa.array(self.ids, type=UUID_TYPE),
+                self.users.flush(),
+                self.cards.flush(),
+                pa.array(self.is_correct, type=pa.bool_()),
+                pa.array(self.response_times, type=pa.int32()),
+                pa.array(self.reviewed_at, type=pa.timestamp("us")),
+            ],
+            schema=SCHEMA,
+        )
+        self._reset()
+        return batch
+
+def iter_record_batches(
+    batches: Iterable[Sequence],
+    users: Optional[_DictionaryEncoder] = None,
+    cards: Optional[_DictionaryEncoder] = None,
+    skip_ids: Container[bytes] = frozenset(),
+    batch_size: int = RECORD_BATCH_SIZE,
+) -> Iterator[pa.RecordBatch]:
+    """
+    Regroups batches of (id, user_id, card_id, is_correct, response_time_ms,
+    reviewed_at) rows into record batches of up to `batch_size` rows, so only
+    one of them is held in memory at a time. Rows whose id is in `skip_ids`
+    are left out.
+    """
+    builder = _RecordBatchBuilder(users or _DictionaryEncoder(), cards or _DictionaryEncoder())
+    for batch in batches:
+        for row in batch:
+            if row[0].bytes in skip_ids:
+                continue
+            builder.append(row)
+            if len(builder) == batch_size:
+                yield builder.flush()
+    if len(builder):
+        yield builder.flush()
+
+def write_month(batches: Iterable[Sequence], path: Path, compression: Optional[str] = "zstd") -> int:
+    """
+    Writes batches of review log rows to a month's Arrow IPC file, one record
+    batch at a time. If a file for the partition already exists (late reviews
+    for an archived month), its batches are copied first and rows it already
+    has are skipped. The file is written under a temporary name and renamed,
+    so readers never see a partial file. Returns the rows in the file.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(".arrow.tmp")
+    # An IPC file has one dictionary per column, so new UUIDs go out as deltas.
+    options = pa.ipc.IpcWriteOptions(compression=compression, emit_dictionary_deltas=True)
+    users, cards = _DictionaryEncoder(), _DictionaryEncoder()
+    existing_ids = set()
+    rows = 0
+
+    with pa.OSFile(str(tmp_path), "wb") as sink:
+        with pa.ipc.new_file(sink, SCHEMA, options=options) as writer:
+            if path.exists():
+                with pa.memory_map(str(path)) as source:
+                    reader = pa.ipc.open_file(source)
+                    for i in range(reader.num_record_batches):
+                        batch = reader.get_batch(i)
+                        writer.write_batch(batch)
+                        existing_ids.update(batch["id"].to_pylist())
+                        rows += batch.num_rows
+                    if reader.num_record_batches:
+                        users = _DictionaryEncoder(batch["user_id"].dictionary)
+                        cards = _DictionaryEncoder(batch["card_id"].dictionary)
+            for batch in iter_record_batches(batches, users, cards, skip_ids=existing_ids):
+                writer.write_batch(batch)
+                rows += batch.num_rows
+    os.replace(tmp_path, path)
+    return rows
+
+def _delete_reviews(db: Session, path: Path) -> None:
+    """Deletes the reviews archived in `path` from Postgres, reading only its id column."""
+    with pa.memory_map(str(path)) as source:
+        reader = pa.ipc.open_file(source, options=pa.ipc.IpcReadOptions(included_fields=[SCHEMA.get_field_index("id")]))
+        for i in range(reader.num_record_batches):
+            ids = reader.get_batch(i)["id"]
+            for start in range(0, len(ids), DELETE_CHUNK_SIZE):
+                chunk = [uuid.UUID(bytes=value) for value in ids.slice(start, DELETE_CHUNK_SIZE).to_pylist()]
+                db.execute(delete(models.ReviewLog).where(models.ReviewLog.id.in_(chunk)))
+                db.commit()
+
+def archive_reviews(
+    db: Session,
+    before: date,
+    archive_dir: Path,
+    compression: Optional[str] = "zstd",
+    delete_rows: bool = True,
+) -> List[ArchivedMonth]:
+    """
+    Moves review logs from whole months before `before` into one columnar file
+    per month, streamed from a server-side cursor one record batch at a time.
+    Rows are only deleted from Postgres after their file has been written, and
+    by id, so reviews uploaded in the meantime are never lost.
+    """
+    ReviewLog = models.ReviewLog
+    cutoff = date(before.year, before.month, 1)
+    oldest = db.scalar(select(func.min(ReviewLog.reviewed_at)).where(ReviewLog.reviewed_at < cutoff))
+    if oldest is None:
+        return []
+
+    archived = []
+    month = month_start(oldest)
+    while month < cutoff:
+        end = next_month(month)
+        stmt = (
+            select(
+                ReviewLog.id,
+                ReviewLog.user_id,
+                ReviewLog.card_id,
+                ReviewLog.is_correct,
+                ReviewLog.response_time_ms,
+                ReviewLog.reviewed_at,
+            )
+            .where(ReviewLog.reviewed_at >= month, ReviewLog.reviewed_at < end)
+        )
+        batches = iter_row_batches(db, stmt)
+        first = next(batches, None)
+        if first:
+            path = month_path(archive_dir, month)
+            rows = write_month(itertools.chain([first], batches), path, compression=compression)
+            if delete_rows:
+                _delete_reviews(db, path)
+            archived.append(ArchivedMonth(month=month, path=path, rows=rows))
+        month = end
+
+    return archived
+
+def _read_options(columns: Optional[List[str]], start, end) -> pa.ipc.IpcReadOptions:
+    # Only decode the requested columns, plus reviewed_at when filtering on it.
+    if not columns:
+        return pa.ipc.IpcReadOptions()
+    fields = set(columns)
+    if start or end:
+        fields.add("reviewed_at")
+    return pa.ipc.IpcReadOptions(included_fields=[SCHEMA.get_field_index(name) for name in SCHEMA.names if name in fields])
+
+def iter_review_batches(
+    archive_dir: Path,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    columns: Optional[List[str]] = None,
+) -> Iterator[pa.RecordBatch]:
+    """
+    Scans archived review logs in record batches, optionally restricted to
+    [start, end) and to a subset of columns. Files are memory-mapped and only
+    the requested columns are decoded, so scans touch just the bytes they need.
+    """
+    root = Path(archive_dir) / "review_logs"
+    if not root.exists():
+        return
+    options = _read_options(columns, start, end)
+
+    for path in sorted(root.glob("month=*/data.arrow")):
+        month = datetime.strptime(path.parent.name.split("=", 1)[1], "%Y-%m").date()
+        if start and datetime.combine(next_month(month), time.min) <= start:
+            continue
+        if end and datetime.combine(month, time.min) >= end:
+            continue
+
+        with pa.memory_map(str(path)) as source:
+            reader = pa.ipc.open_file(source, options=options)
+            for i in range(reader.num_record_batches):
+                batch = reader.get_batch(i)
+                mask = None
+                if start:
+                    mask = pc.greater_equal(batch["reviewed_at"], pa.scalar(start, type=pa.timestamp("us")))
+                if end:
+                    before_end = pc.less(batch["reviewed_at"], pa.scalar(end, type=pa.timestamp("us")))
+                    mask = before_end if mask is None else pc.and_(mask, before_end)
+                if mask is not None:
+                    batch = batch.filter(mask)
+                if columns:
+                    batch = batch.select(columns)
+                if batch.num_rows:
+                    yield batch
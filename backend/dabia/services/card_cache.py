@@ -0,0 +1,115 @@
+import uuid
+from dataclasses import astuple, replace
+from typing import Dict, Iterable, List, Optional
+
+import msgpack
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from dabia import models
+from dabia.core.cache import CacheBackend, get_cache
+from dabia.core.invalidation import Evictions, evictions
+from dabia.core.singleflight import SingleFlight
+from dabia.services.rows import CardRow, card_row_select, to_card_row
+
+# Card and deck content changes only on import or admin edits, and changes
+# are evicted by the invalidation listener, so entries can live for long.
+# Loads never cache rows evicted while they were reading them, see
+# _set_unless_evicted. The TTL only bounds staleness if a notification is
+# lost. User-specific fields are joined in by the caller.
+CARD_TTL_SECONDS = 24 * 3600
+DECK_TTL_SECONDS = 24 * 3600
+
+# Concurrent misses on the same cards or decks, e.g. right after a deploy or
+# an import, share one database load per process.
+card_loads = SingleFlight()
+deck_loads = SingleFlight()
+
+def card_key(card_id: uuid.UUID) -> str:
+    return f"card:{card_id}"
+
+def deck_key(deck_id: uuid.UUID) -> str:
+    return f"deck:{deck_id}"
+
+def _encode_card(card: CardRow) -> bytes:
+    # Deck names are cached per deck, so a rename needs a single eviction.
+    card_id, deck_id, _, *content, _ = astuple(card)
+    return msgpack.packb([card_id.bytes, deck_id.bytes, *content])
+
+def _decode_card(value: bytes, deck_name: str) -> CardRow:
+    card_id, deck_id, *content = msgpack.unpackb(value)
+    return CardRow(uuid.UUID(bytes=card_id), uuid.UUID(bytes=deck_id), deck_name, *content)
+
+def _set_unless_evicted(cache: CacheBackend, values: Dict[str, bytes], ttl: int, evicted: Evictions) -> None:
+    """
+    Caches what a load read, except the entries evicted since it started:
+    the load may have read them before the change committed. An eviction
+    that lands between the check and the set is undone right after.
+    """
+    values = {key: value for key, value in values.items() if key not in evicted}
+    cache.set_many(values, ttl)
+    raced = [key for key in values if key in evicted]
+    if raced:
+        cache.delete_many(raced)
+
+def load_deck_names(
+    db: Session,
+    deck_ids: Iterable[uuid.UUID],
+    cache: Optional[CacheBackend] = None,
+) -> Dict[uuid.UUID, str]:
+    cache = cache or get_cache()
+    deck_ids = list(set(deck_ids))
+    cached = cache.get_many(deck_key(deck_id) for deck_id in deck_ids)
+    names = {deck_id: cached[deck_key(deck_id)].decode() for deck_id in deck_ids if deck_key(deck_id) in cached}
+
+    def load(missing: List[uuid.UUID]) -> Dict[uuid.UUID, str]:
+        with evictions.watch() as evicted:
+            loaded = dict(db.execute(select(models.Deck.id, models.Deck.name).where(models.Deck.id.in_(missing))).all())
+            names = {deck_key(deck_id): name.encode() for deck_id, name in loaded.items()}
+            _set_unless_evicted(cache, names, DECK_TTL_SECONDS, evicted)
+        return loaded
+
+    missing = [deck_id for deck_id in deck_ids if deck_id not in names]
+    if missing:
+        names.update(deck_loads.do_many(missing, load))
+    return names
+
+def load_cards(
+    db: Session,
+    card_ids: Iterable[uuid.UUID],
+    cache: Optional[CacheBackend] = None,
+) -> Dict[uuid.UUID, CardRow]:
+    """
+    The content of each card by id, with proficiency_level left at 0. Cached
+    cards cost one batched cache lookup; the rest are loaded in one query and
+    cached, unless another thread is already loading them, in which case its
+    result is used. Cards that no longer exist are left out. Cards changed
+    while they were being loaded are returned as read but not cached.
+    """
+    cache = cache or get_cache()
+    card_ids = list(dict.fromkeys(card_ids))
+    cached = cache.get_many(card_key(card_id) for card_id in card_ids)
+
+    def load(missing: List[uuid.UUID]) -> Dict[uuid.UUID, CardRow]:
+        with evictions.watch() as evicted:
+            rows = db.execute(card_row_select().where(models.Card.id.in_(missing)))
+            loaded = {card.id: card for card in map(to_card_row, rows)}
+            contents = {card_key(card_id): _encode_card(card) for card_id, card in loaded.items()}
+            names = {deck_key(card.deck_id): card.deck_name.encode() for card in loaded.values()}
+            _set_unless_evicted(cache, contents, CARD_TTL_SECONDS, evicted)
+            _set_unless_evicted(cache, names, DECK_TTL_SECONDS, evicted)
+        return loaded
+
+    cards: Dict[uuid.UUID, CardRow] = {}
+    missing = [card_id for card_id in card_ids if card_key(card_id) not in cached]
+    if missing:
+        cards.update(card_loads.do_many(missing, load))
+
+    if cached:
+        decoded = [_decode_card(value, "") for value in cached.values()]
+        names = load_deck_names(db, {card.deck_id for card in decoded} - {card.deck_id for card in cards.values()}, cache)
+        names.update({card.deck_id: card.deck_name for card in cards.values()})
+        for card in decoded:
+            if card.deck_id in names:
+                cards[card.id] = replace(card, deck_name=names[card.deck_id])
+    return cards
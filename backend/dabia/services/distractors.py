@@ -0,0 +1,158 @@
+import re
+import uuid
+import zlib
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from dabia import models
+
+# Wrong answers stored per card.
+DISTRACTOR_COUNT = 3
+
+# Relative weight of each feature in the similarity score.
+FEATURE_WEIGHTS = {
+    "kanji": 0.4,    # Jaccard overlap of the word's kanji
+    "reading": 0.3,  # cosine of hashed kana bigrams of the reading
+    "length": 0.15,  # closeness of reading length
+    "hint": 0.15,    # cosine of hashed words of the English hint
+}
+
+# Buckets for hashed bigram and word features.
+HASH_BINS = 512
+
+# Cards scored against the whole deck at once; bounds the score matrix.
+BLOCK_SIZE = 512
+
+UPSERT_CHUNK_SIZE = 1000
+
+KANJI_RE = re.compile(r"[㐀-䶿一-鿿]")
+WORD_RE = re.compile(r"[a-z]+")
+
+# (id, target_word, reading, hint)
+DistractorSource = Tuple[uuid.UUID, str, Optional[str], Optional[str]]
+
+def _bucket(token: str) -> int:
+    # crc32 rather than hash(), which is salted per process.
+    return zlib.crc32(token.encode()) % HASH_BINS
+
+def _hashed_features(token_lists: Iterable[List[str]], n: int) -> np.ndarray:
+    """Bag of hashed tokens per row, L2-normalised so a dot product is a cosine."""
+    matrix = np.zeros((n, HASH_BINS), dtype=np.float32)
+    for row, tokens in enumerate(token_lists):
+        for token in tokens:
+            matrix[row, _bucket(token)] += 1.0
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    np.divide(matrix, norms, out=matrix, where=norms > 0)
+    return matrix
+
+def _kanji_features(words: Sequence[str]) -> np.ndarray:
+    kanji_sets = [set(KANJI_RE.findall(word)) for word in words]
+    vocabulary = {kanji: i for i, kanji in enumerate(sorted(set().union(*kanji_sets)))}
+    matrix = np.zeros((len(words), max(len(vocabulary), 1)), dtype=np.float32)
+    for row, kanji_set in enumerate(kanji_sets):
+        matrix[row, [vocabulary[kanji] for kanji in kanji_set]] = 1.0
+    return matrix
+
+def compute_distractors(
+    cards: Sequence[DistractorSource],
+    targets: Optional[Set[uuid.UUID]] = None,
+    k: int = DISTRACTOR_COUNT,
+) -> Dict[uuid.UUID, List[str]]:
+    """
+    Picks the `k` most similar other words in `cards` for each card in
+    `targets` (all cards by default). Similarity combines shared kanji,
+    reading sound and length, and hint wording, scored for a block of cards
+    against the whole deck with matrix products. Words equal to the card's
+    own word or reading are never chosen, since they would also be correct.
+    """
+    n = len(cards)
+    if n < 2:
+        return {}
+    ids = [card[0] for card in cards]
+    words = np.array([card[1] for card in cards], dtype=object)
+    readings = [card[2] or card[1] for card in cards]
+
+    kanji = _kanji_features(words)
+    kanji_counts = kanji.sum(axis=1)
+    sounds = _hashed_features(([r[i:i + 2] for i in range(max(len(r) - 1, 1))] for r in readings), n)
+    hints = _hashed_features((WORD_RE.findall((card[3] or "").lower()) for card in cards), n)
+    lengths = np.array([len(r) for r in readings], dtype=np.float32)
+    reading_ids = {reading: i for i, reading in enumerate(set(readings))}
+    reading_codes = np.array([reading_ids[r] for r in readings])
+    word_ids = {word: i for i, word in enumerate(set(words))}
+    word_codes = np.array([word_ids[w] for w in words])
+
+    rows = np.arange(n) if targets is None else np.array([i for i, id_ in enumerate(ids) if id_ in targets], dtype=int)
+    candidates = min(n - 1, k * 4)
+    result: Dict[uuid.UUID, List[str]] = {}
+
+    for start in range(0, len(rows), BLOCK_SIZE):
+        block = rows[start:start + BLOCK_SIZE]
+        shared = kanji[block] @ kanji.T
+        union = kanji_counts[block, None] + kanji_counts[None, :] - shared
+        scores = FEATURE_WEIGHTS["kanji"] * np.divide(shared, union, out=np.zeros_like(shared), where=union > 0)
+        scores += FEATURE_WEIGHTS["reading"] * (sounds[block] @ sounds.T)
+        scores += FEATURE_WEIGHTS["length"] / (1.0 + np.abs(lengths[block, None] - lengths[None, :]))
+        scores += FEATURE_WEIGHTS["hint"] * (hints[block] @ hints.T)
+
+        # Never offer a correct answer as a wrong one.
+        excluded = (word_codes[block, None] == word_codes[None, :]) | (reading_codes[block, None] == reading_codes[None, :])
+        scores[excluded] = -np.inf
+
+        top = np.argpartition(-scores, candidates - 1, axis=1)[:, :candidates]
+        for row, row_scores, picks in zip(block, scores, top):
+            chosen: List[str] = []
+            for pick in picks[np.argsort(-row_scores[picks])]:
+                if np.isneginf(row_scores[pick]) or words[pick] in chosen:
+                    continue
+                chosen.append(words[pick])
+                if len(chosen) == k:
+                    break
+            result[ids[row]] = chosen
+    return result
+
+def _deck_cards(db: Session, deck_id: uuid.UUID) -> List[DistractorSource]:
+    Card = models.Card
+    stmt = select(Card.id, Card.target_word, Card.reading, Card.hint).where(Card.deck_id == deck_id)
+    return [tuple(row) for row in db.execute(stmt)]
+
+def store_distractors(db: Session, distractors: Dict[uuid.UUID, List[str]]) -> None:
+    Distractor = models.CardDistractor
+    items = [{"card_id": card_id, "words": words} for card_id, words in distractors.items()]
+    for start in range(0, len(items), UPSERT_CHUNK_SIZE):
+        stmt = insert(Distractor).values(items[start:start + UPSERT_CHUNK_SIZE])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[Distractor.card_id],
+            set_={"words": stmt.excluded.words, "computed_at": func.now()},
+        )
+        db.execute(stmt)
+
+def rebuild_distractors(
+    db: Session,
+    deck_ids: Optional[Iterable[uuid.UUID]] = None,
+    card_ids: Optional[Iterable[uuid.UUID]] = None,
+    k: int = DISTRACTOR_COUNT,
+) -> int:
+    """
+    Recomputes distractors deck by deck. With `card_ids`, only those cards
+    are recomputed (against their whole deck), which is what an import
+    needs; otherwise every card in `deck_ids`, or in every deck. Returns the
+    number of cards updated.
+    """
+    targets = set(card_ids) if card_ids is not None else None
+    if targets is not None:
+        deck_ids = db.scalars(select(models.Card.deck_id).where(models.Card.id.in_(targets)).distinct()).all()
+    elif deck_ids is None:
+        deck_ids = db.scalars(select(models.Deck.id)).all()
+
+    updated = 0
+    for deck_id in deck_ids:
+        distractors = compute_distractors(_deck_cards(db, deck_id), targets, k)
+        store_distractors(db, distractors)
+        db.commit()
+        updated += len(distractors)
+    return updated
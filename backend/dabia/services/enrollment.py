@@ -0,0 +1,128 @@
+import uuid
+from typing import Optional
+
+from sqlalchemy import Integer, cast, func, literal, select, tuple_
+from sqlalchemy.dialects.postgresql import UUID, insert
+from sqlalchemy.orm import Session
+
+from dabia import models
+from dabia.models.user_deck import DEFAULT_NEW_CARDS_PER_DAY
+from dabia.services.scheduler import CURSOR_START
+
+# Cards enrolled per INSERT ... SELECT. Each chunk is committed on its own so
+# enrolling a large deck never holds row locks for long.
+ENROLL_CHUNK_SIZE = 2000
+
+ENROLLMENT_MODES = ("lazy", "eager")
+
+def upsert_user_deck(
+    db: Session,
+    user_id: uuid.UUID,
+    deck_id: uuid.UUID,
+    new_cards_per_day: Optional[int] = None,
+    reviews_per_day: Optional[int] = None,
+) -> models.UserDeck:
+    """Activates the deck for the user, updating the quotas that are given."""
+    UserDeck = models.UserDeck
+    quotas = {"is_active": True}
+    if new_cards_per_day is not None:
+        quotas["new_cards_per_day"] = new_cards_per_day
+    if reviews_per_day is not None:
+        quotas["reviews_per_day"] = reviews_per_day
+    stmt = (
+        insert(UserDeck)
+        .values(user_id=user_id, deck_id=deck_id, **quotas)
+        .on_conflict_do_update(index_elements=[UserDeck.user_id, UserDeck.deck_id], set_={**quotas, "updated_at": func.now()})
+        .returning(UserDeck)
+    )
+    return db.scalars(select(UserDeck).from_statement(stmt)).one()
+
+def enroll_cards(
+    db: Session,
+    user_id: uuid.UUID,
+    deck_id: uuid.UUID,
+    new_cards_per_day: int = DEFAULT_NEW_CARDS_PER_DAY,
+    chunk_size: int = ENROLL_CHUNK_SIZE,
+) -> int:
+    """
+    Creates an association for every card in the deck with set-based
+    INSERT ... SELECT statements, walking the deck in order_key order one
+    chunk at a time. Cards are staggered so `new_cards_per_day` of them
+    become due each day. Existing associations are left untouched. Returns
+    the number of associations created.
+    """
+    Card, Assoc = models.Card, models.UserCardAssociation
+    per_day = max(new_cards_per_day, 1)
+    after = CURSOR_START
+    position = 0
+    created = 0
+
+    while True:
+        in_order = (Card.deck_id == deck_id, tuple_(Card.order_key, Card.id) > tuple_(*after))
+        # The last card of this chunk, found on ix_cards_deck_id_order_key.
+        last = db.execute(
+            select(Card.order_key, Card.id)
+            .where(*in_order)
+            .order_by(Card.order_key, Card.id)
+            .offset(chunk_size - 1)
+            .limit(1)
+        ).first()
+
+        chunk = select(Card.id, Card.deck_id, Card.order_key).where(*in_order)
+        if last is not None:
+            chunk = chunk.where(tuple_(Card.order_key, Card.id) <= tuple_(*last))
+        chunk = chunk.subquery("chunk")
+        ordinal = position + func.row_number().over(order_by=(chunk.c.order_key, chunk.c.id)) - 1
+        rows = select(
+            literal(user_id, UUID(as_uuid=True)),
+            chunk.c.id,
+            chunk.c.deck_id,
+            literal(0),
+            func.now() + func.make_interval(0, 0, 0, cast(ordinal // per_day, Integer)),
+        )
+        stmt = (
+            insert(Assoc)
+            .from_select(["user_id", "card_id", "deck_id", "proficiency_level", "next_review_at"], rows)
+            .on_conflict_do_nothing(index_elements=[Assoc.user_id, Assoc.card_id])
+        )
+        created += db.execute(stmt).rowcount
+        db.commit()
+
+        if last is None:
+            break
+        after = tuple(last)
+        position += chunk_size
+
+    return created
+
+def enroll_deck(
+    db: Session,
+    user_id: uuid.UUID,
+    deck_id: uuid.UUID,
+    mode: str = "lazy",
+    new_cards_per_day: Optional[int] = None,
+    reviews_per_day: Optional[int] = None,
+):
+    """
+    Subscribes the user to a deck by creating or reactivating their
+    user_decks row, which is what makes the scheduler serve the deck. In lazy
+    mode nothing else is written; associations are created as cards are first
+    answered, so the table only ever holds cards the user has reached. Eager
+    mode creates them all now.
+    """
+    user_deck = upsert_user_deck(db, user_id, deck_id, new_cards_per_day, reviews_per_day)
+    db.commit()
+    created = 0
+    if mode == "eager":
+        created = enroll_cards(db, user_id, deck_id, user_deck.new_cards_per_day)
+        # Every card is scheduled now, so none of them should come up as new.
+        last = db.execute(
+            select(models.Card.order_key, models.Card.id)
+            .where(models.Card.deck_id == deck_id)
+            .order_by(models.Card.order_key.desc(), models.Card.id.desc())
+            .limit(1)
+        ).first()
+        if last is not None:
+            user_deck.new_cursor_order_key, user_deck.new_cursor_card_id = last
+            db.commit()
+    return user_deck, created
@@ -0,0 +1,96 @@
+import csv
+import io
+import json
+import uuid
+from datetime import datetime
+from typing import Iterator, Optional, Sequence
+
+from sqlalchemy import Select
+from sqlalchemy.orm import Session
+
+from dabia import models
+from dabia.services.rows import REVIEW_ROW_FIELDS, review_row_select
+
+# Rows fetched per round trip from the server-side cursor. Each batch is
+# encoded and written out before the next one is fetched.
+BATCH_SIZE = 2000
+
+EXPORT_COLUMNS = REVIEW_ROW_FIELDS
+
+FORMATS = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+}
+
+def review_export_query(
+    user_id: Optional[uuid.UUID] = None,
+    deck_id: Optional[uuid.UUID] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+) -> Select:
+    """
+    Builds a Core select over review_logs that projects only the exported
+    columns. The user and date filters are served by
+    ix_review_logs_user_id_reviewed_at, the deck filter by ix_cards_deck_id.
+    """
+    ReviewLog, Card = models.ReviewLog, models.Card
+    stmt = review_row_select()
+    if user_id:
+        stmt = stmt.where(ReviewLog.user_id == user_id)
+    if deck_id:
+        stmt = stmt.where(Card.deck_id == deck_id)
+    if since:
+        stmt = stmt.where(ReviewLog.reviewed_at >= since)
+    if until:
+        stmt = stmt.where(ReviewLog.reviewed_at < until)
+    if user_id:
+        # Matches the index order, so Postgres can skip the sort.
+        stmt = stmt.order_by(ReviewLog.user_id, ReviewLog.reviewed_at)
+    return stmt
+
+def iter_row_batches(db: Session, stmt: Select, batch_size: int = BATCH_SIZE) -> Iterator[Sequence]:
+    """
+    Executes the statement on a server-side cursor and yields batches of
+    plain row tuples, so memory stays bounded regardless of result size.
+    """
+    result = db.execute(stmt.execution_options(stream_results=True, yield_per=batch_size))
+    try:
+        for batch in result.partitions():
+            yield batch
+    finally:
+        result.close()
+
+def _format_value(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    return value
+
+def iter_csv(batches: Iterator[Sequence]) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+    for batch in batches:
+        writer.writerows([[_format_value(value) for value in row] for row in batch])
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+def iter_ndjson(batches: Iterator[Sequence]) -> Iterator[str]:
+    for batch in batches:
+        yield "".join(
+            json.dumps(dict(zip(EXPORT_COLUMNS, map(_format_value, row))), separators=(",", ":")) + "\n"
+            for row in batch
+        )
+
+def export_reviews(db: Session, fmt: str, **filters) -> Iterator[str]:
+    """Streams the filtered review history encoded in the given format."""
+    batches = iter_row_batches(db, review_export_query(**filters))
+    if fmt == "csv":
+        return iter_csv(batches)
+    if fmt == "ndjson":
+        return iter_ndjson(batches)
+    raise ValueError(f"Unsupported export format: {fmt}")
@@ -0,0 +1,80 @@
+import hashlib
+import mimetypes
+import uuid
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from dabia import models, schemas
+from dabia.core.storage import storage_provider
+from dabia.services.rows import CardRow
+
+def describe_media_file(path: Path) -> Tuple[str, int, Optional[str]]:
+    """(sha256 hex, size in bytes, content type) of a local media file."""
+    with open(path, "rb") as f:
+        content_hash = hashlib.file_digest(f, "sha256").hexdigest()
+    return content_hash, path.stat().st_size, mimetypes.guess_type(path.name)[0]
+
+def record_media_assets(db: Session, media_dir: Path, filenames: Iterable[str]) -> List[str]:
+    """
+    Records the hash and size of each file found in `media_dir`, updating
+    files whose content changed. Returns the filenames that weren't found.
+    """
+    assets, missing = {}, []
+    for filename in dict.fromkeys(filenames):
+        path = media_dir / filename
+        if not path.is_file():
+            missing.append(filename)
+            continue
+        content_hash, size_bytes, content_type = describe_media_file(path)
+        assets[filename] = dict(filename=filename, content_hash=content_hash, size_bytes=size_bytes, content_type=content_type)
+    if assets:
+        MediaAsset = models.MediaAsset
+        stmt = insert(MediaAsset).values(list(assets.values()))
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[MediaAsset.filename],
+            set_={
+                "content_hash": stmt.excluded.content_hash,
+                "size_bytes": stmt.excluded.size_bytes,
+                "content_type": stmt.excluded.content_type,
+                "updated_at": func.now(),
+            },
+            where=MediaAsset.content_hash != stmt.excluded.content_hash,
+        )
+        db.execute(stmt)
+        db.commit()
+    return missing
+
+def load_card_audio(db: Session, cards: Sequence[CardRow]) -> Dict[uuid.UUID, List[schemas.AudioAsset]]:
+    """
+    The audio of each card, word first, keyed by card id. URLs come from one
+    StorageProvider.get_urls call and hashes from one media_assets query.
+    """
+    filenames = list(dict.fromkeys(
+        filename for card in cards for filename in (card.audio_url, card.sentence_audio_url) if filename
+    ))
+    if not filenames:
+        return {card.id: [] for card in cards}
+    MediaAsset = models.MediaAsset
+    stmt = select(MediaAsset.filename, MediaAsset.content_hash, MediaAsset.size_bytes).where(MediaAsset.filename.in_(filenames))
+    recorded = {filename: (content_hash, size_bytes) for filename, content_hash, size_bytes in db.execute(stmt)}
+    urls = storage_provider.get_urls(filenames)
+    assets = {}
+    for filename in filenames:
+        content_hash, size_bytes = recorded.get(filename, (None, None))
+        assets[filename] = schemas.AudioAsset(url=urls[filename], content_hash=content_hash, size_bytes=size_bytes)
+    return {
+        card.id: [assets[filename] for filename in (card.audio_url, card.sentence_audio_url) if filename]
+        for card in cards
+    }
+
+def prefetch_manifest(card_audio: Iterable[List[schemas.AudioAsset]]) -> List[schemas.AudioAsset]:
+    """The audio of the given cards in order, each file once."""
+    manifest = {}
+    for audio in card_audio:
+        for asset in audio:
+            manifest.setdefault(asset.url, asset)
+    return list(manifest.values())
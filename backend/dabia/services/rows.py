@@ -0,0 +1,120 @@
+import uuid
+from dataclasses import dataclass, fields
+from datetime import datetime
+from typing import List, Optional
+
+from sqlalchemy import select, and_, Select
+
+from dabia import models
+
+# Lightweight row types for hot paths. They are filled from Core selects that
+# project only the needed columns, and unlike ORM instances carry no identity
+# map entry, change tracking or relationship loaders.
+
+@dataclass(slots=True, frozen=True)
+class CardRow:
+    id: uuid.UUID
+    deck_id: uuid.UUID
+    deck_name: str
+    sentence_template: str
+    target_word: str
+    reading: Optional[str]
+    hint: Optional[str]
+    audio_url: Optional[str]
+    sentence: Optional[str]
+    sentence_furigana: Optional[str]
+    sentence_segments: Optional[List[List[str]]]
+    sentence_translation: Optional[str]
+    sentence_audio_url: Optional[str]
+    distractors: Optional[List[str]] = None
+    proficiency_level: int = 0
+
+@dataclass(slots=True, frozen=True)
+class ReviewRow:
+    id: uuid.UUID
+    user_id: uuid.UUID
+    card_id: uuid.UUID
+    deck_id: uuid.UUID
+    is_correct: bool
+    response_time_ms: int
+    reviewed_at: datetime
+
+@dataclass(slots=True, frozen=True)
+class NewCardRow:
+    """A card parsed from an import file, ready for a bulk INSERT."""
+    guid: str
+    deck_id: uuid.UUID
+    order_key: int
+    sentence_template: str
+    target_word: str
+    reading: Optional[str]
+    hint: Optional[str]
+    audio_url: Optional[str]
+    sentence: Optional[str]
+    sentence_furigana: Optional[str]
+    sentence_segments: Optional[List[List[str]]]
+    sentence_translation: Optional[str]
+    sentence_audio_url: Optional[str]
+
+    def to_values(self) -> dict:
+        return {name: getattr(self, name) for name in NEW_CARD_FIELDS}
+
+NEW_CARD_FIELDS = tuple(field.name for field in fields(NewCardRow))
+REVIEW_ROW_FIELDS = tuple(field.name for field in fields(ReviewRow))
+
+def card_row_select(user_id: Optional[uuid.UUID] = None) -> Select:
+    """
+    Selects exactly the columns of a CardRow. With a user id, the user's
+    proficiency level is joined in from their association, if any.
+    """
+    Card, Deck, Assoc = models.Card, models.Deck, models.UserCardAssociation
+    Distractor = models.CardDistractor
+    columns = [
+        Card.id,
+        Card.deck_id,
+        Deck.name,
+        Card.sentence_template,
+        Card.target_word,
+        Card.reading,
+        Card.hint,
+        Card.audio_url,
+        Card.sentence,
+        Card.sentence_furigana,
+        Card.sentence_segments,
+        Card.sentence_translation,
+        Card.sentence_audio_url,
+        Distractor.words,
+    ]
+    stmt = (
+        select(*columns)
+        .join(Deck, Deck.id == Card.deck_id)
+        .outerjoin(Distractor, Distractor.card_id == Card.id)
+    )
+    if user_id is not None:
+        stmt = stmt.add_columns(Assoc.proficiency_level).outerjoin(
+            Assoc, and_(Assoc.card_id == Card.id, Assoc.user_id == user_id)
+        )
+    return stmt
+
+# Columns of card_row_select() without a user, i.e. all but proficiency_level.
+_CARD_COLUMNS = len(fields(CardRow)) - 1
+
+def to_card_row(row) -> CardRow:
+    # The outer-joined association is missing if the user hasn't seen the card.
+    proficiency_level = row[_CARD_COLUMNS] if len(row) > _CARD_COLUMNS else None
+    return CardRow(*row[:_CARD_COLUMNS], proficiency_level=proficiency_level or 0)
+
+def review_row_select() -> Select:
+    ReviewLog, Card = models.ReviewLog, models.Card
+    return (
+        select(
+            ReviewLog.id,
+            ReviewLog.user_id,
+            ReviewLog.card_id,
+            Card.deck_id,
+            ReviewLog.is_correct,
+            ReviewLog.response_time_ms,
+            ReviewLog.reviewed_at,
+        )
+        .join(Card, Card.id == ReviewLog.card_id)
+    )
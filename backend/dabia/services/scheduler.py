@@ -0,0 +1,268 @@
+import heapq
+import itertools
+import uuid
+from collections import Counter
+from dataclasses import dataclass, replace
+from datetime import datetime
+from typing import Dict, List, Sequence, Tuple
+
+from sqlalchemy import BigInteger, DateTime, Integer, Select, case, column, func, literal, not_, select, true, tuple_, values
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Session
+
+from dabia import models
+from dabia.services.card_cache import load_cards
+from dabia.services.rows import CardRow
+
+# Cards of each kind loaded per deck at a time.
+WINDOW_SIZE = 10
+
+# Sorts before every real keyset position, so an unset cursor needs no OR and
+# each window stays a single index range scan.
+CURSOR_START = (-1, uuid.UUID(int=0))
+DUE_START = (datetime.min, uuid.UUID(int=0))
+
+@dataclass
+class DeckState:
+    deck_id: uuid.UUID
+    new_left: int
+    reviews_left: int
+    # Keyset positions of the last new and due card loaded from this deck.
+    new_after: Tuple[int, uuid.UUID]
+    due_after: Tuple[datetime, uuid.UUID] = DUE_START
+    new_pending: int = 0
+    due_pending: int = 0
+    new_exhausted: bool = False
+    due_exhausted: bool = False
+
+    def wants_new(self) -> bool:
+        return not self.new_pending and not self.new_exhausted and self.new_left > 0
+
+    def wants_due(self) -> bool:
+        return not self.due_pending and not self.due_exhausted and self.reviews_left > 0
+
+def _deck_states_select(user_id: uuid.UUID) -> Select:
+    """
+    The decks the user enrolled in and hasn't paused, with their cursors and
+    what is left of today's quotas. Read from the user's user_decks rows, so
+    the cost follows the user's own decks rather than the catalogue.
+    """
+    UserDeck = models.UserDeck
+    counted_today = UserDeck.counted_on == func.current_date()
+
+    def left(quota, used):
+        return quota - case((counted_today, used), else_=0)
+
+    return (
+        select(
+            UserDeck.deck_id,
+            func.coalesce(UserDeck.new_cursor_order_key, CURSOR_START[0]),
+            func.coalesce(UserDeck.new_cursor_card_id, CURSOR_START[1]),
+            left(UserDeck.new_cards_per_day, UserDeck.new_today),
+            left(UserDeck.reviews_per_day, UserDeck.reviews_today),
+        )
+        .where(UserDeck.user_id == user_id, UserDeck.is_active)
+    )
+
+def _due_windows_select(user_id: uuid.UUID, wanted: List[Tuple]) -> Select:
+    """
+    (card_id, deck_id, proficiency_level, next_review_at) of up to `limit`
+    due reviews after `due_after` for each (deck_id, limit, due_at, card_id)
+    in `wanted`, in one statement. Each deck's window is an index range scan
+    on ix_user_card_associations_user_id_deck_id_next_review_at, which leaves
+    out suspended cards. Card content comes from the card cache.
+    """
+    Assoc = models.UserCardAssociation
+    params = values(
+        column("deck_id", UUID(as_uuid=True)),
+        column("size", Integer),
+        column("after_at", DateTime),
+        column("after_id", UUID(as_uuid=True)),
+        name="wanted",
+    ).data(wanted)
+    window = (
+        select(Assoc.card_id, Assoc.proficiency_level, Assoc.next_review_at)
+        .where(
+            Assoc.user_id == user_id,
+            Assoc.deck_id == params.c.deck_id,
+            not_(Assoc.is_suspended),
+            Assoc.next_review_at <= func.now(),
+            tuple_(Assoc.next_review_at, Assoc.card_id) > tuple_(params.c.after_at, params.c.after_id),
+        )
+        .order_by(Assoc.next_review_at, Assoc.card_id)
+        .limit(params.c.size)
+        .lateral("due_window")
+    )
+    return (
+        select(window.c.card_id, params.c.deck_id, window.c.proficiency_level, window.c.next_review_at)
+        .select_from(params)
+        .join(window, true())
+    )
+
+def _new_windows_select(user_id: uuid.UUID, wanted: List[Tuple]) -> Select:
+    """
+    (card_id, deck_id, proficiency_level, order_key) of up to `limit` new
+    cards after the cursor for each (deck_id, limit, order_key, card_id) in
+    `wanted`, read from ix_cards_deck_id_order_key. Cards that already have
+    an association, because they were answered or enrolled ahead of time,
+    are left out: they come up through the due windows instead, so a card
+    whose key now sorts after the cursor never comes back as new.
+    """
+    Card, Assoc = models.Card, models.UserCardAssociation
+    params = values(
+        column("deck_id", UUID(as_uuid=True)),
+        column("size", Integer),
+        column("after_key", BigInteger),
+        column("after_id", UUID(as_uuid=True)),
+        name="wanted",
+    ).data(wanted)
+    window = (
+        select(Card.id, Card.order_key)
+        .where(
+            Card.deck_id == params.c.deck_id,
+            tuple_(Card.order_key, Card.id) > tuple_(params.c.after_key, params.c.after_id),
+            ~select(Assoc.card_id).where(Assoc.user_id == user_id, Assoc.card_id == Card.id).exists(),
+        )
+        .order_by(Card.order_key, Card.id)
+        .limit(params.c.size)
+        .lateral("new_window")
+    )
+    return (
+        select(window.c.id, params.c.deck_id, literal(0), window.c.order_key)
+        .select_from(params)
+        .join(window, true())
+    )
+
+class InterleavingScheduler:
+    """
+    Interleaves cards from all of a user's active decks. A small window of
+    due reviews and new cards is loaded from every deck, and the windows are
+    merged in a heap: the most overdue reviews come first, then new cards,
+    alternating between decks. A deck's window is only reloaded once all of
+    its cards have been handed out, and every reload of any number of decks
+    is one query per kind, so a batch costs a few indexed queries no matter
+    how many decks the user studies. The windows only select ids; card
+    content is looked up in the card cache in one batch per reload.
+    """
+
+    def __init__(self, db: Session, user_id: uuid.UUID, window_size: int = WINDOW_SIZE):
+        self.db = db
+        self.user_id = user_id
+        self.window_size = window_size
+        self.decks: Dict[uuid.UUID, DeckState] = {}
+        self._heap: List[tuple] = []
+        self._seq = itertools.count()
+        self._queued: set = set()
+        self._loaded = False
+
+    def _load_decks(self) -> None:
+        self.decks = {
+            deck_id: DeckState(deck_id, new_left, reviews_left, (cursor_key, cursor_id))
+            for deck_id, cursor_key, cursor_id, new_left, reviews_left
+            in self.db.execute(_deck_states_select(self.user_id))
+        }
+        self._heap.clear()
+        self._queued.clear()
+        self._loaded = True
+
+    def _push(self, deck: DeckState, card: CardRow, due_at: datetime, position: int, is_new: bool) -> bool:
+        if card.id in self._queued:
+            return False
+        self._queued.add(card.id)
+        # Reviews first, most overdue first. New cards are ordered by their
+        # position in the deck's window, so decks take turns.
+        heapq.heappush(self._heap, (is_new, due_at, position, next(self._seq), deck.deck_id, card))
+        return True
+
+    def _cards(self, rows: Sequence[tuple]) -> List[CardRow]:
+        """Cards for (card_id, deck_id, proficiency_level, ...) rows, in order."""
+        contents = load_cards(self.db, [row[0] for row in rows])
+        return [
+            replace(contents[row[0]], proficiency_level=row[2] or 0)
+            for row in rows if row[0] in contents
+        ]
+
+    def _refill(self) -> None:
+        due_decks = [deck for deck in self.decks.values() if deck.wants_due()]
+        new_decks = [deck for deck in self.decks.values() if deck.wants_new()]
+        due_rows, new_rows = [], []
+
+        if due_decks:
+            wanted = [(d.deck_id, min(self.window_size, d.reviews_left), *d.due_after) for d in due_decks]
+            due_rows = self.db.execute(_due_windows_select(self.user_id, wanted)).all()
+            loaded = Counter(deck_id for _, deck_id, _, _ in due_rows)
+            for card_id, deck_id, _, due_at in due_rows:
+                deck = self.decks[deck_id]
+                deck.due_after = max(deck.due_after, (due_at, card_id))
+            for deck, (_, limit, *_) in zip(due_decks, wanted):
+                deck.reviews_left -= loaded[deck.deck_id]
+                deck.due_exhausted = loaded[deck.deck_id] < limit
+
+        if new_decks:
+            wanted = [(d.deck_id, min(self.window_size, d.new_left), *d.new_after) for d in new_decks]
+            new_rows = self.db.execute(_new_windows_select(self.user_id, wanted)).all()
+            loaded = Counter(deck_id for _, deck_id, _, _ in new_rows)
+            for card_id, deck_id, _, order_key in new_rows:
+                deck = self.decks[deck_id]
+                deck.new_after = max(deck.new_after, (order_key, card_id))
+            for deck, (_, limit, *_) in zip(new_decks, wanted):
+                deck.new_left -= loaded[deck.deck_id]
+                deck.new_exhausted = loaded[deck.deck_id] < limit
+
+        # Content for both kinds in one cache lookup. Cards deleted since the
+        # window was read are skipped but still count against the quota.
+        cards = {card.id: card for card in self._cards(due_rows + new_rows)}
+        for rows, is_new in ((due_rows, False), (new_rows, True)):
+            positions: Dict[uuid.UUID, int] = Counter()
+            for card_id, deck_id, _, key in rows:
+                deck = self.decks[deck_id]
+                position = positions[deck_id]
+                positions[deck_id] += 1
+                if card_id not in cards:
+                    continue
+                if self._push(deck, cards[card_id], DUE_START[0] if is_new else key, position, is_new):
+                    if is_new:
+                        deck.new_pending += 1
+                    else:
+                        deck.due_pending += 1
+
+    def next_cards(self, limit: int) -> List[CardRow]:
+        reloaded = not self._loaded
+        if not self._loaded:
+            self._load_decks()
+        cards: List[CardRow] = []
+        while len(cards) < limit:
+            self._refill()
+            if not self._heap:
+                if reloaded:
+                    break
+                # Everything loaded so far is used up. Start over from the
+                # database once, in case answers made more reviews due.
+                self._load_decks()
+                self._queued.update(card.id for card in cards)
+                reloaded = True
+                continue
+            is_new, _, _, _, deck_id, card = heapq.heappop(self._heap)
+            deck = self.decks[deck_id]
+            if is_new:
+                deck.new_pending -= 1
+            else:
+                deck.due_pending -= 1
+            cards.append(card)
+        return cards
+
+    def study_ahead(self, limit: int) -> List[CardRow]:
+        """Reviews due soonest in decks that have review quota left, for when nothing is due."""
+        if not self._loaded:
+            self._load_decks()
+        deck_ids = [deck.deck_id for deck in self.decks.values() if deck.reviews_left > 0]
+        if not deck_ids:
+            return []
+        Assoc = models.UserCardAssociation
+        stmt = (
+            select(Assoc.card_id, Assoc.deck_id, Assoc.proficiency_level)
+            .where(Assoc.user_id == self.user_id, Assoc.deck_id.in_(deck_ids), not_(Assoc.is_suspended))
+            .order_by(Assoc.next_review_at)
+            .limit(limit)
+        )
+        return self._cards(self.db.execute(stmt).all())
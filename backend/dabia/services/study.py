@@ -0,0 +1,230 @@
+import itertools
+import uuid
+from collections import deque
+from datetime import datetime, UTC
+from typing import Deque, Dict, List, Optional
+
+from sqlalchemy import DateTime, and_, case, func, literal, not_, or_, select, tuple_
+from sqlalchemy.dialects.postgresql import UUID, array, insert
+from sqlalchemy.orm import Session
+
+from dabia import models, schemas
+from dabia.core.config import settings
+from dabia.core.storage import storage_provider
+from dabia.services.media import load_card_audio, prefetch_manifest
+from dabia.services.rows import CardRow
+from dabia.services.scheduler import CURSOR_START, WINDOW_SIZE, InterleavingScheduler
+from dabia.services.study_plan import next_planned_cards, update_study_plan
+
+GOAL_TODAY = 50
+
+# Minutes until a card is due again, by proficiency level after the answer.
+# A wrong answer resets the level, so the card comes back in the same session.
+REVIEW_INTERVALS_MINUTES = (10, 24 * 60, 3 * 24 * 60, 7 * 24 * 60, 14 * 24 * 60, 30 * 24 * 60, 60 * 24 * 60)
+
+def _next_review_at(level, answered_at):
+    minutes = array(REVIEW_INTERVALS_MINUTES)[func.least(level, len(REVIEW_INTERVALS_MINUTES) - 1) + 1]
+    return answered_at + func.make_interval(0, 0, 0, 0, 0, minutes)
+
+def schedule_card(
+    db: Session,
+    user_id: uuid.UUID,
+    answer: schemas.PreviousAnswer,
+    answered_at: Optional[datetime] = None,
+) -> None:
+    """
+    Updates the user's proficiency on the card and when it is next due, and
+    keeps the lapse counters current. A card that crosses a leech threshold
+    is suspended in the same statement, so leeches never need a history scan.
+    Intervals count from `answered_at` (naive UTC) when given, else from now.
+    """
+    Assoc, Card = models.UserCardAssociation, models.Card
+    since = func.now() if answered_at is None else literal(answered_at, DateTime)
+    first_level = 1 if answer.is_correct else 0
+    card = (
+        select(
+            literal(user_id, UUID(as_uuid=True)), Card.id, Card.deck_id,
+            literal(first_level), _next_review_at(first_level, since),
+        )
+        .where(Card.id == answer.card_id)
+    )
+    stmt = insert(Assoc).from_select(["user_id", "card_id", "deck_id", "proficiency_level", "next_review_at"], card)
+    if answer.is_correct:
+        level, consecutive_lapses, total_lapses = Assoc.proficiency_level + 1, literal(0), Assoc.total_lapses
+    else:
+        level, consecutive_lapses, total_lapses = literal(0), Assoc.consecutive_lapses + 1, Assoc.total_lapses + 1
+    is_leech = or_(
+        consecutive_lapses >= settings.LEECH_CONSECUTIVE_LAPSES,
+        total_lapses >= settings.LEECH_TOTAL_LAPSES,
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[Assoc.user_id, Assoc.card_id],
+        set_={
+            "proficiency_level": level,
+            "next_review_at": _next_review_at(level, since),
+            "consecutive_lapses": consecutive_lapses,
+            "total_lapses": total_lapses,
+            "is_suspended": or_(Assoc.is_suspended, is_leech),
+            "suspended_at": case((and_(not_(Assoc.is_suspended), is_leech), func.now()), else_=Assoc.suspended_at),
+            "updated_at": func.now(),
+        },
+    )
+    db.execute(stmt)
+
+def track_deck_progress(db: Session, user_id: uuid.UUID, card_id: uuid.UUID) -> None:
+    """
+    Advances the user's new-card cursor in the card's deck if the card is
+    past it, and counts the answer towards today's new or review quota.
+    """
+    Card, UserDeck = models.Card, models.UserDeck
+    position = (
+        select(
+            literal(user_id, UUID(as_uuid=True)), Card.deck_id, Card.order_key, Card.id,
+            literal(1), literal(0), func.current_date(),
+        )
+        .where(Card.id == card_id)
+    )
+    stmt = insert(UserDeck).from_select(
+        ["user_id", "deck_id", "new_cursor_order_key", "new_cursor_card_id", "new_today", "reviews_today", "counted_on"],
+        position,
+    )
+    excluded = stmt.excluded
+    cursor = tuple_(
+        func.coalesce(UserDeck.new_cursor_order_key, CURSOR_START[0]),
+        func.coalesce(UserDeck.new_cursor_card_id, CURSOR_START[1]),
+    )
+    is_new = cursor < tuple_(excluded.new_cursor_order_key, excluded.new_cursor_card_id)
+    counted_today = UserDeck.counted_on == func.current_date()
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[UserDeck.user_id, UserDeck.deck_id],
+        set_={
+            "new_cursor_order_key": case((is_new, excluded.new_cursor_order_key), else_=UserDeck.new_cursor_order_key),
+            "new_cursor_card_id": case((is_new, excluded.new_cursor_card_id), else_=UserDeck.new_cursor_card_id),
+            "new_today": case((counted_today, UserDeck.new_today), else_=0) + case((is_new, 1), else_=0),
+            "reviews_today": case((counted_today, UserDeck.reviews_today), else_=0) + case((is_new, 0), else_=1),
+            "counted_on": func.current_date(),
+            "updated_at": func.now(),
+        },
+    )
+    db.execute(stmt)
+
+def apply_answer(
+    db: Session,
+    user_id: uuid.UUID,
+    answer: schemas.PreviousAnswer,
+    answered_at: Optional[datetime] = None,
+) -> None:
+    """
+    Applies an answer to the user's progress without committing: reschedules
+    the card, advances the deck's cursor and quotas, and updates today's plan.
+    """
+    schedule_card(db, user_id, answer, answered_at)
+    track_deck_progress(db, user_id, answer.card_id)
+    update_study_plan(db, user_id, answer.card_id)
+
+def record_answer(db: Session, user_id: uuid.UUID, answer: schemas.PreviousAnswer) -> None:
+    """Saves an answer to the review log and reschedules the card."""
+    review_log_entry = models.ReviewLog(
+        user_id=user_id,
+        card_id=answer.card_id,
+        is_correct=answer.is_correct,
+        response_time_ms=answer.response_time_ms,
+    )
+    db.add(review_log_entry)
+    apply_answer(db, user_id, answer)
+    db.commit()
+
+def count_completed_today(db: Session, user_id: uuid.UUID) -> int:
+    today_start = datetime.now(UTC).date()
+    stmt = (
+        select(func.count())
+        .select_from(models.ReviewLog)
+        .where(
+            models.ReviewLog.user_id == user_id,
+            models.ReviewLog.reviewed_at >= today_start
+        )
+    )
+    return db.scalar(stmt)
+
+def get_session_progress(db: Session, user_id: uuid.UUID) -> schemas.SessionProgress:
+    return schemas.SessionProgress(completed_today=count_completed_today(db, user_id), goal_today=GOAL_TODAY)
+
+def fetch_next_cards(db: Session, user_id: uuid.UUID, limit: int = 1) -> List[CardRow]:
+    """
+    Picks the next cards across the user's active decks, from today's study
+    plan if one was built and something in it is due. Otherwise they are
+    picked live. When no reviews are due and no new cards are left within
+    today's quotas, the reviews due soonest are studied ahead of time.
+    """
+    planned = next_planned_cards(db, user_id, limit)
+    if planned:
+        return planned
+    scheduler = InterleavingScheduler(db, user_id, window_size=min(limit, WINDOW_SIZE))
+    return scheduler.next_cards(limit) or scheduler.study_ahead(limit)
+
+def build_card_response(card: CardRow) -> schemas.Card:
+    return schemas.Card(
+        card_id=card.id,
+        deck=schemas.DeckInfo(id=card.deck_id, name=card.deck_name),
+        sentence_template=card.sentence_template,
+        target=schemas.CardTarget(word=card.target_word, hint=card.hint),
+        reading=card.reading,
+        audio_url=storage_provider.get_url(card.audio_url),
+        sentence=card.sentence,
+        sentence_furigana=card.sentence_furigana,
+        sentence_segments=card.sentence_segments,
+        sentence_translation=card.sentence_translation,
+        sentence_audio_url=storage_provider.get_url(card.sentence_audio_url),
+        distractors=card.distractors,
+        proficiency_level=card.proficiency_level
+    )
+
+def build_upcoming_audio(db: Session, cards: List[CardRow]) -> List[schemas.AudioAsset]:
+    """The prefetch manifest for the cards expected after the current one."""
+    card_audio = load_card_audio(db, cards)
+    return prefetch_manifest(card_audio[card.id] for card in cards)
+
+class StudySession:
+    """
+    Per-connection study state for the WebSocket session channel. Today's
+    counter is loaded once and then kept up to date locally, and upcoming
+    cards are fetched in batches, so an answer costs one insert and the next
+    card is usually already in memory. The audio of each batch is resolved
+    with it, and every card lists the audio of the queued cards after it.
+    """
+
+    def __init__(self, db: Session, user_id: uuid.UUID, prefetch_size: int = 10, audio_prefetch_count: int = settings.AUDIO_PREFETCH_COUNT):
+        self.db = db
+        self.user_id = user_id
+        self.prefetch_size = prefetch_size
+        self.audio_prefetch_count = audio_prefetch_count
+        self.completed_today: Optional[int] = None
+        self.upcoming: Deque[schemas.Card] = deque()
+        self.audio: Dict[uuid.UUID, List[schemas.AudioAsset]] = {}
+        self.scheduler = InterleavingScheduler(db, user_id)
+
+    def _refill(self) -> None:
+        cards = self.scheduler.next_cards(self.prefetch_size) or self.scheduler.study_ahead(self.prefetch_size)
+        self.upcoming.extend(build_card_response(card) for card in cards)
+        self.audio.update(load_card_audio(self.db, cards))
+        # Release the connection while the learner is thinking.
+        self.db.commit()
+
+    def answer(self, answer: schemas.PreviousAnswer) -> None:
+        record_answer(self.db, self.user_id, answer)
+        if self.completed_today is not None:
+            self.completed_today += 1
+        # Don't show the card that was just answered again straight away.
+        self.upcoming = deque(card for card in self.upcoming if card.card_id != answer.card_id)
+        self.audio.pop(answer.card_id, None)
+
+    def next(self) -> schemas.NextCardResponse:
+        if self.completed_today is None:
+            self.completed_today = count_completed_today(self.db, self.user_id)
+        if not self.upcoming:
+            self._refill()
+        card = self.upcoming.popleft() if self.upcoming else None
+        progress = schemas.SessionProgress(completed_today=self.completed_today, goal_today=GOAL_TODAY)
+        upcoming = itertools.islice(self.upcoming, self.audio_prefetch_count)
+        upcoming_audio = prefetch_manifest(self.audio.get(next_card.card_id, []) for next_card in upcoming)
+        return schemas.NextCardResponse(card=card, session_progress=progress, upcoming_audio=upcoming_audio)
@@ -0,0 +1,211 @@
+import uuid
+from dataclasses import replace
+from datetime import date
+from typing import List, Optional, Sequence
+
+from sqlalchemy import (
+    Date, DateTime, and_, case, cast, column, delete, false, func, literal, not_, select, true, tuple_, values,
+)
+from sqlalchemy.dialects.postgresql import UUID, insert
+from sqlalchemy.orm import Session
+
+from dabia import models
+from dabia.services.card_cache import load_cards
+from dabia.services.rows import CardRow
+from dabia.services.scheduler import CURSOR_START
+
+# Users who answered a card in this many days get a plan built for them.
+# Everyone else is served by the interleaving scheduler.
+ACTIVE_DAYS = 14
+
+PLAN_COLUMNS = ["user_id", "plan_date", "card_id", "deck_id", "is_new", "due_at", "position"]
+
+def active_user_ids(db: Session, days: int = ACTIVE_DAYS) -> List[uuid.UUID]:
+    """Users whose deck progress was updated, i.e. who answered a card, in the last `days` days."""
+    UserDeck = models.UserDeck
+    stmt = (
+        select(UserDeck.user_id)
+        .where(UserDeck.updated_at >= func.now() - func.make_interval(0, 0, 0, days))
+        .group_by(UserDeck.user_id)
+        .order_by(UserDeck.user_id)
+    )
+    return list(db.scalars(stmt))
+
+def _plan_day(plan_date: Optional[date]):
+    """The plan's date as a SQL expression: tomorrow by the database's clock unless given."""
+    return func.current_date() + 1 if plan_date is None else literal(plan_date, Date)
+
+def _deck_states(user_ids: Sequence[uuid.UUID], day):
+    """
+    Each user's active decks, from their user_decks rows, with their cursors
+    and what is left of the quotas on `day`. Counters from an earlier day
+    don't count against it.
+    """
+    UserDeck = models.UserDeck
+    users = values(column("user_id", UUID(as_uuid=True)), name="users").data([(user_id,) for user_id in user_ids])
+    counted_that_day = UserDeck.counted_on == day
+
+    def left(quota, used):
+        return func.greatest(quota - case((counted_that_day, used), else_=0), 0)
+
+    return (
+        select(
+            users.c.user_id,
+            UserDeck.deck_id,
+            func.coalesce(UserDeck.new_cursor_order_key, CURSOR_START[0]).label("cursor_key"),
+            func.coalesce(UserDeck.new_cursor_card_id, CURSOR_START[1]).label("cursor_id"),
+            left(UserDeck.new_cards_per_day, UserDeck.new_today).label("new_left"),
+            left(UserDeck.reviews_per_day, UserDeck.reviews_today).label("reviews_left"),
+        )
+        .select_from(users)
+        .join(UserDeck, UserDeck.user_id == users.c.user_id)
+        .where(UserDeck.is_active)
+        .cte("deck_states")
+    )
+
+def _due_reviews_select(states, day):
+    """
+    Reviews due by the end of `day` in each deck, most overdue first, within
+    the review quota. Each deck is an index range scan on the user's partition.
+    """
+    Assoc = models.UserCardAssociation
+    window = (
+        select(Assoc.card_id, Assoc.next_review_at)
+        .where(
+            Assoc.user_id == states.c.user_id,
+            Assoc.deck_id == states.c.deck_id,
+            not_(Assoc.is_suspended),
+            Assoc.next_review_at < day + 1,
+        )
+        .order_by(Assoc.next_review_at, Assoc.card_id)
+        .limit(states.c.reviews_left)
+        .lateral("due_window")
+    )
+    return (
+        select(
+            states.c.user_id, day, window.c.card_id, states.c.deck_id,
+            false(), window.c.next_review_at,
+            func.row_number().over(
+                partition_by=(states.c.user_id, states.c.deck_id),
+                order_by=(window.c.next_review_at, window.c.card_id),
+            ),
+        )
+        .select_from(states)
+        .join(window, true())
+    )
+
+def _new_cards_select(states, day):
+    """
+    The next new cards after each deck's cursor, within the new card quota.
+    Cards the user already has an association for are reviews, not new.
+    """
+    Card, Assoc = models.Card, models.UserCardAssociation
+    window = (
+        select(Card.id, Card.order_key)
+        .where(
+            Card.deck_id == states.c.deck_id,
+            tuple_(Card.order_key, Card.id) > tuple_(states.c.cursor_key, states.c.cursor_id),
+            ~select(Assoc.card_id)
+            .where(Assoc.user_id == states.c.user_id, Assoc.card_id == Card.id)
+            .correlate_except(Assoc)
+            .exists(),
+        )
+        .order_by(Card.order_key, Card.id)
+        .limit(states.c.new_left)
+        .lateral("new_window")
+    )
+    return (
+        select(
+            states.c.user_id, day, window.c.id, states.c.deck_id,
+            true(), cast(day, DateTime),
+            func.row_number().over(
+                partition_by=(states.c.user_id, states.c.deck_id),
+                order_by=(window.c.order_key, window.c.id),
+            ),
+        )
+        .select_from(states)
+        .join(window, true())
+    )
+
+def build_study_plans(db: Session, user_ids: Sequence[uuid.UUID], plan_date: Optional[date] = None) -> int:
+    """
+    Replaces the users' study plans for `plan_date`, tomorrow by default, so
+    a nightly run builds the plans of the day ahead: the reviews due by the
+    end of that day and the next new cards, within each deck's quotas for
+    it. Plans for other days are left alone. Written in bulk, in one
+    transaction per call. Returns the number of entries.
+    """
+    Plan = models.StudyPlanEntry
+    if not user_ids:
+        return 0
+    day = _plan_day(plan_date)
+    db.execute(delete(Plan).where(Plan.user_id.in_(user_ids), Plan.plan_date == day))
+    states = _deck_states(user_ids, day)
+    written = db.execute(insert(Plan).from_select(PLAN_COLUMNS, _due_reviews_select(states, day))).rowcount
+    # New cards never have an association, so they can't clash with reviews;
+    # DO NOTHING only guards against two builds for the same users at once.
+    stmt = insert(Plan).from_select(PLAN_COLUMNS, _new_cards_select(states, day)).on_conflict_do_nothing()
+    written += db.execute(stmt).rowcount
+    db.commit()
+    return written
+
+def delete_expired_plans(db: Session) -> int:
+    Plan = models.StudyPlanEntry
+    deleted = db.execute(delete(Plan).where(Plan.plan_date < func.current_date())).rowcount
+    db.commit()
+    return deleted
+
+def next_planned_cards(db: Session, user_id: uuid.UUID, limit: int = 1) -> List[CardRow]:
+    """
+    The first due entries of the user's plan for today, in plan order. Empty
+    if the user has no plan, or nothing in it is due yet. Entries of paused
+    decks and suspended cards are skipped.
+    """
+    Plan, Assoc, UserDeck = models.StudyPlanEntry, models.UserCardAssociation, models.UserDeck
+    stmt = (
+        select(Plan.card_id, Plan.deck_id, Assoc.proficiency_level)
+        .outerjoin(Assoc, and_(Assoc.user_id == Plan.user_id, Assoc.card_id == Plan.card_id))
+        .outerjoin(UserDeck, and_(UserDeck.user_id == Plan.user_id, UserDeck.deck_id == Plan.deck_id))
+        .where(
+            Plan.user_id == user_id,
+            Plan.plan_date == func.current_date(),
+            Plan.due_at <= func.now(),
+            func.coalesce(UserDeck.is_active, True),
+            not_(func.coalesce(Assoc.is_suspended, False)),
+        )
+        .order_by(Plan.is_new, Plan.due_at, Plan.position, Plan.card_id)
+        .limit(limit)
+    )
+    rows = db.execute(stmt).all()
+    if not rows:
+        return []
+    contents = load_cards(db, [row[0] for row in rows])
+    return [
+        replace(contents[card_id], proficiency_level=level or 0)
+        for card_id, _, level in rows if card_id in contents
+    ]
+
+def update_study_plan(db: Session, user_id: uuid.UUID, card_id: uuid.UUID) -> None:
+    """
+    Takes an answered card out of today's plan and any plan already built
+    for a later day, in one statement. If the answer made it due again by
+    the end of a plan's day, as a wrong answer does for today's, it goes
+    back into that plan as a review at its new due time. Cards that weren't
+    planned are ignored.
+    """
+    Plan, Assoc = models.StudyPlanEntry, models.UserCardAssociation
+    answered = (
+        delete(Plan)
+        .where(Plan.user_id == user_id, Plan.plan_date >= func.current_date(), Plan.card_id == card_id)
+        .returning(Plan.user_id, Plan.plan_date, Plan.card_id, Plan.deck_id, Plan.position)
+        .cte("answered")
+    )
+    relearn = (
+        select(
+            answered.c.user_id, answered.c.plan_date, answered.c.card_id, answered.c.deck_id,
+            false(), Assoc.next_review_at, answered.c.position,
+        )
+        .join(Assoc, and_(Assoc.user_id == answered.c.user_id, Assoc.card_id == answered.c.card_id))
+        .where(not_(Assoc.is_suspended), Assoc.next_review_at < answered.c.plan_date + 1)
+    )
+    db.execute(insert(Plan).from_select(PLAN_COLUMNS, relearn).add_cte(answered))
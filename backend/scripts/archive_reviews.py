@@ -0,0 +1,60 @@
+import argparse
+import sys
+from datetime import date
+from pathlib import Path
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, sessionmaker
+
+# Add the project root to the Python path to allow importing from 'dabia'
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from dabia.core.config import settings
+from dabia.services.archive import archive_reviews
+
+def get_session(db_url: str = None) -> Session:
+    """Gets a database session, creating a new engine if a db_url is provided."""
+    if db_url:
+        print("Connecting to custom database...")
+        engine = create_engine(db_url)
+        SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+        return SessionLocal()
+    else:
+        from dabia.database import get_db
+        print("Connecting to default database from .env file...")
+        return next(get_db())
+
+def main(args: argparse.Namespace):
+    """Moves review logs older than the cutoff into monthly columnar files."""
+    print(f"--- Archiving review logs before {args.before:%Y-%m} into {args.archive_dir} ---")
+
+    db: Session = get_session(args.db_url)
+    try:
+        archived = archive_reviews(
+            db,
+            before=args.before,
+            archive_dir=args.archive_dir,
+            compression=None if args.compression == "none" else args.compression,
+            delete_rows=not args.keep_rows,
+        )
+    except Exception as e:
+        print(f"An error occurred: {e}", file=sys.stderr)
+        db.rollback()
+        sys.exit(1)
+    finally:
+        db.close()
+
+    for month in archived:
+        print(f"Archived {month.rows} reviews from {month.month:%Y-%m} to {month.path}")
+    print(f"--- Archive complete. Processed {sum(m.rows for m in archived)} rows. ---")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Archive old review logs into compressed columnar files.")
+    parser.add_argument("before", type=date.fromisoformat, help="Archive whole months before this date (YYYY-MM-DD).")
+    parser.add_argument("--archive-dir", type=Path, default=Path(settings.ARCHIVE_DIR), help="Directory to write the archive to.")
+    parser.add_argument("--compression", choices=["zstd", "lz4", "none"], default="zstd", help="Buffer compression (default: zstd).")
+    parser.add_argument("--keep-rows", action="store_true", help="Write the archive but keep the rows in Postgres.")
+    parser.add_argument("--db-url", type=str, help="Optional: The full database connection URL. Overrides the .env file.")
+    args = parser.parse_args()
+
+    main(args)
@@ -0,0 +1,106 @@
+import argparse
+import sys
+import time
+import tracemalloc
+import uuid
+from pathlib import Path
+
+from sqlalchemy import create_engine, func
+from sqlalchemy.orm import Session, joinedload, sessionmaker
+
+# Add the project root to the Python path to allow importing from 'dabia'
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from dabia import models, schemas
+from dabia.core.security import DEFAULT_USER_ID
+from dabia.core.storage import storage_provider
+from dabia.services.study import build_card_response, fetch_next_cards
+
+def get_session(db_url: str = None) -> Session:
+    """Gets a database session, creating a new engine if a db_url is provided."""
+    if db_url:
+        print("Connecting to custom database...")
+        engine = create_engine(db_url)
+        SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+        return SessionLocal()
+    else:
+        from dabia.database import get_db
+        print("Connecting to default database from .env file...")
+        return next(get_db())
+
+def orm_next_cards(db: Session, user_id: uuid.UUID, limit: int):
+    """The previous implementation: full ORM instances with eager-loaded relationships."""
+    cards = (
+        db.query(models.Card)
+        .options(joinedload(models.Card.deck), joinedload(models.Card.users))
+        .order_by(func.random())
+        .limit(limit)
+        .all()
+    )
+    responses = []
+    for card in cards:
+        user_assoc = next((assoc for assoc in card.users if assoc.user_id == user_id), None)
+        responses.append(schemas.Card(
+            card_id=card.id,
+            deck=schemas.DeckInfo(id=card.deck.id, name=card.deck.name),
+            sentence_template=card.sentence_template,
+            target=schemas.CardTarget(word=card.target_word, hint=card.hint),
+            reading=card.reading,
+            audio_url=storage_provider.get_url(card.audio_url),
+            sentence=card.sentence,
+            sentence_furigana=card.sentence_furigana,
+            sentence_translation=card.sentence_translation,
+            sentence_audio_url=storage_provider.get_url(card.sentence_audio_url),
+            proficiency_level=user_assoc.proficiency_level if user_assoc else 0,
+        ))
+    return responses
+
+def core_next_cards(db: Session, user_id: uuid.UUID, limit: int):
+    return [build_card_response(card) for card in fetch_next_cards(db, user_id, limit)]
+
+def measure(db: Session, fn, user_id: uuid.UUID, limit: int, iterations: int):
+    """Returns CPU seconds and peak traced bytes per call."""
+    fn(db, user_id, limit)  # Warm up caches and compiled statements.
+    db.rollback()
+
+    cpu_start = time.process_time()
+    for _ in range(iterations):
+        fn(db, user_id, limit)
+        db.rollback()
+    cpu = (time.process_time() - cpu_start) / iterations
+
+    tracemalloc.start()
+    for _ in range(iterations):
+        tracemalloc.reset_peak()
+        fn(db, user_id, limit)
+        db.rollback()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return cpu, peak
+
+def main(args: argparse.Namespace):
+    """Compares the ORM and Core paths for fetching the next cards."""
+    db = get_session(args.db_url)
+    try:
+        print(f"--- {args.iterations} iterations, {args.limit} card(s) per call ---")
+        results = {}
+        for name, fn in (("orm", orm_next_cards), ("core", core_next_cards)):
+            cpu, peak = measure(db, fn, args.user_id, args.limit, args.iterations)
+            results[name] = (cpu, peak)
+            print(f"{name:>5}: {cpu * 1000:8.3f} ms CPU/call, {peak / 1024:8.1f} KiB peak/call")
+
+        (orm_cpu, orm_peak), (core_cpu, core_peak) = results["orm"], results["core"]
+        if core_cpu and core_peak:
+            print(f"--- Core path: {orm_cpu / core_cpu:.1f}x less CPU, {orm_peak / core_peak:.1f}x less memory ---")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the next-card query on the ORM and Core paths.")
+    parser.add_argument("--user-id", type=uuid.UUID, default=DEFAULT_USER_ID, help="User to fetch cards for (default: the seeded default user).")
+    parser.add_argument("--limit", type=int, default=10, help="Cards fetched per call (default: 10, the WebSocket prefetch size).")
+    parser.add_argument("--iterations", type=int, default=200, help="Calls per path (default: 200).")
+    parser.add_argument("--db-url", type=str, help="Optional: The full database connection URL. Overrides the .env file.")
+    args = parser.parse_args()
+
+    main(args)
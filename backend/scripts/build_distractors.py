@@ -0,0 +1,45 @@
+import argparse
+import sys
+import time
+import uuid
+from pathlib import Path
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, sessionmaker
+
+# Add the project root to the Python path to allow importing from 'dabia'
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from dabia.services.distractors import DISTRACTOR_COUNT, rebuild_distractors
+
+def get_session(db_url: str = None) -> Session:
+    """Gets a database session, creating a new engine if a db_url is provided."""
+    if db_url:
+        print("Connecting to custom database...")
+        engine = create_engine(db_url)
+        SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+        return SessionLocal()
+    else:
+        from dabia.database import get_db
+        print("Connecting to default database from .env file...")
+        return next(get_db())
+
+def main(args: argparse.Namespace):
+    """Recomputes multiple-choice distractors for the given decks, or all of them."""
+    db = get_session(args.db_url)
+    try:
+        print("--- Building distractor index ---")
+        start = time.perf_counter()
+        updated = rebuild_distractors(db, deck_ids=args.deck_id, k=args.count)
+        print(f"--- Updated {updated} cards in {time.perf_counter() - start:.1f}s ---")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Precompute multiple-choice distractors for cards.")
+    parser.add_argument("--deck-id", type=uuid.UUID, action="append", help="Deck to rebuild; may be repeated (default: all decks).")
+    parser.add_argument("--count", type=int, default=DISTRACTOR_COUNT, help=f"Distractors per card (default: {DISTRACTOR_COUNT}).")
+    parser.add_argument("--db-url", type=str, help="Optional: The full database connection URL. Overrides the .env file.")
+    args = parser.parse_args()
+
+    main(args)
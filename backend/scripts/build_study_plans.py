@@ -0,0 +1,54 @@
+import argparse
+import sys
+import time
+from datetime import date
+from pathlib import Path
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, sessionmaker
+
+# Add the project root to the Python path to allow importing from 'dabia'
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from dabia.services.study_plan import ACTIVE_DAYS, active_user_ids, build_study_plans, delete_expired_plans
+
+def get_session(db_url: str = None) -> Session:
+    """Gets a database session, creating a new engine if a db_url is provided."""
+    if db_url:
+        print("Connecting to custom database...")
+        engine = create_engine(db_url)
+        SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+        return SessionLocal()
+    else:
+        from dabia.database import get_db
+        print("Connecting to default database from .env file...")
+        return next(get_db())
+
+def main(args: argparse.Namespace):
+    """Builds the study plans of the day ahead for every active user, a batch of users per transaction."""
+    db = get_session(args.db_url)
+    try:
+        deleted = delete_expired_plans(db)
+        print(f"--- Deleted {deleted} entries of past plans ---")
+
+        user_ids = active_user_ids(db, args.active_days)
+        day = args.plan_date.isoformat() if args.plan_date else "tomorrow"
+        print(f"--- Building {day}'s study plans for {len(user_ids)} users active in the last {args.active_days} days ---")
+        start = time.perf_counter()
+        written = 0
+        for i in range(0, len(user_ids), args.batch_size):
+            written += build_study_plans(db, user_ids[i:i + args.batch_size], args.plan_date)
+            print(f"Planned {min(i + args.batch_size, len(user_ids))}/{len(user_ids)} users, {written} entries")
+        print(f"--- Wrote {written} plan entries in {time.perf_counter() - start:.1f}s ---")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Precompute the next day's study plans for active users.")
+    parser.add_argument("--active-days", type=int, default=ACTIVE_DAYS, help=f"Plan for users who answered a card in this many days (default: {ACTIVE_DAYS}).")
+    parser.add_argument("--plan-date", type=date.fromisoformat, help="Optional: Build the plans for this day, as YYYY-MM-DD (default: tomorrow).")
+    parser.add_argument("--batch-size", type=int, default=200, help="Users planned per transaction (default: 200).")
+    parser.add_argument("--db-url", type=str, help="Optional: The full database connection URL. Overrides the .env file.")
+    args = parser.parse_args()
+
+    main(args)
@@ -0,0 +1,63 @@
+import argparse
+import sys
+import uuid
+from datetime import datetime
+from pathlib import Path
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, sessionmaker
+
+# Add the project root to the Python path to allow importing from 'dabia'
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from dabia.services.export import export_reviews, FORMATS
+
+def get_session(db_url: str = None) -> Session:
+    """Gets a database session, creating a new engine if a db_url is provided."""
+    if db_url:
+        print("Connecting to custom database...", file=sys.stderr)
+        engine = create_engine(db_url)
+        SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+        return SessionLocal()
+    else:
+        from dabia.database import get_db
+        print("Connecting to default database from .env file...", file=sys.stderr)
+        return next(get_db())
+
+def main(args: argparse.Namespace):
+    """Streams review logs matching the filters to a file or stdout."""
+    db: Session = get_session(args.db_url)
+    output = open(args.output, "w", encoding="utf-8", newline="") if args.output else sys.stdout
+
+    try:
+        for chunk in export_reviews(
+            db,
+            args.format,
+            user_id=args.user_id,
+            deck_id=args.deck_id,
+            since=args.since,
+            until=args.until,
+        ):
+            output.write(chunk)
+    except Exception as e:
+        print(f"An error occurred: {e}", file=sys.stderr)
+        sys.exit(1)
+    finally:
+        if output is not sys.stdout:
+            output.close()
+        db.close()
+
+    print("--- Export complete. ---", file=sys.stderr)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export review logs as CSV or NDJSON.")
+    parser.add_argument("--format", choices=sorted(FORMATS), default="csv", help="Output format (default: csv).")
+    parser.add_argument("--output", type=Path, help="File to write to. Defaults to stdout.")
+    parser.add_argument("--user-id", type=uuid.UUID, help="Only export reviews by this user.")
+    parser.add_argument("--deck-id", type=uuid.UUID, help="Only export reviews of cards in this deck.")
+    parser.add_argument("--since", type=datetime.fromisoformat, help="Only export reviews at or after this UTC timestamp.")
+    parser.add_argument("--until", type=datetime.fromisoformat, help="Only export reviews before this UTC timestamp.")
+    parser.add_argument("--db-url", type=str, help="Optional: The full database connection URL. Overrides the .env file.")
+    args = parser.parse_args()
+
+    main(args)
@@ -4,14 +4,18 @@ import sys
 from pathlib import Path
 from typing import Dict, Any, List, Generator
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, func, select
 from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.orm import Session, sessionmaker
 
 # Add the project root to the Python path to allow importing from 'dabia'
 sys.path.append(str(Path(__file__).resolve().parents[1]))
 
+from dabia.core.furigana import parse_furigana
 from dabia.models import Card, Deck
+from dabia.services.distractors import rebuild_distractors
+from dabia.services.media import record_media_assets
+from dabia.services.rows import NewCardRow
 
 CHUNK_SIZE = 500
 
@@ -45,6 +49,50 @@ def get_or_create_deck(db: Session, deck_name: str, cache: Dict[str, Any]) -> An
     cache[deck_name] = new_deck.id
     return new_deck.id
 
+def load_frequency_ranks(path: Path) -> Dict[str, int]:
+    """
+    Reads a frequency list with one word per line, most frequent first.
+    Anything after a tab (counts, readings) is ignored.
+    """
+    ranks: Dict[str, int] = {}
+    with open(path, mode='r', encoding='utf-8') as f:
+        for line in f:
+            word = line.split('\t', 1)[0].strip()
+            if word and word not in ranks:
+                ranks[word] = len(ranks) + 1
+    return ranks
+
+def deck_key_base(db: Session, deck_id: Any, cache: Dict[Any, int]) -> int:
+    """
+    The deck's largest order_key before this import. New cards are keyed
+    after it, so they are introduced after every card already in the deck
+    and never sort before a user's cursor.
+    """
+    if deck_id not in cache:
+        cache[deck_id] = db.scalar(select(func.coalesce(func.max(Card.order_key), 0)).where(Card.deck_id == deck_id))
+    return cache[deck_id]
+
+def insert_cards(db: Session, card_mappings: List[Dict[str, Any]], reorder: bool = False) -> List[Any]:
+    """
+    Inserts new cards. Existing cards are left alone, unless `reorder` is set
+    (a frequency list was given), in which case they get the new order_key.
+    Returns the ids of the cards inserted or updated.
+    """
+    # ON CONFLICT DO UPDATE can't touch the same row twice in one statement.
+    unique_mappings = list({mapping["guid"]: mapping for mapping in card_mappings}.values())
+    stmt = insert(Card).values(unique_mappings)
+    if reorder:
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['guid'],
+            set_={"order_key": stmt.excluded.order_key},
+            where=Card.order_key.is_distinct_from(stmt.excluded.order_key),
+        )
+    else:
+        stmt = stmt.on_conflict_do_nothing(index_elements=['guid'])
+    card_ids = db.scalars(stmt.returning(Card.id)).all()
+    db.commit()
+    return card_ids
+
 def get_session(db_url: str = None) -> Session:
     """Gets a database session, creating a new engine if a db_url is provided."""
     if db_url:
@@ -57,18 +105,28 @@ def get_session(db_url: str = None) -> Session:
         print("Connecting to default database from .env file...")
         return next(get_db())
 
-def main(csv_path: Path, db_url: str = None):
+def main(csv_path: Path, db_url: str = None, frequency_list: Path = None, media_dir: Path = None):
     """Main function to import card data from a CSV file."""
     print(f"--- Starting data import from {csv_path} ---")
 
     db: Session = get_session(db_url)
     deck_cache: Dict[str, Any] = {}
+    # New cards are introduced by frequency rank if a list is given, otherwise
+    # in file order. Words missing from the list go after all ranked ones.
+    # Without a list, cards are keyed after the deck's existing ones and
+    # existing cards keep their keys; with one, every card is re-ranked.
+    ranks = load_frequency_ranks(frequency_list) if frequency_list else {}
+    reorder = bool(ranks)
+    key_bases: Dict[Any, int] = {}
 
     try:
         with open(csv_path, mode='r', encoding='utf-8') as f:
             reader = csv.reader(f)
             total_processed = 0
             card_mappings = []
+            touched_card_ids = []
+            audio_files = []
+            missing_media = []
 
             for i, row in enumerate(reader):
                 # Skip metadata lines
@@ -95,38 +153,52 @@ def main(csv_path: Path, db_url: str = None):
                 word_audio = word_audio_raw.replace('[sound:', '').replace(']', '')
                 sentence_audio = sentence_audio_raw.replace('[sound:', '').replace(']', '')
 
-                card_mappings.append({
-                    "guid": guid,
-                    "deck_id": deck_id,
-                    "sentence_template": sentence.replace(word, "__"), # Create a simple cloze
-                    "target_word": word,
-                    "reading": reading,
-                    "hint": gloss,
-                    "audio_url": word_audio or None,
-                    "sentence": sentence,
-                    "sentence_furigana": sentence_furigana,
-                    "sentence_translation": sentence_translation,
-                    "sentence_audio_url": sentence_audio or None,
-                })
+                order_key = ranks.get(word, len(ranks) + i + 1)
+                if not reorder:
+                    order_key += deck_key_base(db, deck_id, key_bases)
+
+                card_mappings.append(NewCardRow(
+                    guid=guid,
+                    deck_id=deck_id,
+                    order_key=order_key,
+                    sentence_template=sentence.replace(word, "__"), # Create a simple cloze
+                    target_word=word,
+                    reading=reading,
+                    hint=gloss,
+                    audio_url=word_audio or None,
+                    sentence=sentence,
+                    sentence_furigana=sentence_furigana,
+                    sentence_segments=parse_furigana(sentence_furigana),
+                    sentence_translation=sentence_translation,
+                    sentence_audio_url=sentence_audio or None,
+                ).to_values())
+                audio_files.extend(filename for filename in (word_audio, sentence_audio) if filename)
 
                 # Process in chunks
                 if len(card_mappings) >= CHUNK_SIZE:
                     print(f"Processing chunk of {len(card_mappings)} cards...")
-                    stmt = insert(Card).values(card_mappings)
-                    stmt = stmt.on_conflict_do_nothing(index_elements=['guid'])
-                    db.execute(stmt)
-                    db.commit()
+                    touched_card_ids.extend(insert_cards(db, card_mappings, reorder))
                     total_processed += len(card_mappings)
                     card_mappings = []
+                    if media_dir:
+                        missing_media.extend(record_media_assets(db, media_dir, audio_files))
+                    audio_files = []
 
             # Process any remaining cards
             if card_mappings:
                 print(f"Processing final chunk of {len(card_mappings)} cards...")
-                stmt = insert(Card).values(card_mappings)
-                stmt = stmt.on_conflict_do_nothing(index_elements=['guid'])
-                db.execute(stmt)
-                db.commit()
+                touched_card_ids.extend(insert_cards(db, card_mappings, reorder))
                 total_processed += len(card_mappings)
+                if media_dir:
+                    missing_media.extend(record_media_assets(db, media_dir, audio_files))
+
+        if missing_media:
+            print(f"Warning: {len(missing_media)} audio files not found in {media_dir}, e.g. {missing_media[0]}")
+
+        # Only new or reordered cards need multiple-choice distractors.
+        if touched_card_ids:
+            print(f"Computing distractors for {len(touched_card_ids)} cards...")
+            rebuild_distractors(db, card_ids=touched_card_ids)
 
     except FileNotFoundError:
         print(f"Error: File not found at {csv_path}", file=sys.stderr)
@@ -148,7 +220,9 @@ def main(csv_path: Path, db_url: str = None):
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Import card data from a CSV file into the database.")
     parser.add_argument("csv_path", type=Path, help="The absolute path to the notes.csv file.")
+    parser.add_argument("--frequency-list", type=Path, help="Optional: A word frequency list that sets the order new cards are introduced in.")
+    parser.add_argument("--media-dir", type=Path, help="Optional: The directory with the audio files (e.g. Anki's collection.media). Their hashes and sizes are recorded for client prefetching.")
     parser.add_argument("--db-url", type=str, help="Optional: The full database connection URL. Overrides the .env file.")
     args = parser.parse_args()
 
-    main(args.csv_path, args.db_url)
+    main(args.csv_path, args.db_url, args.frequency_list, args.media_dir)
@@ -0,0 +1,141 @@
+import argparse
+import sys
+import time
+import uuid
+from pathlib import Path
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session, sessionmaker
+
+# Add the project root to the Python path to allow importing from 'dabia'
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+LIVE = "user_card_associations"
+SHADOW = "user_card_associations_partitioned"
+OLD = "user_card_associations_old"
+
+INDEXES = (
+    "ix_user_card_associations_user_id_updated_at",
+    "ix_user_card_associations_user_id_next_review_at",
+    "ix_user_card_associations_user_id_deck_id_next_review_at",
+    "ix_user_card_associations_user_id_suspended_at",
+)
+
+# Copies one keyset batch and returns its size and last key. FOR KEY SHARE
+# makes a concurrent delete wait until the copy is committed, so the mirror
+# trigger then removes the copy too; updates don't wait, and the trigger's
+# upsert overwrites whatever the batch copied.
+COPY_BATCH = text(f"""
+    WITH batch AS (
+        SELECT * FROM {LIVE}
+        WHERE (user_id, card_id) > (:after_user_id, :after_card_id)
+        ORDER BY user_id, card_id
+        LIMIT :batch_size
+        FOR KEY SHARE
+    ), copied AS (
+        INSERT INTO {SHADOW} SELECT * FROM batch
+        ON CONFLICT (user_id, card_id) DO NOTHING
+    )
+    SELECT (SELECT count(*) FROM batch), user_id, card_id
+    FROM batch ORDER BY user_id DESC, card_id DESC LIMIT 1
+""")
+
+def get_session(db_url: str = None) -> Session:
+    """Gets a database session, creating a new engine if a db_url is provided."""
+    if db_url:
+        print("Connecting to custom database...")
+        engine = create_engine(db_url)
+        SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+        return SessionLocal()
+    else:
+        from dabia.database import get_db
+        print("Connecting to default database from .env file...")
+        return next(get_db())
+
+def table_exists(db: Session, name: str) -> bool:
+    return db.scalar(text("SELECT to_regclass(:name) IS NOT NULL"), {"name": name})
+
+def backfill(db: Session, batch_size: int, pause: float, after: tuple) -> int:
+    """Copies every live row into the shadow table, one short transaction per batch."""
+    copied = 0
+    started = time.perf_counter()
+    while True:
+        row = db.execute(COPY_BATCH, {
+            "after_user_id": after[0], "after_card_id": after[1], "batch_size": batch_size,
+        }).first()
+        db.commit()
+        if row is None:
+            break
+        count, *after = row
+        copied += count
+        print(f"Copied {copied} rows ({copied / (time.perf_counter() - started):.0f}/s), last key {after[0]}:{after[1]}")
+        if count < batch_size:
+            break
+        time.sleep(pause)
+    return copied
+
+def swap(db: Session, lock_timeout: str) -> None:
+    """
+    Renames the shadow table into place in one transaction. Only catalog
+    changes happen under the exclusive lock, so it is held for milliseconds;
+    if the lock can't be taken within lock_timeout the swap is abandoned.
+    """
+    db.execute(text(f"SET LOCAL lock_timeout = '{lock_timeout}'"))
+    db.execute(text(f"LOCK TABLE {LIVE}, {SHADOW} IN ACCESS EXCLUSIVE MODE"))
+    db.execute(text(f"DROP TRIGGER user_card_associations_mirror ON {LIVE}"))
+    db.execute(text(f"ALTER TABLE {LIVE} RENAME TO {OLD}"))
+    db.execute(text(f"ALTER TABLE {OLD} RENAME CONSTRAINT {LIVE}_pkey TO {OLD}_pkey"))
+    for index in INDEXES:
+        db.execute(text(f"ALTER INDEX {index} RENAME TO {index}_old"))
+    db.execute(text(f"ALTER TABLE {SHADOW} RENAME TO {LIVE}"))
+    db.execute(text(f"ALTER TABLE {LIVE} RENAME CONSTRAINT {SHADOW}_pkey TO {LIVE}_pkey"))
+    for index in INDEXES:
+        db.execute(text(f"ALTER INDEX {index}_new RENAME TO {index}"))
+    db.execute(text("DROP FUNCTION mirror_user_card_associations()"))
+    db.commit()
+
+def main(args: argparse.Namespace):
+    """Moves user_card_associations into its hash-partitioned shadow table."""
+    db = get_session(args.db_url)
+    try:
+        if not table_exists(db, SHADOW):
+            print(f"--- {SHADOW} doesn't exist: run the migrations first, or the swap is already done ---")
+            return
+
+        if not args.skip_backfill:
+            print(f"--- Copying {LIVE} into {SHADOW} in batches of {args.batch_size} ---")
+            copied = backfill(db, args.batch_size, args.pause, (args.after_user_id, args.after_card_id))
+            print(f"--- Backfill complete: {copied} rows ---")
+
+        if args.swap:
+            # One statement, so both counts come from the same snapshot.
+            live, shadow = db.execute(text(f"SELECT (SELECT count(*) FROM {LIVE}), (SELECT count(*) FROM {SHADOW})")).one()
+            db.commit()
+            # The mirror trigger keeps the copies equal once the backfill is done.
+            if live != shadow:
+                print(f"--- Not swapping: {LIVE} has {live} rows, {SHADOW} has {shadow} ---")
+                return
+            swap(db, args.lock_timeout)
+            print(f"--- Swapped: {LIVE} is now partitioned; the previous table is kept as {OLD} ---")
+
+        if args.drop_old and table_exists(db, OLD):
+            db.execute(text(f"DROP TABLE {OLD}"))
+            db.commit()
+            print(f"--- Dropped {OLD} ---")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Partition user_card_associations by user without downtime.")
+    parser.add_argument("--batch-size", type=int, default=5000, help="Rows copied per transaction (default: 5000).")
+    parser.add_argument("--pause", type=float, default=0.05, help="Seconds to sleep between batches (default: 0.05).")
+    parser.add_argument("--after-user-id", type=uuid.UUID, default=uuid.UUID(int=0), help="Resume the backfill after this key, as printed by a previous run.")
+    parser.add_argument("--after-card-id", type=uuid.UUID, default=uuid.UUID(int=0), help="Resume the backfill after this key, as printed by a previous run.")
+    parser.add_argument("--skip-backfill", action="store_true", help="Don't copy rows, e.g. to retry only the swap.")
+    parser.add_argument("--swap", action="store_true", help="After the backfill, swap the partitioned table into place.")
+    parser.add_argument("--lock-timeout", type=str, default="5s", help="Give up the swap if the table lock isn't granted in time (default: 5s).")
+    parser.add_argument("--drop-old", action="store_true", help="Drop the unpartitioned table left by a previous swap.")
+    parser.add_argument("--db-url", type=str, help="Optional: The full database connection URL. Overrides the .env file.")
+    args = parser.parse_args()
+
+    main(args)
@@ -6,6 +6,7 @@ from sqlalchemy.orm import sessionmaker
 from dabia.models.deck import Deck
 from dabia.models.card import Card
 from dabia.core.config import settings
+from dabia.core.furigana import parse_furigana
 
 def seed_data():
     """Seed the database with test data."""
@@ -43,6 +44,7 @@ def seed_data():
                         audio_url=row["audio_url"],
                         sentence=row["sentence"],
                         sentence_furigana=row["sentence_furigana"],
+                        sentence_segments=parse_furigana(row["sentence_furigana"]),
                         sentence_translation=row["sentence_translation"],
                         sentence_audio_url=row["sentence_audio_url"],
                     )
@@ -0,0 +1,107 @@
+from unittest.mock import MagicMock
+import uuid
+from types import SimpleNamespace
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy.dialects import postgresql
+
+from dabia.api.v1.cards import router, search_cards, list_leeches, _search_filters
+from dabia.database import get_read_db
+
+def _compile(clause) -> str:
+    return str(clause.compile(dialect=postgresql.dialect()))
+
+def test_search_cards_maps_rows_ut():
+    """Unit test for turning ranked rows into search results."""
+    # Arrange
+    mock_db = MagicMock()
+    deck_id = uuid.uuid4()
+    row = SimpleNamespace(
+        id=uuid.uuid4(),
+        deck_id=deck_id,
+        deck_name="Test Deck",
+        target_word="丸",
+        hint="circle",
+        reading="まる",
+        sentence="答えに丸をつける",
+        sentence_translation="Draw a circle on the answer",
+        score=1.5,
+    )
+    mock_db.query.return_value.join.return_value.filter.return_value.order_by.return_value.limit.return_value.all.return_value = [row]
+
+    # Act
+    response = search_cards(q=" 丸をつ ", deck_id=None, limit=20, db=mock_db)
+
+    # Assert
+    assert response.query == "丸をつ"
+    assert len(response.results) == 1
+    result = response.results[0]
+    assert result.deck.id == deck_id
+    assert result.target.word == "丸"
+    assert result.score == 1.5
+
+def test_whitespace_only_query_is_rejected_ut():
+    """The query is stripped before its length is checked, so it can't become a bare '%' pattern."""
+    mock_db = MagicMock()
+    app = FastAPI()
+    app.include_router(router)
+    app.dependency_overrides[get_read_db] = lambda: mock_db
+    client = TestClient(app)
+
+    response = client.get("/search", params={"q": "   "})
+
+    assert response.status_code == 422
+    mock_db.query.assert_not_called()
+
+def test_long_query_uses_trigram_match_ut():
+    """Queries of three or more characters match substrings in every column."""
+    match, rank = _search_filters("丸をつ")
+    sql = _compile(match)
+
+    for column in ("target_word", "reading", "hint", "sentence", "sentence_translation"):
+        assert f"cards.{column} ILIKE" in sql
+    assert "word_similarity" in _compile(rank)
+
+def test_short_query_uses_prefix_match_ut():
+    """Queries too short for trigrams fall back to prefix matches."""
+    match, _ = _search_filters("丸")
+    sql = _compile(match)
+
+    assert "ILIKE" not in sql
+    assert "cards.target_word LIKE" in sql
+    assert "cards.reading LIKE" in sql
+
+def test_like_wildcards_are_escaped_ut():
+    """User input must not be interpreted as LIKE wildcards."""
+    match, _ = _search_filters("100%_")
+    params = match.compile(dialect=postgresql.dialect()).params
+
+    assert "%100\\%\\_%" in params.values()
+
+def test_list_leeches_maps_suspended_cards_ut():
+    # Arrange
+    mock_db = MagicMock()
+    row = SimpleNamespace(
+        card_id=uuid.uuid4(),
+        consecutive_lapses=4,
+        total_lapses=6,
+        suspended_at=None,
+        deck_id=uuid.uuid4(),
+        deck_name="Test Deck",
+        target_word="丸",
+        hint="circle",
+        reading="まる",
+    )
+    query = mock_db.query.return_value.join.return_value.join.return_value.filter.return_value
+    query.order_by.return_value.limit.return_value.all.return_value = [row]
+
+    # Act
+    response = list_leeches(limit=100, db=mock_db, current_user_id=uuid.uuid4())
+
+    # Assert
+    leech = response.leeches[0]
+    assert leech.card_id == row.card_id
+    assert leech.consecutive_lapses == 4
+    assert leech.target.word == "丸"
+    query.order_by.return_value.limit.assert_called_once_with(100)
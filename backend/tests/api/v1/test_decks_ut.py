@@ -0,0 +1,33 @@
+from unittest.mock import MagicMock, patch
+import uuid
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+
+from dabia.api.v1.decks import enroll_in_deck
+from dabia.schemas import DeckEnrollmentRequest
+
+def test_enroll_in_deck_defaults_to_lazy_ut():
+    # Arrange
+    mock_db = MagicMock()
+    deck_id = uuid.uuid4()
+    user_deck = SimpleNamespace(is_active=True, new_cards_per_day=20, reviews_per_day=200)
+
+    # Act
+    with patch("dabia.api.v1.decks.enroll_deck", return_value=(user_deck, 0)) as enroll:
+        response = enroll_in_deck(deck_id=deck_id, request=None, db=mock_db, current_user_id=uuid.uuid4())
+
+    # Assert
+    assert response.mode == "lazy"
+    assert response.enrolled_cards == 0
+    assert enroll.call_args.kwargs["mode"] == "lazy"
+
+def test_enroll_in_unknown_deck_is_404_ut():
+    mock_db = MagicMock()
+    mock_db.get.return_value = None
+
+    with pytest.raises(HTTPException) as exc_info:
+        enroll_in_deck(deck_id=uuid.uuid4(), request=DeckEnrollmentRequest(mode="eager"), db=mock_db, current_user_id=uuid.uuid4())
+
+    assert exc_info.value.status_code == 404
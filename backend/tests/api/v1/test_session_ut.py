@@ -1,9 +1,9 @@
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, patch
 import uuid
-from types import SimpleNamespace
 
-from dabia.api.v1.session import get_next_card
+from dabia.api.v1.session import get_next_card, read_session_progress
 from dabia.schemas import PreviousAnswer
+from dabia.services.rows import CardRow
 
 def test_get_next_card_no_answer_ut():
     """Unit test for getting a card when no previous answer is provided."""
@@ -11,30 +11,21 @@ def test_get_next_card_no_answer_ut():
     mock_db = MagicMock()
     user_id = uuid.uuid4()
 
-    # Mock the DB model object that the query returns
-    mock_card_db_obj = SimpleNamespace(
-        id=uuid.uuid4(),
-        deck=SimpleNamespace(id=uuid.uuid4(), name="Test Deck"),
-        sentence_template="Hello __",
-        target_word="World",
-        reading="Sekai",
-        hint="A greeting",
-        audio_url="/audio.mp3",
-        sentence=None,
-        sentence_furigana=None,
-        sentence_translation=None,
-        sentence_audio_url=None,
-        users=[]
+    # Mock the card that the scheduler picks
+    mock_card_row = CardRow(
+        uuid.uuid4(), uuid.uuid4(), "Test Deck", "Hello __", "World", "Sekai",
+        "A greeting", "/audio.mp3", None, None, None, None, None, proficiency_level=2,
     )
-    mock_db.query.return_value.options.return_value.order_by.return_value.first.return_value = mock_card_db_obj
 
     # Act
-    response = get_next_card(answer=None, db=mock_db, current_user_id=user_id)
+    with patch("dabia.api.v1.session.fetch_next_cards", return_value=[mock_card_row]):
+        response = get_next_card(answer=None, db=mock_db, current_user_id=user_id)
 
     # Assert
     assert response.card.sentence_template == "Hello __"
     assert response.card.target.word == "World"
     assert response.card.reading == "Sekai"
+    assert response.card.proficiency_level == 2
     mock_db.commit.assert_not_called()
 
 def test_get_next_card_with_answer_ut():
@@ -42,8 +33,6 @@ def test_get_next_card_with_answer_ut():
     # Arrange
     mock_db = MagicMock()
     user_id = uuid.uuid4()
-    # Adjust mock for the .order_by() call
-    mock_db.query.return_value.options.return_value.order_by.return_value.first.return_value = None  # No next card
 
     answer = PreviousAnswer(
         card_id=uuid.uuid4(),
@@ -52,7 +41,8 @@ def test_get_next_card_with_answer_ut():
     )
 
     # Act
-    response = get_next_card(answer=answer, db=mock_db, current_user_id=user_id)
+    with patch("dabia.api.v1.session.fetch_next_cards", return_value=[]):  # No next card
+        response = get_next_card(answer=answer, db=mock_db, current_user_id=user_id)
 
     # Assert
     assert response.card is None
@@ -63,3 +53,16 @@ def test_get_next_card_with_answer_ut():
     assert added_object.card_id == answer.card_id
     assert added_object.is_correct is False
     assert added_object.user_id == user_id
+
+def test_read_session_progress_ut():
+    """Unit test for the read-only progress endpoint."""
+    # Arrange
+    mock_db = MagicMock()
+    mock_db.scalar.return_value = 7
+
+    # Act
+    progress = read_session_progress(db=mock_db, current_user_id=uuid.uuid4())
+
+    # Assert
+    assert progress.completed_today == 7
+    assert progress.goal_today == 50
@@ -0,0 +1,141 @@
+from unittest.mock import MagicMock, patch
+import inspect
+import io
+import json
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import msgpack
+import pytest
+from fastapi import HTTPException
+
+from dabia.api.v1.sync import (
+    encode_cursor,
+    decode_cursor,
+    iter_changes,
+    encode_msgpack,
+    pull_changes,
+    upload_reviews,
+    _change_queries,
+)
+from dabia.database import get_db
+from dabia.schemas import OfflineReview, ReviewUploadRequest
+
+def _mock_result(rows):
+    result = MagicMock()
+    result.mappings.return_value = iter(rows)
+    return result
+
+def test_cursor_round_trip_ut():
+    """A cursor decodes back into the positions it was built from."""
+    card_id = uuid.uuid4()
+    updated_at = datetime(2025, 11, 9, 19, 18, 22)
+    cursor = encode_cursor({"decks": None, "cards": [updated_at.isoformat(), str(card_id)], "associations": None})
+
+    positions = decode_cursor(cursor)
+
+    assert positions["decks"] is None
+    assert positions["cards"] == (updated_at, card_id)
+    assert positions["associations"] is None
+
+def test_invalid_cursor_is_rejected_ut():
+    with pytest.raises(HTTPException) as exc_info:
+        decode_cursor("not-a-cursor")
+    assert exc_info.value.status_code == 400
+
+def test_iter_changes_streams_rows_and_next_cursor_ut():
+    """Unit test for the NDJSON bundle returned by a pull."""
+    # Arrange
+    mock_db = MagicMock()
+    deck_id = uuid.uuid4()
+    updated_at = datetime(2025, 11, 9, 19, 18, 22)
+    deck_row = {"id": deck_id, "name": "Test Deck", "description": None, "updated_at": updated_at}
+    mock_db.execute.side_effect = [_mock_result([deck_row]), _mock_result([]), _mock_result([])]
+
+    # Act
+    lines = [json.loads(line) for line in iter_changes(mock_db, uuid.uuid4(), decode_cursor(None))]
+
+    # Assert
+    assert lines[0]["type"] == "deck"
+    assert lines[0]["data"]["name"] == "Test Deck"
+    assert lines[-1]["type"] == "cursor"
+    assert lines[-1]["data"]["has_more"] is False
+    positions = decode_cursor(lines[-1]["data"]["cursor"])
+    assert positions["decks"] == (updated_at, deck_id)
+    assert positions["cards"] is None
+
+def test_iter_changes_msgpack_encoding_ut():
+    """The MessagePack bundle carries the same records as the NDJSON one."""
+    mock_db = MagicMock()
+    mock_db.execute.side_effect = [_mock_result([]), _mock_result([]), _mock_result([])]
+
+    body = b"".join(iter_changes(mock_db, uuid.uuid4(), decode_cursor(None), encode=encode_msgpack))
+
+    records = list(msgpack.Unpacker(io.BytesIO(body)))
+    assert records[-1]["type"] == "cursor"
+    assert records[-1]["data"]["has_more"] is False
+
+def test_pull_changes_reads_from_the_primary_ut():
+    """A lagging replica could let rows slip behind the settle interval and the cursor."""
+    assert inspect.signature(pull_changes).parameters["db"].default.dependency is get_db
+
+def test_associations_carry_suspension_ut():
+    """Offline clients need is_suspended to skip leeches."""
+    queries = {entity: stmt for entity, _, stmt in _change_queries(uuid.uuid4(), decode_cursor(None))}
+
+    assert "is_suspended" in queries["associations"].selected_columns.keys()
+
+def _insert_params(mock_db):
+    [insert] = [call[0][0] for call in mock_db.execute.call_args_list if str(call[0][0]).startswith("INSERT INTO review_logs")]
+    return insert.compile().params
+
+def test_upload_reviews_ut():
+    """Unit test for bulk-recording offline answers."""
+    # Arrange
+    mock_db = MagicMock()
+    user_id = uuid.uuid4()
+    known_card, unknown_card = uuid.uuid4(), uuid.uuid4()
+    mock_db.scalars.return_value = [known_card]
+    mock_db.execute.return_value.all.return_value = [(uuid.uuid4(),)]
+
+    future = datetime.now(timezone.utc) + timedelta(days=1)
+    payload = ReviewUploadRequest(reviews=[
+        OfflineReview(id=uuid.uuid4(), card_id=known_card, is_correct=True, response_time_ms=900, reviewed_at=future),
+        OfflineReview(id=uuid.uuid4(), card_id=known_card, is_correct=False, response_time_ms=1200, reviewed_at=future),
+        OfflineReview(id=uuid.uuid4(), card_id=unknown_card, is_correct=True, response_time_ms=800, reviewed_at=future),
+    ])
+
+    # Act
+    response = upload_reviews(payload=payload, db=mock_db, current_user_id=user_id)
+
+    # Assert
+    assert response.accepted == 1
+    assert response.duplicates == 1
+    assert response.rejected == 1
+    mock_db.commit.assert_called_once()
+
+    params = _insert_params(mock_db)
+    reviewed_at = [value for key, value in params.items() if key.startswith("reviewed_at")]
+    assert reviewed_at and all(value.tzinfo is None and value < future.replace(tzinfo=None) for value in reviewed_at)
+
+def test_uploaded_reviews_are_applied_oldest_first_ut():
+    """New reviews go through the same path as online answers; duplicates don't."""
+    # Arrange
+    mock_db = MagicMock()
+    user_id, card_id = uuid.uuid4(), uuid.uuid4()
+    first, second, duplicate = (
+        OfflineReview(id=uuid.uuid4(), card_id=card_id, is_correct=is_correct, response_time_ms=900, reviewed_at=datetime(2025, 1, 1, hour))
+        for is_correct, hour in ((False, 8), (True, 9), (True, 7))
+    )
+    mock_db.scalars.return_value = [card_id]
+    mock_db.execute.return_value.all.return_value = [(second.id,), (first.id,)]
+
+    # Act
+    with patch("dabia.api.v1.sync.apply_answer") as apply_answer:
+        upload_reviews(payload=ReviewUploadRequest(reviews=[second, duplicate, first]), db=mock_db, current_user_id=user_id)
+
+    # Assert
+    applied = [(call.args[2].is_correct, call.kwargs["answered_at"]) for call in apply_answer.call_args_list]
+    assert applied == [(False, datetime(2025, 1, 1, 8)), (True, datetime(2025, 1, 1, 9))]
+    assert all(call.args[:2] == (mock_db, user_id) for call in apply_answer.call_args_list)
+    mock_db.commit.assert_called_once()
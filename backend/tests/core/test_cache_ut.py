@@ -0,0 +1,60 @@
+from unittest.mock import patch
+
+import pytest
+
+from dabia.core.cache import FakeRedis, LocalCache, RedisCache, create_cache
+
+def test_local_cache_evicts_least_recently_used_ut():
+    cache = LocalCache(max_entries=2)
+    cache.set_many({"a": b"1", "b": b"2"})
+    cache.get("a")  # "b" is now the least recently used
+
+    cache.set("c", b"3")
+
+    assert cache.get_many(["a", "b", "c"]) == {"a": b"1", "c": b"3"}
+    assert cache.stats.evictions == 1
+
+def test_local_cache_expires_entries_and_counts_lookups_ut():
+    cache = LocalCache(default_ttl=10)
+    with patch("dabia.core.cache.time.monotonic", return_value=100.0):
+        cache.set("a", b"1")
+        cache.set("b", b"2", ttl=60)
+    with patch("dabia.core.cache.time.monotonic", return_value=120.0):
+        found = cache.get_many(["a", "b", "missing"])
+
+    assert found == {"b": b"2"}
+    assert (cache.stats.hits, cache.stats.misses, cache.stats.sets) == (1, 2, 2)
+    assert cache.stats.hit_ratio == pytest.approx(1 / 3)
+
+def test_redis_cache_batches_round_trips_and_shares_entries_ut():
+    """Two caches on one server see each other's writes; a batch is one command."""
+    server = FakeRedis()
+    worker_a, worker_b = RedisCache(server), RedisCache(server)
+
+    worker_a.set_many({"card:1": b"x", "card:2": b"y"}, ttl=30)
+    commands = server.commands
+    found = worker_b.get_many(["card:1", "card:2", "card:3"])
+    worker_b.delete("card:1")
+
+    assert found == {"card:1": b"x", "card:2": b"y"}
+    assert server.commands == commands + 2
+    assert worker_a.get("card:1") is None
+    assert "dabia:card:2" in server.data
+
+def test_redis_cache_degrades_to_misses_when_unreachable_ut():
+    server = FakeRedis()
+    cache = RedisCache(server)
+    cache.set("a", b"1")
+    server.fail = True
+
+    assert cache.get("a") is None
+    cache.set("b", b"2")
+    cache.delete("a")
+    assert cache.stats.errors == 3
+    assert cache.stats.misses == 1
+
+def test_create_cache_picks_backend_from_url_ut():
+    assert isinstance(create_cache(""), LocalCache)
+    assert isinstance(create_cache("fake://"), RedisCache)
+    with pytest.raises(ValueError):
+        create_cache("memcached://localhost")
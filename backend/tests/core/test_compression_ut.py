@@ -0,0 +1,104 @@
+import gzip
+
+import brotli
+import msgpack
+from fastapi import APIRouter, FastAPI
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from fastapi.testclient import TestClient
+
+from dabia.core.compression import CompressionMiddleware, choose_encoding
+from dabia.core.negotiation import NegotiatedRoute
+
+LARGE_TEXT = "これは何ですか？" * 200
+
+def _make_app():
+    app = FastAPI()
+    router = APIRouter(route_class=NegotiatedRoute)
+
+    @router.get("/card")
+    def card():
+        return {"sentence": LARGE_TEXT, "proficiency_level": 0}
+
+    @router.get("/small")
+    def small():
+        return {"ok": True}
+
+    @router.get("/stream")
+    def stream():
+        return StreamingResponse((f"{i}\n" for i in range(1000)), media_type="application/x-ndjson")
+
+    @router.get("/encoded")
+    def encoded():
+        return PlainTextResponse(gzip.compress(LARGE_TEXT.encode()), headers={"Content-Encoding": "gzip"})
+
+    app.include_router(router)
+    app.add_middleware(CompressionMiddleware, minimum_size=500)
+    return app
+
+app = _make_app()
+client = TestClient(app)
+
+def _get(path, **headers):
+    # Disable httpx's transparent decoding so we can inspect the raw bytes.
+    with client.stream("GET", path, headers=headers) as response:
+        return response, b"".join(response.iter_raw())
+
+def test_choose_encoding_ut():
+    assert choose_encoding("gzip, deflate, br") == "br"
+    assert choose_encoding("gzip;q=1.0, br;q=0.5") == "gzip"
+    assert choose_encoding("br;q=0, gzip") == "gzip"
+    assert choose_encoding("*") == "br"
+    assert choose_encoding("identity") is None
+    assert choose_encoding("") is None
+
+def test_large_json_is_brotli_compressed_ut():
+    response, raw = _get("/card", **{"Accept-Encoding": "br, gzip"})
+
+    assert response.headers["content-encoding"] == "br"
+    assert "Accept-Encoding" in response.headers["vary"]
+    assert len(raw) < len(LARGE_TEXT.encode())
+    assert brotli.decompress(raw).decode().count("これは何ですか") == 200
+
+def test_small_responses_are_not_compressed_ut():
+    response, raw = _get("/small", **{"Accept-Encoding": "gzip"})
+
+    assert "content-encoding" not in response.headers
+    assert raw == b'{"ok":true}'
+
+def test_streaming_response_is_gzip_compressed_ut():
+    response, raw = _get("/stream", **{"Accept-Encoding": "gzip"})
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert gzip.decompress(raw).decode().splitlines() == [str(i) for i in range(1000)]
+
+def test_already_encoded_responses_pass_through_ut():
+    response, raw = _get("/encoded", **{"Accept-Encoding": "br"})
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert gzip.decompress(raw).decode() == LARGE_TEXT
+
+def test_compress_round_trips_both_encodings_ut():
+    compression = CompressionMiddleware(app=None, minimum_size=0)
+    body = LARGE_TEXT.encode()
+
+    assert gzip.decompress(compression.compress(body, "gzip")) == body
+    assert brotli.decompress(compression.compress(body, "br")) == body
+
+def test_msgpack_is_opt_in_ut():
+    json_response = client.get("/card")
+    msgpack_response = client.get("/card", headers={"Accept": "application/msgpack"})
+
+    assert json_response.headers["content-type"] == "application/json"
+    assert msgpack_response.headers["content-type"] == "application/msgpack"
+    assert "Accept" in msgpack_response.headers["vary"]
+    assert msgpack.unpackb(msgpack_response.content) == json_response.json()
+
+def test_msgpack_is_encoded_without_rendering_json_ut(monkeypatch):
+    def render_json(self, content):
+        raise AssertionError("the response was rendered as JSON")
+
+    monkeypatch.setattr(JSONResponse, "render", render_json)
+
+    response = client.get("/card", headers={"Accept": "application/msgpack"})
+
+    assert msgpack.unpackb(response.content) == {"sentence": LARGE_TEXT, "proficiency_level": 0}
@@ -0,0 +1,18 @@
+from dabia.core.furigana import parse_furigana
+
+def test_parse_furigana_splits_bases_at_tags_and_spaces_ut():
+    """The base of a reading starts after the previous tag, space or reading."""
+    segments = parse_furigana("答[こた]えに<b> 丸[まる]</b>をつける")
+
+    assert segments == [["答", "こた"], ["えに"], ["丸", "まる"], ["をつける"]]
+
+def test_parse_furigana_merges_redundant_readings_into_plain_text_ut():
+    segments = parse_furigana("これ[これ]は[は]何[なに]ですか[ですか]？")
+
+    assert segments == [["これは"], ["何", "なに"], ["ですか？"]]
+
+def test_parse_furigana_handles_plain_and_missing_text_ut():
+    assert parse_furigana("今日[きょう] 行[い]く") == [["今日", "きょう"], ["行", "い"], ["く"]]
+    assert parse_furigana("A &amp; B") == [["A & B"]]
+    assert parse_furigana("") is None
+    assert parse_furigana(None) is None
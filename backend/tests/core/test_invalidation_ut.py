@@ -0,0 +1,95 @@
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import psycopg2
+
+from dabia.core.cache import LocalCache
+from dabia.core.invalidation import EvictionWatch, InvalidationListener, invalidated_keys
+
+def test_invalidated_keys_maps_payload_to_cache_keys_ut():
+    assert invalidated_keys("card:a,b") == ["card:a", "card:b"]
+    assert invalidated_keys("deck:") == []
+
+def test_listener_evicts_exactly_the_notified_entries_ut():
+    # Arrange
+    cache = LocalCache()
+    cache.set_many({"card:a": b"1", "card:b": b"2", "deck:a": b"3"})
+    listener = InvalidationListener("postgresql+psycopg2://u:p@db/dabia", cache)
+
+    # Act
+    listener.handle("card:a,b")
+
+    # Assert
+    assert cache.get_many(["card:a", "card:b", "deck:a"]) == {"deck:a": b"3"}
+    assert listener.evicted == 2
+    assert listener.dsn == "postgresql://u:p@db/dabia"
+
+def test_loads_in_flight_see_evictions_and_clears_ut():
+    # Arrange
+    watch = EvictionWatch()
+    listener = InvalidationListener("postgresql://u:p@db/dabia", LocalCache(), watch=watch)
+
+    # Act
+    with watch.watch() as first:
+        listener.handle("card:a")
+        with watch.watch() as second:
+            listener.handle("deck:b")
+    listener.handle("card:c")
+    with watch.watch() as third:
+        watch.cleared()
+
+    # Assert
+    assert "card:a" in first and "deck:b" in first and "card:c" not in first
+    assert "card:a" not in second and "deck:b" in second
+    assert "card:z" in third
+    assert watch._watching == []
+
+def test_listener_clears_the_cache_after_a_reconnect_ut():
+    """Notifications sent while disconnected are lost, so nothing cached can be trusted."""
+    # Arrange
+    cache = LocalCache()
+    listener = InvalidationListener("postgresql://u:p@db/dabia", cache, poll_interval=0)
+    conn = MagicMock(notifies=[SimpleNamespace(payload="card:a")])
+    cache.set("deck:b", b"1")
+
+    def stop_after_one_poll(*args):
+        listener._stop.set()
+        return [conn], [], []
+
+    # Act
+    with patch("dabia.core.invalidation.select.select", side_effect=stop_after_one_poll):
+        listener._listen(conn, reconnected=True)
+
+    # Assert
+    conn.cursor.return_value.__enter__.return_value.execute.assert_called_once_with('LISTEN "dabia_cache_invalidation"')
+    assert cache.get("deck:b") is None
+    assert listener.reconnects == 1
+    assert listener.evicted == 1
+
+def _run_until_listening(listener, connect_side_effect):
+    """Runs the listener's loop until its first LISTEN; returns whether that LISTEN cleared the cache."""
+    listened = []
+
+    def listen(conn, reconnected):
+        listened.append(reconnected)
+        listener._stop.set()
+
+    with patch("dabia.core.invalidation.psycopg2.connect", side_effect=connect_side_effect), \
+            patch.object(listener, "_listen", side_effect=listen), \
+            patch.object(listener._stop, "wait"):
+        listener._run()
+    return listened
+
+def test_listener_clears_the_cache_after_failed_startup_attempts_ut():
+    listener = InvalidationListener("postgresql://u:p@db/dabia", LocalCache())
+
+    cleared = _run_until_listening(listener, [psycopg2.OperationalError("down"), MagicMock()])
+
+    assert cleared == [True]
+
+def test_listener_keeps_the_cache_on_a_first_successful_connect_ut():
+    listener = InvalidationListener("postgresql://u:p@db/dabia", LocalCache())
+
+    cleared = _run_until_listening(listener, [MagicMock()])
+
+    assert cleared == [False]
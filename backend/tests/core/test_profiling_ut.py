@@ -0,0 +1,74 @@
+import os
+import threading
+import time
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from dabia.core.profiling import PROFILE_HEADER, ProfilingMiddleware, StackSampler, sign_profile_request, verify_profile_request
+
+def _busy(seconds):
+    started = time.perf_counter()
+    while time.perf_counter() - started < seconds:
+        sum(range(1000))
+
+def _make_client(directory, **options):
+    app = FastAPI()
+
+    @app.get("/slow")
+    def slow():
+        _busy(0.05)
+        return {"ok": True}
+
+    app.add_middleware(ProfilingMiddleware, directory=str(directory), interval=0.001, **options)
+    return TestClient(app)
+
+def test_verify_profile_request_ut():
+    value = sign_profile_request("secret", "/api/v1/session/next-card", 2000)
+
+    assert verify_profile_request("secret", "/api/v1/session/next-card", value, now=1000)
+    assert not verify_profile_request("secret", "/api/v1/session/next-card", value, now=3000)
+    assert not verify_profile_request("secret", "/api/v1/cards/search", value, now=1000)
+    assert not verify_profile_request("other", "/api/v1/session/next-card", value, now=1000)
+    assert not verify_profile_request("secret", "/api/v1/session/next-card", "garbage", now=1000)
+
+def test_sampler_collapses_busy_stacks_ut():
+    sampler = StackSampler(threading.get_ident())
+    for _ in range(3):
+        sampler.sample()
+
+    lines = sampler.collapsed().splitlines()
+    assert len(lines) == 1
+    stack, count = lines[0].rsplit(" ", 1)
+    assert count == "3"
+    assert stack.startswith("event loop;")
+    assert "test_sampler_collapses_busy_stacks_ut" in stack
+
+def test_signed_request_is_profiled_ut(tmp_path):
+    client = _make_client(tmp_path, secret="secret")
+    header = sign_profile_request("secret", "/slow", int(time.time()) + 60)
+
+    response = client.get("/slow", headers={PROFILE_HEADER: header})
+
+    assert response.status_code == 200
+    [name] = os.listdir(tmp_path)
+    assert name.startswith(response.headers[PROFILE_HEADER])
+    assert "-GET-slow-" in name
+    assert "slow (" in (tmp_path / name).read_text()
+
+def test_unsigned_request_is_not_profiled_ut(tmp_path):
+    client = _make_client(tmp_path, secret="secret")
+
+    response = client.get("/slow", headers={PROFILE_HEADER: f"{int(time.time()) + 60}.forged"})
+
+    assert response.status_code == 200
+    assert PROFILE_HEADER not in response.headers
+    assert os.listdir(tmp_path) == []
+
+def test_sampled_requests_are_profiled_and_pruned_ut(tmp_path):
+    client = _make_client(tmp_path, sample_rate=1.0, max_files=2)
+
+    for _ in range(3):
+        assert client.get("/slow").status_code == 200
+
+    assert len(os.listdir(tmp_path)) == 2
@@ -0,0 +1,109 @@
+from unittest.mock import MagicMock
+from types import SimpleNamespace
+import time
+import uuid
+
+import jwt
+from fastapi import Depends, FastAPI, HTTPException
+from fastapi.testclient import TestClient
+
+from dabia import database
+from dabia.core.cache import LocalCache
+from dabia.core.replicas import ReplicaPool, ReadYourWritesMiddleware, RecentWrites
+from dabia.core.security import KeyRing, TokenVerifier, VerifiedTokenCache, get_current_user_id, get_token_verifier
+
+DEAD_REPLICA = "sqlite:////nonexistent-dir/replica.db"
+SECRET = "replica-test-secret-with-at-least-32-bytes"
+
+def _verifier():
+    return TokenVerifier(KeyRing(f"k1:{SECRET}"), VerifiedTokenCache(), algorithms=["HS256"])
+
+def _auth(user_id):
+    token = jwt.encode({"sub": str(user_id), "exp": int(time.time()) + 60}, SECRET, algorithm="HS256", headers={"kid": "k1"})
+    return {"Authorization": f"Bearer {token}"}
+
+def test_round_robin_over_healthy_replicas_ut():
+    pool = ReplicaPool(["sqlite://", "sqlite://", "sqlite://"])
+
+    first_choices = [pool.candidates()[0] for _ in range(6)]
+
+    assert first_choices[:3] == pool.replicas
+    assert first_choices[3:] == pool.replicas
+
+def test_failing_replica_is_ejected_ut():
+    pool = ReplicaPool([DEAD_REPLICA, "sqlite://"], eject_seconds=60)
+
+    db = pool.open_session()
+
+    assert db is not None
+    assert db.get_bind() is pool.replicas[1].engine
+    assert pool.replicas[0].failures == 1
+    assert pool.replicas[0] not in pool.candidates()
+    db.close()
+
+def test_open_session_returns_none_when_all_replicas_are_down_ut():
+    pool = ReplicaPool([DEAD_REPLICA], eject_seconds=60)
+
+    assert pool.open_session() is None
+    assert pool.candidates() == []
+
+def test_recent_writes_expire_ut():
+    writes = RecentWrites(LocalCache(), window_seconds=0.05)
+    user_id = uuid.uuid4()
+
+    writes.mark(user_id)
+
+    assert writes.recently_wrote(user_id)
+    assert not writes.recently_wrote(uuid.uuid4())
+    time.sleep(0.06)
+    assert not writes.recently_wrote(user_id)
+
+def test_successful_writes_mark_the_authenticated_user_ut():
+    writes = RecentWrites(LocalCache())
+    writer, failed_writer, reader = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+    app = FastAPI()
+
+    @app.post("/write")
+    def write(user_id: uuid.UUID = Depends(get_current_user_id)):
+        return {"ok": True}
+
+    @app.post("/fail")
+    def fail(user_id: uuid.UUID = Depends(get_current_user_id)):
+        raise HTTPException(status_code=409)
+
+    @app.get("/read")
+    def read(user_id: uuid.UUID = Depends(get_current_user_id)):
+        return {"ok": True}
+
+    app.add_middleware(ReadYourWritesMiddleware, writes=writes)
+    app.dependency_overrides[get_token_verifier] = lambda: _verifier()
+    client = TestClient(app)
+
+    assert client.post("/write", headers=_auth(writer)).status_code == 200
+    assert client.post("/fail", headers=_auth(failed_writer)).status_code == 409
+    assert client.get("/read", headers=_auth(reader)).status_code == 200
+
+    assert writes.recently_wrote(writer)
+    assert not writes.recently_wrote(failed_writer)
+    assert not writes.recently_wrote(reader)
+
+def test_get_read_db_prefers_primary_after_the_users_write_ut(monkeypatch):
+    primary_session, replica_session = MagicMock(), MagicMock()
+    writes = RecentWrites(LocalCache())
+    monkeypatch.setattr(database, "engine", object())
+    monkeypatch.setattr(database, "SessionLocal", lambda: primary_session)
+    monkeypatch.setattr(database, "replica_pool", SimpleNamespace(open_session=lambda: replica_session))
+    monkeypatch.setattr(database, "recent_writes", writes)
+    app = FastAPI()
+
+    @app.get("/read")
+    def read(db=Depends(database.get_read_db)):
+        return {"primary": db is primary_session}
+
+    app.dependency_overrides[get_token_verifier] = lambda: _verifier()
+    client = TestClient(app)
+    writer, other = uuid.uuid4(), uuid.uuid4()
+    writes.mark(writer)
+
+    assert client.get("/read", headers=_auth(writer)).json() == {"primary": True}
+    assert client.get("/read", headers=_auth(other)).json() == {"primary": False}
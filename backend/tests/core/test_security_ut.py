@@ -0,0 +1,151 @@
+import json
+import os
+import time
+import uuid
+from unittest.mock import patch
+
+import jwt
+import pytest
+from cryptography.hazmat.primitives.asymmetric import rsa
+from fastapi import Depends, FastAPI, HTTPException
+from fastapi.testclient import TestClient
+
+from dabia.core.security import (
+    KeyRing,
+    TokenVerifier,
+    VerifiedTokenCache,
+    DEFAULT_USER_ID,
+    get_current_user_id,
+    get_token_verifier,
+)
+
+SECRET = "test-secret-with-enough-entropy-for-hs256"
+
+def _hs_verifier(**kwargs):
+    return TokenVerifier(KeyRing(f"k1:{SECRET}"), VerifiedTokenCache(max_size=2), algorithms=["HS256"], **kwargs)
+
+def _token(user_id, kid="k1", key=SECRET, algorithm="HS256", ttl=60, **claims):
+    payload = {"sub": str(user_id), "exp": int(time.time()) + ttl, **claims}
+    return jwt.encode(payload, key, algorithm=algorithm, headers={"kid": kid})
+
+def test_valid_token_resolves_user_ut():
+    user_id = uuid.uuid4()
+    assert _hs_verifier().verify(_token(user_id)) == user_id
+
+def test_verified_tokens_skip_signature_checks_ut():
+    verifier = _hs_verifier()
+    token = _token(uuid.uuid4())
+    verifier.verify(token)
+
+    with patch("dabia.core.security.jwt.decode") as decode:
+        verifier.verify(token)
+
+    decode.assert_not_called()
+
+def test_cache_is_bounded_ut():
+    cache = VerifiedTokenCache(max_size=2)
+    for i in range(3):
+        cache.put(bytes([i]), uuid.uuid4(), time.time() + 60)
+
+    assert cache.get(bytes([0])) is None
+    assert cache.get(bytes([2])) is not None
+
+def test_cached_entries_expire_with_the_token_ut():
+    cache = VerifiedTokenCache()
+    cache.put(b"key", uuid.uuid4(), time.time() - 1)
+
+    assert cache.get(b"key") is None
+
+@pytest.mark.parametrize("token", [
+    _token(uuid.uuid4(), ttl=-10),
+    _token(uuid.uuid4(), key="wrong-secret-with-enough-entropy-for-hs256"),
+    _token(uuid.uuid4(), kid="unknown"),
+    _token("not-a-uuid"),
+    "garbage",
+])
+def test_invalid_tokens_are_rejected_ut(token):
+    with pytest.raises(HTTPException) as exc_info:
+        _hs_verifier().verify(token)
+    assert exc_info.value.status_code == 401
+    assert exc_info.value.detail == "Invalid token"
+
+def _rsa_jwks_file(tmp_path, kid="rsa"):
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    jwk = json.loads(jwt.algorithms.RSAAlgorithm.to_jwk(private_key.public_key()))
+    jwks_file = tmp_path / "jwks.json"
+    jwks_file.write_text(json.dumps({"keys": [{**jwk, "kid": kid, "alg": "RS256", "use": "sig"}]}))
+    return jwks_file, private_key
+
+def test_tokens_must_use_their_keys_algorithm_ut(tmp_path):
+    """An HS256 token naming an RSA key is a 401, not a key type error."""
+    jwks_file, private_key = _rsa_jwks_file(tmp_path)
+    keys = KeyRing(f"k1:{SECRET}", jwks_file=str(jwks_file), reload_interval=0)
+    verifier = TokenVerifier(keys, VerifiedTokenCache(), algorithms=["RS256", "ES256", "HS256"])
+    user_id = uuid.uuid4()
+
+    assert verifier.verify(_token(user_id, kid="rsa", key=private_key, algorithm="RS256")) == user_id
+    for token in (_token(user_id, kid="rsa", key=SECRET), _token(user_id, kid="k1", key=private_key, algorithm="RS256")):
+        with pytest.raises(HTTPException) as exc_info:
+            verifier.verify(token)
+        assert exc_info.value.status_code == 401
+
+def test_key_algorithms_must_be_allowed_ut():
+    verifier = TokenVerifier(KeyRing(f"k1:{SECRET}"), VerifiedTokenCache(), algorithms=["RS256"])
+
+    with pytest.raises(HTTPException):
+        verifier.verify(_token(uuid.uuid4()))
+
+def test_audience_is_enforced_ut():
+    verifier = _hs_verifier(audience="dabia")
+    user_id = uuid.uuid4()
+
+    assert verifier.verify(_token(user_id, aud="dabia")) == user_id
+    with pytest.raises(HTTPException):
+        verifier.verify(_token(user_id, aud="someone-else"))
+
+def test_jwks_file_keys_are_reloaded_on_rotation_ut(tmp_path):
+    jwks_file = tmp_path / "jwks.json"
+    old_key, new_key = (rsa.generate_private_key(public_exponent=65537, key_size=2048) for _ in range(2))
+
+    def write_jwks(kid, private_key):
+        jwk = json.loads(jwt.algorithms.RSAAlgorithm.to_jwk(private_key.public_key()))
+        jwks_file.write_text(json.dumps({"keys": [{**jwk, "kid": kid, "alg": "RS256", "use": "sig"}]}))
+
+    write_jwks("old", old_key)
+    verifier = TokenVerifier(KeyRing(jwks_file=str(jwks_file), reload_interval=0), VerifiedTokenCache(), algorithms=["RS256"])
+    user_id = uuid.uuid4()
+    assert verifier.verify(_token(user_id, kid="old", key=old_key, algorithm="RS256")) == user_id
+
+    write_jwks("new", new_key)
+    # Make sure the rewrite is seen as a change even on coarse mtime clocks.
+    os.utime(jwks_file, (time.time() + 5, time.time() + 5))
+
+    assert verifier.verify(_token(user_id, kid="new", key=new_key, algorithm="RS256")) == user_id
+
+def _app_with(verifier):
+    app = FastAPI()
+
+    @app.get("/me")
+    def me(user_id: uuid.UUID = Depends(get_current_user_id)):
+        return {"user_id": str(user_id)}
+
+    app.dependency_overrides[get_token_verifier] = lambda: verifier
+    return TestClient(app)
+
+def test_dependency_requires_bearer_token_when_keys_are_configured_ut():
+    client = _app_with(_hs_verifier())
+    user_id = uuid.uuid4()
+
+    assert client.get("/me").status_code == 401
+    response = client.get("/me", headers={"Authorization": f"Bearer {_token(user_id)}"})
+    assert response.json() == {"user_id": str(user_id)}
+
+def test_dependency_falls_back_to_default_user_only_when_allowed_ut():
+    client = _app_with(TokenVerifier(KeyRing(), VerifiedTokenCache(), algorithms=["HS256"], allow_default_user=True))
+
+    assert client.get("/me").json() == {"user_id": str(DEFAULT_USER_ID)}
+
+def test_dependency_rejects_requests_without_keys_by_default_ut():
+    client = _app_with(TokenVerifier(KeyRing(), VerifiedTokenCache(), algorithms=["HS256"]))
+
+    assert client.get("/me").status_code == 401
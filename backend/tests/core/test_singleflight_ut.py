@@ -0,0 +1,90 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from dabia.core.singleflight import SingleFlight
+
+def test_concurrent_misses_share_one_load_ut():
+    # Arrange
+    flight = SingleFlight()
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def load(keys):
+        calls.append(list(keys))
+        started.set()
+        release.wait(5)
+        return {key: key.upper() for key in keys}
+
+    # Act
+    with ThreadPoolExecutor(4) as pool:
+        first = pool.submit(flight.do_many, ["a", "b"], load)
+        started.wait(5)
+        others = [pool.submit(flight.do_many, ["a", "b"], load) for _ in range(3)]
+        # Give the waiters time to join the in-flight load.
+        while flight.stats.coalesced < 6:
+            time.sleep(0.001)
+        release.set()
+        results = [first.result(5)] + [future.result(5) for future in others]
+
+    # Assert
+    assert calls == [["a", "b"]]
+    assert all(result == {"a": "A", "b": "B"} for result in results)
+    assert flight.stats.loads == 2
+    assert flight.stats.coalesced == 6
+
+def test_only_keys_not_in_flight_are_loaded_ut():
+    """A caller loads the keys nobody else is loading and waits for the rest."""
+    # Arrange
+    flight = SingleFlight()
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def load(keys):
+        calls.append(list(keys))
+        if keys == ["a"]:
+            started.set()
+            release.wait(5)
+        return {key: key.upper() for key in keys}
+
+    # Act
+    with ThreadPoolExecutor(2) as pool:
+        first = pool.submit(flight.do_many, ["a"], load)
+        started.wait(5)
+        second = pool.submit(flight.do_many, ["a", "b"], load)
+        while flight.stats.coalesced < 1:
+            time.sleep(0.001)
+        release.set()
+
+    # Assert
+    assert calls == [["a"], ["b"]]
+    assert first.result() == {"a": "A"}
+    assert second.result() == {"a": "A", "b": "B"}
+
+def test_load_errors_reach_every_waiter_and_are_not_cached_ut():
+    # Arrange
+    flight = SingleFlight()
+    started, release = threading.Event(), threading.Event()
+
+    def fail():
+        started.set()
+        release.wait(5)
+        raise RuntimeError("database down")
+
+    # Act
+    with ThreadPoolExecutor(2) as pool:
+        loader = pool.submit(flight.do, "a", fail)
+        started.wait(5)
+        waiter = pool.submit(flight.do, "a", lambda: "not loaded")
+        while flight.stats.coalesced < 1:
+            time.sleep(0.001)
+        release.set()
+
+    # Assert
+    with pytest.raises(RuntimeError, match="database down"):
+        loader.result()
+    with pytest.raises(RuntimeError, match="database down"):
+        waiter.result()
+    assert flight.do("a", lambda: "loaded") == "loaded"
@@ -0,0 +1,100 @@
+from unittest.mock import MagicMock
+import uuid
+from datetime import date, datetime
+
+import pyarrow as pa
+
+from dabia.services.archive import (
+    iter_record_batches,
+    write_month,
+    month_path,
+    next_month,
+    iter_review_batches,
+    archive_reviews,
+)
+
+def _rows(count, month=3, users=2):
+    user_ids = [uuid.uuid4() for _ in range(users)]
+    card_id = uuid.uuid4()
+    return [
+        (uuid.uuid4(), user_ids[i % users], card_id, i % 2 == 0, 1000 + i, datetime(2024, month, 1 + i % 28, 12))
+        for i in range(count)
+    ]
+
+def test_next_month_wraps_year_ut():
+    assert next_month(date(2024, 12, 1)) == date(2025, 1, 1)
+    assert next_month(date(2024, 3, 1)) == date(2024, 4, 1)
+
+def test_record_batches_dictionary_encode_uuids_ut():
+    rows = _rows(10, users=3)
+
+    batches = list(iter_record_batches([rows[:4], rows[4:]]))
+
+    assert len(batches) == 1
+    assert batches[0].num_rows == 10
+    assert pa.types.is_dictionary(batches[0].schema.field("user_id").type)
+    assert len(batches[0]["user_id"].dictionary) == 3
+    assert batches[0]["id"][0].as_py() == rows[0][0].bytes
+
+def test_record_batches_are_bounded_and_share_a_growing_dictionary_ut():
+    rows = _rows(10, users=10)
+
+    batches = list(iter_record_batches([rows[:3], rows[3:]], batch_size=4))
+
+    assert [batch.num_rows for batch in batches] == [4, 4, 2]
+    dictionaries = [batch["user_id"].dictionary.to_pylist() for batch in batches]
+    assert dictionaries[1][:4] == dictionaries[0]
+    assert dictionaries[2][:8] == dictionaries[1]
+    assert [value.as_py() for value in batches[2]["user_id"]] == [rows[8][1].bytes, rows[9][1].bytes]
+
+def test_write_and_scan_round_trip_ut(tmp_path):
+    rows = _rows(30)
+    path = month_path(tmp_path, date(2024, 3, 1))
+
+    write_month([rows], path)
+    batches = list(iter_review_batches(tmp_path, columns=["card_id", "is_correct"]))
+
+    assert sum(batch.num_rows for batch in batches) == 30
+    assert batches[0].schema.names == ["card_id", "is_correct"]
+
+def test_scan_filters_by_time_range_ut(tmp_path):
+    rows = _rows(28)
+    write_month([rows], month_path(tmp_path, date(2024, 3, 1)))
+
+    batches = iter_review_batches(tmp_path, start=datetime(2024, 3, 10), end=datetime(2024, 3, 20), columns=["id"])
+
+    assert sum(batch.num_rows for batch in batches) == 10
+
+def test_write_merges_late_rows_into_existing_month_ut(tmp_path):
+    rows = _rows(10)
+    path = month_path(tmp_path, date(2024, 3, 1))
+    write_month([rows[:6]], path)
+
+    # The second run overlaps the first; rows already archived aren't duplicated.
+    assert write_month([rows[4:]], path) == 10
+
+    with pa.memory_map(str(path)) as source:
+        table = pa.ipc.open_file(source).read_all()
+    assert table.num_rows == 10
+    assert set(table["id"].to_pylist()) == {row[0].bytes for row in rows}
+    assert set(table["user_id"].to_pylist()) == {row[1].bytes for row in rows}
+
+def test_archive_reviews_deletes_only_archived_ids_ut(tmp_path):
+    """Unit test for moving one month of review logs out of Postgres."""
+    # Arrange
+    mock_db = MagicMock()
+    rows = _rows(5)
+    mock_db.scalar.return_value = datetime(2024, 3, 2)
+    mock_db.execute.return_value.partitions.return_value = iter([rows])
+
+    # Act
+    archived = archive_reviews(mock_db, before=date(2024, 4, 15), archive_dir=tmp_path)
+
+    # Assert
+    assert len(archived) == 1
+    assert archived[0].month == date(2024, 3, 1)
+    assert archived[0].rows == 5
+    assert archived[0].path.exists()
+    delete_stmt = mock_db.execute.call_args_list[-1][0][0]
+    assert "DELETE FROM review_logs" in str(delete_stmt)
+    mock_db.commit.assert_called()
@@ -0,0 +1,94 @@
+from unittest.mock import MagicMock
+import uuid
+
+from dabia.core.cache import LocalCache
+from dabia.core.invalidation import InvalidationListener, evictions
+from dabia.services.card_cache import load_cards
+
+def _content(card_id, deck_id, deck_name="Deck"):
+    # A card_row_select() row.
+    return (card_id, deck_id, deck_name, "__", "丸", "まる", None, None, None, None,
+            [["丸", "まる"]], None, None, ["円"])
+
+def test_load_cards_queries_only_cache_misses_ut():
+    # Arrange
+    cache = LocalCache()
+    deck_id = uuid.uuid4()
+    first, second = uuid.uuid4(), uuid.uuid4()
+    db = MagicMock()
+    db.execute.return_value = [_content(first, deck_id)]
+    load_cards(db, [first], cache)
+    db.execute.reset_mock()
+    db.execute.return_value = [_content(second, deck_id)]
+
+    # Act
+    cards = load_cards(db, [first, second], cache)
+
+    # Assert
+    assert db.execute.call_count == 1
+    assert cards[first].deck_name == "Deck"
+    assert cards[first].sentence_segments == [["丸", "まる"]]
+    assert cards[first].distractors == ["円"]
+    assert cards[first].proficiency_level == 0
+    assert cache.stats.hits == 1
+
+def test_load_cards_reads_deck_names_from_their_own_entries_ut():
+    """A cached card picks up a deck rename once the deck's entry is refreshed."""
+    # Arrange
+    cache = LocalCache()
+    deck_id, card_id = uuid.uuid4(), uuid.uuid4()
+    db = MagicMock()
+    db.execute.return_value = [_content(card_id, deck_id, "Old name")]
+    load_cards(db, [card_id], cache)
+    cache.delete(f"deck:{deck_id}")
+    db.execute.return_value = MagicMock(all=lambda: [(deck_id, "New name")])
+
+    # Act
+    cards = load_cards(db, [card_id], cache)
+
+    # Assert
+    assert cards[card_id].deck_name == "New name"
+    assert cache.get(f"deck:{deck_id}") == "New name".encode()
+
+def test_load_cards_does_not_cache_cards_evicted_during_the_load_ut():
+    """A change that commits while the row is being read must not leave the old row cached."""
+    # Arrange
+    cache = LocalCache()
+    deck_id, card_id = uuid.uuid4(), uuid.uuid4()
+    listener = InvalidationListener("postgresql://u:p@db/dabia", cache)
+    db = MagicMock()
+
+    def read_then_change(stmt):
+        listener.handle(f"card:{card_id}")
+        return [_content(card_id, deck_id)]
+
+    db.execute.side_effect = read_then_change
+
+    # Act
+    cards = load_cards(db, [card_id], cache)
+
+    # Assert
+    assert cards[card_id].target_word == "丸"
+    assert cache.get(f"card:{card_id}") is None
+    assert cache.get(f"deck:{deck_id}") == b"Deck"
+
+def test_load_cards_undoes_a_set_that_raced_an_eviction_ut():
+    # Arrange
+    cache = LocalCache()
+    deck_id, card_id = uuid.uuid4(), uuid.uuid4()
+    db = MagicMock()
+    db.execute.return_value = [_content(card_id, deck_id)]
+    set_many = cache.set_many
+
+    def set_then_evict(items, ttl=None):
+        set_many(items, ttl)
+        evictions.evicted(items)
+
+    cache.set_many = set_then_evict
+
+    # Act
+    load_cards(db, [card_id], cache)
+
+    # Assert
+    assert cache.get(f"card:{card_id}") is None
+    assert cache.get(f"deck:{deck_id}") is None
@@ -0,0 +1,56 @@
+import uuid
+
+from dabia.services.distractors import compute_distractors
+
+def _cards():
+    return [
+        (uuid.uuid4(), "丸", "まる", "circle"),
+        (uuid.uuid4(), "円", "えん", "circle; yen"),
+        (uuid.uuid4(), "丸い", "まるい", "round"),
+        (uuid.uuid4(), "円い", "まるい", "round"),
+        (uuid.uuid4(), "四角", "しかく", "square"),
+        (uuid.uuid4(), "三角", "さんかく", "triangle"),
+        (uuid.uuid4(), "丸", "がん", "pill"),
+    ]
+
+def test_compute_distractors_never_picks_a_correct_answer_ut():
+    """Words equal to the card's word or reading are excluded, and picks are unique."""
+    # Arrange
+    cards = _cards()
+
+    # Act
+    distractors = compute_distractors(cards, k=3)
+
+    # Assert
+    for card_id, word, reading, _ in cards:
+        chosen = distractors[card_id]
+        assert len(chosen) == 3
+        assert len(set(chosen)) == 3
+        assert word not in chosen
+        assert reading not in chosen
+    # 丸い and 円い share a reading, so neither is offered for the other.
+    assert "円い" not in distractors[cards[2][0]]
+
+def test_compute_distractors_prefers_similar_words_ut():
+    """A word sharing kanji and hint wording ranks first."""
+    # Arrange
+    cards = _cards()
+
+    # Act
+    distractors = compute_distractors(cards, k=3)
+
+    # Assert
+    assert distractors[cards[4][0]][0] == "三角"
+
+def test_compute_distractors_only_for_targets_ut():
+    """With targets, only those cards are scored, still against the whole deck."""
+    # Arrange
+    cards = _cards()
+    target = cards[0][0]
+
+    # Act
+    distractors = compute_distractors(cards, targets={target}, k=2)
+
+    # Assert
+    assert list(distractors) == [target]
+    assert len(distractors[target]) == 2
@@ -0,0 +1,27 @@
+import uuid
+
+from sqlalchemy.orm import Session
+
+from dabia import models
+from dabia.services.enrollment import enroll_deck
+from dabia.services.scheduler import InterleavingScheduler
+
+def test_deck_is_served_only_after_lazy_enrollment_it(db_session: Session):
+    # Arrange
+    user_id = uuid.uuid4()
+    deck = models.Deck(id=uuid.uuid4(), name="Enrollment Deck")
+    db_session.add_all([
+        models.User(id=user_id, email="enrollment@example.com", hashed_password="fake_hash"),
+        deck,
+        models.Card(id=uuid.uuid4(), deck_id=deck.id, sentence_template="Test sentence __.", target_word="word", reading="wado"),
+    ])
+    db_session.commit()
+
+    # Act
+    before = InterleavingScheduler(db_session, user_id).next_cards(1)
+    enroll_deck(db_session, user_id, deck.id, mode="lazy")
+    after = InterleavingScheduler(db_session, user_id).next_cards(1)
+
+    # Assert
+    assert before == []
+    assert [card.target_word for card in after] == ["word"]
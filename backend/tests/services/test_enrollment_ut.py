@@ -0,0 +1,42 @@
+from unittest.mock import MagicMock
+import uuid
+
+from sqlalchemy.dialects import postgresql
+
+from dabia.services.enrollment import enroll_cards, enroll_deck
+
+def _compile(stmt) -> str:
+    return str(stmt.compile(dialect=postgresql.dialect()))
+
+def test_enroll_cards_inserts_in_keyset_chunks_ut():
+    """Each chunk is one INSERT ... SELECT bounded by the chunk's last card, then a commit."""
+    # Arrange
+    mock_db = MagicMock()
+    boundary = (500, uuid.uuid4())
+    mock_db.execute.return_value.first.side_effect = [boundary, None]
+    mock_db.execute.return_value.rowcount = 500
+
+    # Act
+    created = enroll_cards(mock_db, uuid.uuid4(), uuid.uuid4(), new_cards_per_day=20, chunk_size=500)
+
+    # Assert
+    statements = [_compile(call[0][0]) for call in mock_db.execute.call_args_list]
+    inserts = [sql for sql in statements if sql.startswith("INSERT INTO user_card_associations")]
+    assert created == 1000
+    assert len(inserts) == 2
+    assert "(cards.order_key, cards.id) <= " in inserts[0]
+    assert "<= " not in inserts[1].split("FROM cards")[1]
+    assert "ON CONFLICT (user_id, card_id) DO NOTHING" in inserts[0]
+    assert "make_interval" in inserts[0]
+    assert mock_db.commit.call_count == 2
+
+def test_lazy_enrollment_only_activates_the_deck_ut():
+    """The active user_decks row is what the scheduler reads; no associations are created."""
+    mock_db = MagicMock()
+
+    enroll_deck(mock_db, uuid.uuid4(), uuid.uuid4(), mode="lazy")
+
+    upsert = _compile(mock_db.scalars.call_args[0][0])
+    assert upsert.startswith("INSERT INTO user_decks")
+    assert "ON CONFLICT (user_id, deck_id) DO UPDATE SET is_active" in upsert
+    mock_db.execute.assert_not_called()
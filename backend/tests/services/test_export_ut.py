@@ -0,0 +1,69 @@
+from unittest.mock import MagicMock
+import csv
+import io
+import json
+import uuid
+from datetime import datetime
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from dabia.services.export import (
+    review_export_query,
+    iter_row_batches,
+    iter_csv,
+    iter_ndjson,
+    export_reviews,
+    EXPORT_COLUMNS,
+)
+
+def _row():
+    return (uuid.uuid4(), uuid.uuid4(), uuid.uuid4(), uuid.uuid4(), True, 1234, datetime(2025, 11, 10, 7, 30))
+
+def test_export_query_projects_only_exported_columns_ut():
+    stmt = review_export_query(user_id=uuid.uuid4(), since=datetime(2025, 1, 1))
+    sql = str(stmt.compile(dialect=postgresql.dialect()))
+
+    assert [column.name for column in stmt.selected_columns] == list(EXPORT_COLUMNS)
+    assert "review_logs.user_id = " in sql
+    assert "review_logs.reviewed_at >= " in sql
+    assert "ORDER BY review_logs.user_id, review_logs.reviewed_at" in sql
+
+def test_iter_row_batches_uses_server_side_cursor_ut():
+    mock_db = MagicMock()
+    mock_db.execute.return_value.partitions.return_value = iter([[_row()], [_row()]])
+
+    batches = list(iter_row_batches(mock_db, review_export_query(), batch_size=1))
+
+    assert len(batches) == 2
+    options = mock_db.execute.call_args[0][0].get_execution_options()
+    assert options["stream_results"] is True
+    assert options["yield_per"] == 1
+    mock_db.execute.return_value.close.assert_called_once()
+
+def test_iter_csv_ut():
+    rows = [_row(), _row()]
+
+    text = "".join(iter_csv(iter([rows[:1], rows[1:]])))
+
+    parsed = list(csv.reader(io.StringIO(text)))
+    assert parsed[0] == list(EXPORT_COLUMNS)
+    assert len(parsed) == 3
+    assert parsed[1][0] == str(rows[0][0])
+    assert parsed[1][6] == "2025-11-10T07:30:00"
+
+def test_iter_csv_writes_header_for_empty_export_ut():
+    assert "".join(iter_csv(iter([]))) == ",".join(EXPORT_COLUMNS) + "\r\n"
+
+def test_iter_ndjson_ut():
+    row = _row()
+
+    lines = "".join(iter_ndjson(iter([[row]]))).splitlines()
+
+    record = json.loads(lines[0])
+    assert record["card_id"] == str(row[2])
+    assert record["is_correct"] is True
+
+def test_export_reviews_rejects_unknown_format_ut():
+    with pytest.raises(ValueError):
+        export_reviews(MagicMock(), "xml")
@@ -0,0 +1,66 @@
+from unittest.mock import MagicMock
+import hashlib
+import uuid
+
+from sqlalchemy.dialects import postgresql
+
+from dabia.services.media import load_card_audio, prefetch_manifest, record_media_assets
+from dabia.services.rows import CardRow
+
+def _card(audio_url=None, sentence_audio_url=None):
+    return CardRow(uuid.uuid4(), uuid.uuid4(), "Deck", "__", "丸", "まる", None,
+                   audio_url, None, None, None, None, sentence_audio_url)
+
+def test_record_media_assets_hashes_files_found_ut(tmp_path):
+    # Arrange
+    (tmp_path / "maru.mp3").write_bytes(b"ID3 audio")
+    db = MagicMock()
+
+    # Act
+    missing = record_media_assets(db, tmp_path, ["maru.mp3", "gone.mp3", "maru.mp3"])
+
+    # Assert
+    assert missing == ["gone.mp3"]
+    stmt = db.execute.call_args[0][0]
+    sql = str(stmt.compile(dialect=postgresql.dialect()))
+    assert "ON CONFLICT (filename) DO UPDATE" in sql
+    assert "WHERE media_assets.content_hash != excluded.content_hash" in sql
+    values = stmt.compile(dialect=postgresql.dialect()).params
+    assert values["content_hash_m0"] == hashlib.sha256(b"ID3 audio").hexdigest()
+    assert values["size_bytes_m0"] == 9
+    assert values["content_type_m0"] == "audio/mpeg"
+    db.commit.assert_called_once()
+
+def test_load_card_audio_resolves_urls_in_order_ut():
+    # Arrange
+    first = _card("maru.mp3", "sentence_maru.mp3")
+    second = _card(None, "maru.mp3")
+    db = MagicMock()
+    db.execute.return_value = [("maru.mp3", "abc123", 9)]
+
+    # Act
+    audio = load_card_audio(db, [first, second])
+
+    # Assert
+    db.execute.assert_called_once()
+    assert [asset.url.rsplit("/", 1)[1] for asset in audio[first.id]] == ["maru.mp3", "sentence_maru.mp3"]
+    assert (audio[first.id][0].content_hash, audio[first.id][0].size_bytes) == ("abc123", 9)
+    assert audio[first.id][1].content_hash is None
+    assert audio[second.id] == [audio[first.id][0]]
+
+def test_cards_without_audio_skip_the_query_ut():
+    card = _card()
+    db = MagicMock()
+
+    assert load_card_audio(db, [card]) == {card.id: []}
+    db.execute.assert_not_called()
+
+def test_prefetch_manifest_lists_each_file_once_ut():
+    first, second = _card("a.mp3", "b.mp3"), _card("b.mp3", "c.mp3")
+    db = MagicMock()
+    db.execute.return_value = []
+    audio = load_card_audio(db, [first, second])
+
+    manifest = prefetch_manifest([audio[first.id], audio[second.id]])
+
+    assert [asset.url.rsplit("/", 1)[1] for asset in manifest] == ["a.mp3", "b.mp3", "c.mp3"]
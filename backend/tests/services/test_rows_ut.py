@@ -0,0 +1,45 @@
+import uuid
+
+from sqlalchemy.dialects import postgresql
+
+from dabia.services.rows import (
+    CardRow,
+    NewCardRow,
+    NEW_CARD_FIELDS,
+    card_row_select,
+    to_card_row,
+)
+
+def _row(proficiency_level):
+    return (uuid.uuid4(), uuid.uuid4(), "Test Deck", "Hello __", "World", "Sekai",
+            "A greeting", "/audio.mp3", None, None, None, None, None, None, proficiency_level)
+
+def test_card_row_select_projects_card_row_columns_ut():
+    """Without a user, exactly the CardRow columns are selected, minus proficiency."""
+    stmt = card_row_select()
+
+    assert len(stmt.selected_columns) == len(CardRow.__slots__) - 1
+    assert "user_card_associations" not in str(stmt.compile(dialect=postgresql.dialect()))
+
+def test_card_row_select_joins_only_the_users_association_ut():
+    user_id = uuid.uuid4()
+    stmt = card_row_select(user_id)
+    sql = str(stmt.compile(dialect=postgresql.dialect()))
+
+    assert len(stmt.selected_columns) == len(CardRow.__slots__)
+    assert "LEFT OUTER JOIN user_card_associations" in sql
+    assert "user_card_associations.user_id = " in sql
+
+def test_to_card_row_defaults_missing_proficiency_ut():
+    assert to_card_row(_row(None)).proficiency_level == 0
+    assert to_card_row(_row(3)).proficiency_level == 3
+
+def test_new_card_row_values_match_card_columns_ut():
+    row = NewCardRow(
+        guid="guid-1", deck_id=uuid.uuid4(), order_key=1, sentence_template="__", target_word="丸",
+        reading="まる", hint="circle", audio_url=None, sentence="丸", sentence_furigana=None,
+        sentence_segments=None, sentence_translation=None, sentence_audio_url=None,
+    )
+
+    assert tuple(row.to_values()) == NEW_CARD_FIELDS
+    assert row.to_values()["target_word"] == "丸"
@@ -0,0 +1,134 @@
+from unittest.mock import MagicMock
+import uuid
+from datetime import datetime
+
+from sqlalchemy.dialects import postgresql
+
+from dabia.services.scheduler import CURSOR_START, InterleavingScheduler
+
+DECK_A, DECK_B = uuid.uuid4(), uuid.uuid4()
+
+# Card content by id, as card_row_select() returns it for the card cache.
+CONTENT = {}
+
+def _row(word, deck_id):
+    # A window row; the window's keyset column is appended per kind.
+    card_id = uuid.uuid4()
+    CONTENT[card_id] = (card_id, deck_id, "Deck", "__", word, None, None, None, None, None, None, None, None, None)
+    return (card_id, deck_id, None)
+
+class _Result(list):
+    def all(self):
+        return list(self)
+
+def _fake_db(decks, due=(), new=()):
+    """
+    Answers the scheduler's queries. `due` and `new` are lists of windows:
+    each refill of that kind returns the next one.
+    """
+    due, new = list(due), list(new)
+    calls = []
+
+    def execute(stmt):
+        sql = str(stmt.compile(dialect=postgresql.dialect()))
+        calls.append(sql)
+        if "due_window" in sql:
+            return _Result(due.pop(0) if due else [])
+        if "new_window" in sql:
+            return _Result(new.pop(0) if new else [])
+        if "FROM user_decks" in sql:
+            return [(deck_id, *CURSOR_START, new_left, reviews_left) for deck_id, new_left, reviews_left in decks]
+        if "FROM cards JOIN decks" in sql:
+            return list(CONTENT.values())
+        return _Result()
+
+    db = MagicMock()
+    db.execute.side_effect = execute
+    return db, calls
+
+def test_overdue_reviews_come_first_then_new_cards_alternate_between_decks_ut():
+    # Arrange
+    db, calls = _fake_db(
+        decks=[(DECK_A, 20, 200), (DECK_B, 20, 200)],
+        due=[[
+            _row("b-due", DECK_B) + (datetime(2025, 1, 2),),
+            _row("a-due", DECK_A) + (datetime(2025, 1, 1),),
+        ]],
+        new=[[
+            _row("a-new-1", DECK_A) + (1,),
+            _row("a-new-2", DECK_A) + (2,),
+            _row("b-new-1", DECK_B) + (1,),
+        ]],
+    )
+    scheduler = InterleavingScheduler(db, uuid.uuid4())
+
+    # Act
+    cards = scheduler.next_cards(5)
+
+    # Assert
+    assert [card.target_word for card in cards] == ["a-due", "b-due", "a-new-1", "b-new-1", "a-new-2"]
+    # One query for the decks, one per kind for all decks' windows, and one
+    # for the content of cards not in the cache yet.
+    assert len(calls) == 4
+    assert not any("FROM cards JOIN decks" in sql for sql in calls[1:3])
+
+def test_only_the_users_active_decks_are_studied_ut():
+    """Deck states come from the user's user_decks rows, not from the whole catalogue."""
+    db, calls = _fake_db(decks=[(DECK_A, 20, 0)])
+
+    InterleavingScheduler(db, uuid.uuid4()).next_cards(1)
+
+    deck_states = calls[0]
+    assert "FROM user_decks \nWHERE user_decks.user_id = " in deck_states
+    assert "AND user_decks.is_active" in deck_states
+    assert " decks" not in deck_states
+
+def test_cards_with_an_association_are_not_new_ut():
+    """Answered cards are reviews, even if their order_key now sorts after the cursor."""
+    db, calls = _fake_db(decks=[(DECK_A, 20, 0)])
+
+    InterleavingScheduler(db, uuid.uuid4()).next_cards(1)
+
+    [new_window] = [sql for sql in calls if "new_window" in sql]
+    assert "AND NOT (EXISTS (SELECT user_card_associations.card_id" in new_window
+    assert "user_card_associations.card_id = cards.id" in new_window
+
+def test_quotas_cap_each_decks_window_ut():
+    db, calls = _fake_db(decks=[(DECK_A, 2, 0), (DECK_B, 0, 0)])
+    scheduler = InterleavingScheduler(db, uuid.uuid4(), window_size=10)
+
+    scheduler.next_cards(5)
+
+    new_windows = [sql for sql in calls if "new_window" in sql]
+    assert len(new_windows) == 1
+    assert not any("due_window" in sql for sql in calls)
+    assert scheduler.decks[DECK_A].new_exhausted
+    assert DECK_B not in [deck.deck_id for deck in scheduler.decks.values() if deck.wants_new()]
+
+def test_only_drained_decks_are_refilled_ut():
+    # Arrange
+    a1, a2 = _row("a1", DECK_A) + (1,), _row("a2", DECK_A) + (2,)
+    b1, b2, b3 = (_row(f"b{i}", DECK_B) + (i,) for i in (1, 2, 3))
+    db, calls = _fake_db(
+        decks=[(DECK_A, 20, 0), (DECK_B, 20, 0)],
+        new=[[a1, a2, b1, b2], [_row("a3", DECK_A) + (3,)]],
+    )
+    scheduler = InterleavingScheduler(db, uuid.uuid4(), window_size=2)
+
+    # Act
+    first = scheduler.next_cards(3)
+    second = scheduler.next_cards(1)
+
+    # Assert
+    assert [card.target_word for card in first] == ["a1", "b1", "a2"]
+    assert [card.target_word for card in second] == ["a3"]
+    refills = [sql for sql in calls if "new_window" in sql]
+    assert len(refills) == 2
+    assert scheduler.decks[DECK_B].new_pending == 1
+
+def test_study_ahead_skips_decks_without_review_quota_ut():
+    db, calls = _fake_db(decks=[(DECK_A, 0, 0), (DECK_B, 0, 5)])
+    scheduler = InterleavingScheduler(db, uuid.uuid4())
+
+    assert scheduler.study_ahead(3) == []
+    assert "user_card_associations.deck_id IN" in calls[-1]
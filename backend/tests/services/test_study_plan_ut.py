@@ -0,0 +1,107 @@
+from datetime import date
+from unittest.mock import MagicMock, patch
+import uuid
+
+from sqlalchemy.dialects import postgresql
+
+from dabia.services.rows import CardRow
+from dabia.services.study import fetch_next_cards
+from dabia.services.study_plan import build_study_plans, next_planned_cards, update_study_plan
+
+def _sql(stmt):
+    return str(stmt.compile(dialect=postgresql.dialect()))
+
+def _card(card_id, word):
+    return CardRow(card_id, uuid.uuid4(), "Deck", "__", word, None, None, None, None, None, None, None, None)
+
+def test_build_study_plans_writes_reviews_then_new_cards_ut():
+    # Arrange
+    db = MagicMock()
+    db.execute.return_value.rowcount = 2
+
+    # Act
+    written = build_study_plans(db, [uuid.uuid4(), uuid.uuid4()])
+
+    # Assert
+    clear, reviews, new_cards = (_sql(call[0][0]) for call in db.execute.call_args_list)
+    assert clear.startswith("DELETE FROM study_plan_entries")
+    assert "study_plan_entries.plan_date = CURRENT_DATE + " in clear
+    assert "JOIN user_decks ON user_decks.user_id = users.user_id" in reviews
+    assert "decks" not in reviews.replace("user_decks", "")
+    assert "JOIN LATERAL (SELECT user_card_associations.card_id" in reviews
+    assert "LIMIT deck_states.reviews_left" in reviews
+    assert "LIMIT deck_states.new_left" in new_cards
+    assert new_cards.endswith("ON CONFLICT DO NOTHING")
+    # The anti-join correlates with deck_states instead of cross joining it.
+    assert "FROM user_card_associations \nWHERE user_card_associations.user_id = deck_states.user_id" in new_cards
+    assert written == 4
+    db.commit.assert_called_once()
+
+def test_build_study_plans_plans_the_given_day_ut():
+    """Cutoff, quotas and entries all follow plan_date, not the day the job runs."""
+    # Arrange
+    db = MagicMock()
+    db.execute.return_value.rowcount = 0
+    day = date(2026, 10, 20)
+
+    # Act
+    build_study_plans(db, [uuid.uuid4()], plan_date=day)
+
+    # Assert
+    clear, reviews, new_cards = (call[0][0].compile(dialect=postgresql.dialect()) for call in db.execute.call_args_list)
+    assert day in clear.params.values()
+    for stmt in (reviews, new_cards):
+        sql = str(stmt)
+        assert "CURRENT_DATE" not in sql
+        assert "user_decks.counted_on = %(param_1)s::DATE" in sql
+        assert stmt.params["param_1"] == day
+    assert "user_card_associations.next_review_at < %(param_1)s::DATE + " in str(reviews)
+    assert "CAST(%(param_1)s::DATE AS TIMESTAMP WITHOUT TIME ZONE)" in str(new_cards)
+
+def test_build_study_plans_without_users_does_nothing_ut():
+    db = MagicMock()
+
+    assert build_study_plans(db, []) == 0
+    db.execute.assert_not_called()
+
+def test_next_planned_cards_keeps_plan_order_ut():
+    # Arrange
+    first, second = uuid.uuid4(), uuid.uuid4()
+    db = MagicMock()
+    db.execute.return_value.all.return_value = [(first, uuid.uuid4(), 2), (second, uuid.uuid4(), None)]
+    contents = {first: _card(first, "one"), second: _card(second, "two")}
+
+    # Act
+    with patch("dabia.services.study_plan.load_cards", return_value=contents):
+        cards = next_planned_cards(db, uuid.uuid4(), limit=2)
+
+    # Assert
+    assert [(card.target_word, card.proficiency_level) for card in cards] == [("one", 2), ("two", 0)]
+    sql = _sql(db.execute.call_args[0][0])
+    assert "study_plan_entries.due_at <= now()" in sql
+    assert "ORDER BY study_plan_entries.is_new, study_plan_entries.due_at, study_plan_entries.position" in sql
+
+def test_fetch_next_cards_prefers_the_plan_ut():
+    card = _card(uuid.uuid4(), "planned")
+
+    with patch("dabia.services.study.next_planned_cards", return_value=[card]), \
+            patch("dabia.services.study.InterleavingScheduler") as scheduler:
+        cards = fetch_next_cards(MagicMock(), uuid.uuid4())
+
+    assert cards == [card]
+    scheduler.assert_not_called()
+
+def test_update_study_plan_moves_cards_due_that_day_back_in_ut():
+    """
+    The answered entry is deleted from today's and later plans, and
+    re-inserted as a review into each plan whose day it is due by.
+    """
+    db = MagicMock()
+
+    update_study_plan(db, uuid.uuid4(), uuid.uuid4())
+
+    sql = _sql(db.execute.call_args[0][0])
+    assert sql.startswith("WITH answered AS \n(DELETE FROM study_plan_entries")
+    assert "INSERT INTO study_plan_entries" in sql
+    assert "study_plan_entries.plan_date >= CURRENT_DATE" in sql
+    assert "user_card_associations.next_review_at < answered.plan_date + " in sql
@@ -0,0 +1,204 @@
+from dataclasses import replace
+from unittest.mock import MagicMock, patch
+import uuid
+from datetime import datetime
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.exc import IntegrityError
+
+from dabia.api.v1 import session as session_router
+from dabia.core.security import get_current_user_id
+from dabia.database import get_db
+from dabia.schemas import PreviousAnswer
+from dabia.services.rows import CardRow
+from dabia.services.study import StudySession, apply_answer, fetch_next_cards, record_answer
+
+def _card(word="World"):
+    return CardRow(uuid.uuid4(), uuid.uuid4(), "Test Deck", "Hello __", word, "Sekai",
+                   "A greeting", "/audio.mp3", None, None, None, None, None)
+
+def _mock_db(completed_today=0):
+    mock_db = MagicMock()
+    mock_db.scalar.return_value = completed_today
+    return mock_db
+
+def _scheduler(*batches):
+    """A scheduler that hands out the given batches, then nothing."""
+    scheduler = MagicMock()
+    scheduler.next_cards.side_effect = [list(batch) for batch in batches] + [[]] * 10
+    scheduler.study_ahead.return_value = []
+    return scheduler
+
+def test_fetch_next_cards_studies_ahead_when_nothing_is_left_ut():
+    scheduler = _scheduler()
+    scheduler.study_ahead.return_value = [_card("soonest")]
+
+    with patch("dabia.services.study.InterleavingScheduler", return_value=scheduler):
+        cards = fetch_next_cards(MagicMock(), uuid.uuid4(), limit=3)
+
+    assert [card.target_word for card in cards] == ["soonest"]
+    scheduler.study_ahead.assert_called_once_with(3)
+
+def test_record_answer_reschedules_and_advances_cursor_ut():
+    # Arrange
+    mock_db = MagicMock()
+    answer = PreviousAnswer(card_id=uuid.uuid4(), is_correct=False, response_time_ms=900)
+
+    # Act
+    record_answer(mock_db, uuid.uuid4(), answer)
+
+    # Assert
+    schedule, progress, plan = (str(call[0][0].compile(dialect=postgresql.dialect())) for call in mock_db.execute.call_args_list)
+    assert "ON CONFLICT (user_id, card_id) DO UPDATE SET proficiency_level" in schedule
+    assert "INSERT INTO user_decks" in progress
+    assert "reviews_today = (CASE WHEN (user_decks.counted_on = CURRENT_DATE)" in progress
+    assert "WITH answered AS" in plan
+    mock_db.add.assert_called_once()
+    mock_db.commit.assert_called_once()
+
+def test_wrong_answer_counts_a_lapse_and_can_suspend_ut():
+    """Lapse counters and suspension are updated in the scheduling upsert."""
+    mock_db = MagicMock()
+    answer = PreviousAnswer(card_id=uuid.uuid4(), is_correct=False, response_time_ms=900)
+
+    record_answer(mock_db, uuid.uuid4(), answer)
+
+    schedule = str(mock_db.execute.call_args_list[0][0][0].compile(dialect=postgresql.dialect()))
+    assert "consecutive_lapses = (user_card_associations.consecutive_lapses + " in schedule
+    assert "total_lapses = (user_card_associations.total_lapses + " in schedule
+    assert "is_suspended = (user_card_associations.is_suspended OR " in schedule
+
+def test_offline_answers_are_scheduled_from_when_they_were_made_ut():
+    mock_db = MagicMock()
+    answer = PreviousAnswer(card_id=uuid.uuid4(), is_correct=True, response_time_ms=900)
+    answered_at = datetime(2025, 1, 1, 8)
+
+    apply_answer(mock_db, uuid.uuid4(), answer, answered_at=answered_at)
+
+    schedule = mock_db.execute.call_args_list[0][0][0].compile(dialect=postgresql.dialect())
+    assert "now()" not in str(schedule).split("DO UPDATE")[1].split("consecutive_lapses")[0]
+    assert answered_at in schedule.params.values()
+    assert mock_db.execute.call_count == 3
+    mock_db.commit.assert_not_called()
+
+def test_correct_answer_resets_consecutive_lapses_ut():
+    mock_db = MagicMock()
+    answer = PreviousAnswer(card_id=uuid.uuid4(), is_correct=True, response_time_ms=900)
+
+    record_answer(mock_db, uuid.uuid4(), answer)
+
+    schedule = str(mock_db.execute.call_args_list[0][0][0].compile(dialect=postgresql.dialect()))
+    assert "consecutive_lapses = %(param_" in schedule
+    assert "total_lapses = user_card_associations.total_lapses," in schedule
+
+def test_study_session_prefetches_and_counts_locally_ut():
+    """The counter is loaded once and cards come from the prefetched batch."""
+    # Arrange
+    cards = [_card("one"), _card("two"), _card("three")]
+    mock_db = _mock_db(completed_today=4)
+    session = StudySession(mock_db, uuid.uuid4(), prefetch_size=3)
+    session.scheduler = _scheduler(cards)
+
+    # Act
+    first = session.next()
+    session.answer(PreviousAnswer(card_id=first.card.card_id, is_correct=True, response_time_ms=800))
+    second = session.next()
+
+    # Assert
+    assert first.card.target.word == "one"
+    assert second.card.target.word == "two"
+    assert second.session_progress.completed_today == 5
+    mock_db.scalar.assert_called_once()
+    session.scheduler.next_cards.assert_called_once_with(3)
+    mock_db.add.assert_called_once()
+
+def test_study_session_skips_the_card_just_answered_ut():
+    cards = [_card("one"), _card("two")]
+    session = StudySession(_mock_db(), uuid.uuid4())
+    session.scheduler = _scheduler(cards)
+    session.next()
+
+    session.answer(PreviousAnswer(card_id=cards[1].id, is_correct=False, response_time_ms=800))
+
+    assert [card.target.word for card in session.upcoming] == []
+
+def test_websocket_channel_pushes_cards_and_records_answers_ut():
+    """End-to-end check of the socket protocol against a mocked database."""
+    # Arrange
+    mock_db = _mock_db()
+    app = FastAPI()
+    app.include_router(session_router.router, prefix="/api/v1/session")
+    app.dependency_overrides[get_db] = lambda: mock_db
+    app.dependency_overrides[get_current_user_id] = lambda: uuid.uuid4()
+    client = TestClient(app)
+
+    scheduler = _scheduler([_card("one"), _card("two")])
+    with patch("dabia.services.study.InterleavingScheduler", return_value=scheduler), \
+            client.websocket_connect("/api/v1/session/ws") as websocket:
+        # Act
+        first = websocket.receive_json()
+        websocket.send_json({"cardId": first["card"]["card_id"], "isCorrect": True, "responseTimeMs": 1200})
+        second = websocket.receive_json()
+        websocket.send_json({"cardId": "not-a-uuid"})
+        error = websocket.receive_json()
+
+    # Assert
+    assert first["type"] == "card"
+    assert first["card"]["target"]["word"] == "one"
+    assert second["card"]["target"]["word"] == "two"
+    assert second["session_progress"]["completed_today"] == 1
+    assert error["type"] == "error"
+    mock_db.commit.assert_called()
+
+def test_study_session_lists_audio_of_queued_cards_ut():
+    """Each card carries the audio of the cards queued after it, resolved once per batch."""
+    # Arrange
+    cards = [_card("one"), _card("two"), _card("three")]
+    cards[2] = replace(cards[2], audio_url="/three.mp3")
+    mock_db = _mock_db()
+    session = StudySession(mock_db, uuid.uuid4(), prefetch_size=3, audio_prefetch_count=1)
+    session.scheduler = _scheduler(cards)
+
+    # Act
+    first = session.next()
+    second = session.next()
+    third = session.next()
+
+    # Assert
+    assert [asset.url.rsplit("/", 1)[1] for asset in first.upcoming_audio] == ["audio.mp3"]
+    assert [asset.url.rsplit("/", 1)[1] for asset in second.upcoming_audio] == ["three.mp3"]
+    assert third.upcoming_audio == []
+    assert mock_db.execute.call_count == 1
+
+def test_websocket_channel_survives_bad_frames_and_failed_answers_ut():
+    """Non-JSON frames and answers the database rejects get an error frame; the session goes on."""
+    # Arrange
+    mock_db = _mock_db()
+    # The first commit releases the connection after loading the first batch.
+    mock_db.commit.side_effect = [None, IntegrityError("INSERT", {}, Exception("fk")), None, None]
+    app = FastAPI()
+    app.include_router(session_router.router, prefix="/api/v1/session")
+    app.dependency_overrides[get_db] = lambda: mock_db
+    app.dependency_overrides[get_current_user_id] = lambda: uuid.uuid4()
+    client = TestClient(app)
+
+    scheduler = _scheduler([_card("one"), _card("two")])
+    with patch("dabia.services.study.InterleavingScheduler", return_value=scheduler), \
+            client.websocket_connect("/api/v1/session/ws") as websocket:
+        first = websocket.receive_json()
+        # Act
+        websocket.send_text("not json")
+        not_json = websocket.receive_json()
+        websocket.send_json({"cardId": str(uuid.uuid4()), "isCorrect": True, "responseTimeMs": 1200})
+        unknown_card = websocket.receive_json()
+        websocket.send_json({"cardId": first["card"]["card_id"], "isCorrect": True, "responseTimeMs": 1200})
+        second = websocket.receive_json()
+
+    # Assert
+    assert not_json["type"] == "error"
+    assert unknown_card["type"] == "error"
+    mock_db.rollback.assert_called_once()
+    assert second["card"]["target"]["word"] == "two"
+    assert second["session_progress"]["completed_today"] == 1